@@ -155,10 +155,71 @@ def run_interactive(cli: AudioNormalizationCLI, handler: CommandHandler, signal_
     signal_handler.cleanup_temp_files()
 
 
+def build_processor_options(args) -> dict:
+    """Collect per-run AudioProcessor overrides from command-line arguments."""
+    options = {}
+    if args is None:
+        return options
+    if getattr(args, 'skip_policy', None):
+        options['skip_policy'] = args.skip_policy
+    if getattr(args, 'analysis_backend', None):
+        options['analysis_backend'] = args.analysis_backend
+    if getattr(args, 'streams', None):
+        options['stream_selection'] = list(args.streams)
+    if getattr(args, 'output_root', None):
+        options['output_root'] = args.output_root
+    if getattr(args, 'sidecar', None):
+        options['sidecar_mode'] = args.sidecar
+    if getattr(args, 'targets', None):
+        options['targets'] = list(args.targets)
+    return options
+
+
+def build_scan_options(args) -> dict:
+    """Collect directory scan filters from command-line arguments."""
+    options = {}
+    if args is None:
+        return options
+    if getattr(args, 'include', None):
+        options['include'] = list(args.include)
+    if getattr(args, 'exclude', None):
+        options['exclude'] = list(args.exclude)
+    if getattr(args, 'min_size', None) is not None:
+        options['min_size'] = args.min_size
+    if getattr(args, 'max_size', None) is not None:
+        options['max_size'] = args.max_size
+    if getattr(args, 'only_changed', False):
+        options['only_changed'] = True
+    if getattr(args, 'order', None):
+        options['order'] = args.order
+    return options
+
+
+def apply_normalization_overrides(args) -> None:
+    """Write --I/--TP/--LRA into NORMALIZATION_PARAMS.
+
+    Precedence: CLI args > config.json > built-in defaults. Must run before the processors
+    are created, since target profiles take their missing TP/LRA from these values.
+    """
+    if args is None or not (getattr(args, 'normalize', None) or getattr(args, 'chain', None)):
+        return
+    if args.I is not None:
+        NORMALIZATION_PARAMS['I'] = args.I
+    if args.TP is not None:
+        NORMALIZATION_PARAMS['TP'] = args.TP
+    if args.LRA is not None:
+        NORMALIZATION_PARAMS['LRA'] = args.LRA
+
+
 def main():
     """Main entry point for the audio normalization tool."""
     args = parse_args()
-    handler = CommandHandler(max_workers=getattr(args, 'workers', None) if args else None)
+    apply_normalization_overrides(args)
+    handler = CommandHandler(
+        max_workers=getattr(args, 'workers', None) if args else None,
+        processor_options=build_processor_options(args),
+        scan_options=build_scan_options(args),
+    )
     cli = AudioNormalizationCLI(handler)
     if args and getattr(args, 'debug_no_ffmpeg', False):
         setattr(cli, '_debug_no_ffmpeg', True)
@@ -167,25 +228,25 @@ def main():
     if args is None or getattr(args, 'debug_no_ffmpeg', False):
         run_interactive(cli, handler, signal_handler, debug=getattr(args, 'debug_no_ffmpeg', False) if args else False)
     else:
-        if getattr(args, 'normalize', None):
-            # Apply command-line overrides to normalization params.
-            # Precedence: CLI args > config.json > built-in defaults.
-            if args.I is not None:
-                NORMALIZATION_PARAMS['I'] = args.I
-            if args.TP is not None:
-                NORMALIZATION_PARAMS['TP'] = args.TP
-            if args.LRA is not None:
-                NORMALIZATION_PARAMS['LRA'] = args.LRA
-
+        if getattr(args, 'normalize', None) or getattr(args, 'chain', None):
             dry_run = getattr(args, 'dry_run', False)
             workers = getattr(args, 'workers', None)
-            results = handler.handle_normalize(args.normalize, dry_run=dry_run, max_workers=workers)
+            if getattr(args, 'chain', None):
+                results = handler.handle_chain(args.chain[0], args.chain[1], dry_run=dry_run, max_workers=workers)
+            else:
+                results = handler.handle_normalize(args.normalize, dry_run=dry_run, max_workers=workers)
             cli.display_results(results)
         elif getattr(args, 'boost', None):
             dry_run = getattr(args, 'dry_run', False)
             workers = getattr(args, 'workers', None)
             results = handler.handle_boost(args.boost[0], args.boost[1], dry_run=dry_run, max_workers=workers)
             cli.display_results(results)
+        elif getattr(args, 'benchmark_analysis', None):
+            results = handler.handle_benchmark_analysis(args.benchmark_analysis)
+            cli.display_results(results)
+        elif getattr(args, 'calibrate', False):
+            results = handler.handle_calibrate(max_workers=getattr(args, 'workers', None), dry_run=getattr(args, 'dry_run', False))
+            cli.display_results(results)
         signal_handler.cleanup_temp_files()
 
 
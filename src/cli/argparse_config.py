@@ -4,7 +4,38 @@ Argument parsing for audio normalization CLI.
 
 import sys
 import argparse
-from core.config import NORMALIZATION_PARAMS
+from core.config import NORMALIZATION_PARAMS, TARGET_PROFILES
+from processors.batch.scanner import parse_size
+from processors.audio.streams import parse_selector
+from processors.audio.targets import parse_profiles, select_profiles
+from processors.audio.chain import parse_chain
+
+
+def _size_arg(value: str) -> int:
+    """argparse type for byte sizes such as 700M or 2G."""
+    try:
+        return parse_size(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _stream_selector_arg(value: str) -> str:
+    """argparse type that validates a stream selector such as lang=eng,jpn."""
+    try:
+        parse_selector(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
+
+def _targets_arg(value: str) -> list:
+    """argparse type for a comma-separated list of TARGET_PROFILES names."""
+    names = [n.strip() for n in value.split(",") if n.strip()]
+    try:
+        select_profiles(parse_profiles(TARGET_PROFILES, NORMALIZATION_PARAMS), names or [value])
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return names
 
 def parse_args():
     """Parse command-line arguments."""
@@ -23,6 +54,23 @@ def parse_args():
         metavar=("PATH", "PERCENTAGE"),
         help="Path to a file or directory and boost percentage (e.g., 10 for +10%%, -10 for -10%%). If a directory is given, all supported files will be boosted."
     )
+    group.add_argument(
+        "--chain",
+        nargs=2,
+        metavar=("PATH", "OPERATIONS"),
+        help="Apply several operations in one encode, e.g. \"normalize,boost=10,codec=aac\". Operations: normalize, boost=PERCENT, rate=HZ, channels=N, codec=NAME, bitrate=RATE"
+    )
+    group.add_argument(
+        "--benchmark-analysis",
+        type=str,
+        metavar="PATH",
+        help="Time the loudnorm and native analysis backends on a file and compare their measurements"
+    )
+    group.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Time analysis and encode on generated test files for a grid of worker and thread counts, report the throughput and write the best settings to config.json (--workers caps the grid, --dry-run only reports)"
+    )
 
     parser.add_argument(
         "--dry-run",
@@ -36,6 +84,86 @@ def parse_args():
         help="Maximum number of concurrent worker threads to use for batch processing (default: auto-detect)"
     )
 
+    parser.add_argument(
+        "--analysis-backend",
+        choices=["loudnorm", "native"],
+        default=None,
+        help="First-pass loudness analysis backend: ffmpeg 'loudnorm' or the NumPy 'native' meter (default: ANALYSIS_BACKEND from config.json)"
+    )
+    parser.add_argument(
+        "--skip-policy",
+        choices=["off", "tagged", "measure"],
+        default=None,
+        help="Skip files that are already normalized: 'tagged' trusts cached measurements and our title tags, 'measure' also measures untagged files (default: SKIP_POLICY from config.json)"
+    )
+    parser.add_argument(
+        "--streams",
+        action="append",
+        type=_stream_selector_arg,
+        metavar="SELECTOR",
+        default=None,
+        help="Only normalize/boost matching audio streams and copy the rest: lang=eng,jpn, default, original, or audio stream positions like 0,2 (repeatable; default: STREAM_SELECTION from config.json)"
+    )
+    parser.add_argument(
+        "--output-root",
+        metavar="DIR",
+        default=None,
+        help="Write results under DIR, mirroring the input tree, instead of replacing originals; up-to-date outputs are skipped (default: OUTPUT_ROOT from config.json)"
+    )
+    parser.add_argument(
+        "--sidecar",
+        choices=["off", "mka", "tracks"],
+        default=None,
+        help="Write normalized audio of video files to sidecar .mka file(s) instead of rewriting the container (default: SIDECAR_MODE from config.json)"
+    )
+    parser.add_argument(
+        "--targets",
+        type=_targets_arg,
+        metavar="NAME[,NAME...]",
+        default=None,
+        help="Multi-target mode: only write these TARGET_PROFILES from config.json (default: all configured profiles)"
+    )
+
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        default=None,
+        help="Only process files whose relative path or name matches GLOB (repeatable; directory runs)"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        default=None,
+        help="Skip files and directories whose relative path or name matches GLOB (repeatable; directory runs)"
+    )
+    parser.add_argument(
+        "--min-size",
+        type=_size_arg,
+        metavar="SIZE",
+        default=None,
+        help="Skip files smaller than SIZE, e.g. 50M (directory runs)"
+    )
+    parser.add_argument(
+        "--max-size",
+        type=_size_arg,
+        metavar="SIZE",
+        default=None,
+        help="Skip files larger than SIZE, e.g. 20G (directory runs)"
+    )
+    parser.add_argument(
+        "--order",
+        choices=["scan", "longest", "shortest"],
+        default=None,
+        help="Job order of directory runs: scan order, longest estimated job first (shortest batch tail) or shortest first (default: JOB_ORDER from config.json)"
+    )
+    parser.add_argument(
+        "--only-changed",
+        action="store_true",
+        help="Only process files that are new or changed since they were last processed successfully (directory runs)"
+    )
+
     parser.add_argument(
         "--I",
         type=float,
@@ -76,10 +204,18 @@ def parse_args():
         print("Error: Normalization parameters cannot be used with --boost")
         sys.exit(1)
 
-    if args.normalize is None and any(provided_flags.values()):
+    chain = getattr(args, "chain", None)
+    if args.normalize is None and not chain and any(provided_flags.values()):
         print("Error: Normalization parameters require --normalize")
         sys.exit(1)
 
+    if chain:
+        try:
+            parse_chain(chain[1])
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
     if args.boost:
         if len(args.boost) != 2:
             print("Error: --boost requires a path and a percentage (e.g., --boost <file_or_dir> <percent>)")
@@ -90,7 +226,7 @@ def parse_args():
             print("Error: Boost percentage must be a number.")
             sys.exit(1)
 
-    if args.normalize is not None:
+    if args.normalize is not None or chain:
         if not provided_flags['I']:
             args.I = NORMALIZATION_PARAMS.get('I')
         if not provided_flags['TP']:
@@ -210,9 +210,13 @@ class AudioNormalizationCLI:
             return
         total = len(results)
         succeeded = sum(1 for r in results if r.get("status") == "Success")
-        failed = total - succeeded
+        skipped = sum(1 for r in results if r.get("status") == "Skipped")
+        failed = total - succeeded - skipped
 
-        summary = Text.assemble((f"{succeeded}", "bold green"), (" succeeded ", "dim"), ("• ", "dim"), (f"{failed}", "bold red"), (" failed", "dim"))
+        summary = Text.assemble((f"{succeeded}", "bold green"), (" succeeded ", "dim"), ("• ", "dim"))
+        if skipped:
+            summary.append_text(Text.assemble((f"{skipped}", "bold yellow"), (" skipped ", "dim"), ("• ", "dim")))
+        summary.append_text(Text.assemble((f"{failed}", "bold red"), (" failed", "dim")))
         self.console.rule("[bold cyan]Processing Complete[/bold cyan]")
         self.console.print(Align.center(summary))
 
@@ -221,7 +225,7 @@ class AudioNormalizationCLI:
             file_name = os.path.basename(r.get("file", ""))
             task = r.get("task", "")
             status = r.get("status", "")
-            status_color = "green" if status == "Success" else "red"
+            status_color = {"Success": "green", "Skipped": "yellow"}.get(status, "red")
             message = r.get("message", "")
 
             body = Text()
@@ -4,22 +4,27 @@ Command handling module for audio normalization and boosting.
 
 from processors.audio import AudioProcessor
 from processors.batch import BatchProcessor
+from processors.batch import calibration
+from core.config import SCRATCH_DIR, update_config
 from core.logger import Logger
 import os
 import subprocess
 import pathlib
 import shlex
+import shutil
+import tempfile
 
 
 class CommandHandler:
-    def __init__(self, max_workers: int = None):
+    def __init__(self, max_workers: int = None, processor_options: dict = None, scan_options: dict = None):
         self.logger = Logger()
-        self.batch_processor = BatchProcessor(max_workers=max_workers)
+        self.processor_options = processor_options or {}
+        self.batch_processor = BatchProcessor(max_workers=max_workers, processor_options=self.processor_options, scan_options=scan_options)
 
 
     def process_file(self, file_path: str, operation: str, **kwargs) -> bool:
         """Process a single audio file with the specified operation."""
-        processor = AudioProcessor()
+        processor = AudioProcessor(**self.processor_options)
         try:
             if operation == "boost":
                 boost_percent = float(kwargs.get('boost_percent', 0))
@@ -79,6 +84,86 @@ class CommandHandler:
             return []
         
         
+    def handle_chain(self, path: str, operations: str, dry_run: bool = False, max_workers: int = None):
+        """Handler to apply an operation chain (e.g. "normalize,boost=10") to the file or directory at `path`."""
+        safe_path = path.rstrip("/\\")
+        if os.path.isdir(path):
+            self.logger.info(f"Applying chain {operations} to directory: {safe_path}")
+            return self.batch_processor.chain_directory(path, operations, dry_run=dry_run, max_workers=max_workers)
+        elif os.path.isfile(path):
+            self.logger.info(f"Applying chain {operations} to {safe_path}")
+            return self.batch_processor.chain_files_with_progress([path], operations, dry_run=dry_run, max_workers=1)
+        else:
+            self.logger.error("Invalid file or directory path")
+            return []
+
+
+    def handle_benchmark_analysis(self, path: str):
+        """Handler to benchmark the loudnorm and native analysis backends on one file."""
+        if not os.path.isfile(path):
+            self.logger.error("Invalid file path provided")
+            return []
+        processor = AudioProcessor(**self.processor_options)
+        try:
+            report = processor.benchmark_analysis(path)
+        except Exception as e:
+            self.logger.error(f"Analysis benchmark failed for {path}: {e}")
+            return [{"file": path, "task": "Analysis benchmark", "status": "Failed", "message": str(e)}]
+        lines = [f"loudnorm: {report['loudnorm_seconds']:.2f}s  native: {report['native_seconds']:.2f}s"]
+        for i, stream in enumerate(report["streams"]):
+            delta = ", ".join(f"{k} {v:+.2f}" for k, v in stream["delta"].items())
+            lines.append(f"Stream {i}: {delta}" + ("" if stream["within_tolerance"] else " (outside tolerance)"))
+        ok = all(s["within_tolerance"] for s in report["streams"])
+        return [{
+            "file": path,
+            "task": "Analysis benchmark",
+            "status": "Success" if ok else "Failed",
+            "message": "\n".join(lines),
+        }]
+
+
+    def handle_calibrate(self, max_workers: int = None, dry_run: bool = False):
+        """Handler to time the batch stages on generated test files and store the best settings in config.json.
+
+        `max_workers` caps the worker counts tried (default: number of CPUs); with `dry_run`
+        the results are only reported.
+        """
+        options = dict(self.processor_options, skip_policy="off", sidecar_mode="off")
+
+        def make_processor(output_root: str):
+            return AudioProcessor(**dict(options, output_root=output_root))
+
+        try:
+            if SCRATCH_DIR:
+                os.makedirs(SCRATCH_DIR, exist_ok=True)
+            work_dir = tempfile.mkdtemp(prefix="calibrate_", dir=SCRATCH_DIR or None)
+        except OSError as e:
+            self.logger.error(f"Calibration failed: {e}")
+            return [{"file": "config.json", "task": "Calibration", "status": "Failed", "message": str(e)}]
+        try:
+            report = calibration.calibrate(work_dir, make_processor, max_workers=max_workers, progress=self.logger.info)
+        except Exception as e:
+            self.logger.error(f"Calibration failed: {e}")
+            return [{"file": "config.json", "task": "Calibration", "status": "Failed", "message": str(e)}]
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        lines = ["Workers  Threads  Analysis  Encode (x realtime)"]
+        for p in report["points"]:
+            lines.append(f"{p['workers']:>7}  {p['threads']:>7}  {p['analysis']:>8.1f}  {p['encode']:>6.1f}")
+        values = dict(report["settings"], CODEC_COST_FACTORS=report["codec_factors"])
+        lines.append(", ".join(f"{k}={v}" for k, v in report["settings"].items()))
+        if dry_run:
+            lines.append("Dry run: config.json not changed")
+        else:
+            try:
+                path = update_config(values)
+            except Exception as e:
+                self.logger.error(f"Could not write calibration results: {e}")
+                return [{"file": "config.json", "task": "Calibration", "status": "Failed", "message": "\n".join(lines + [str(e)])}]
+            self.logger.info(f"Calibration results written to {path}")
+        return [{"file": "config.json", "task": "Calibration", "status": "Success", "message": "\n".join(lines)}]
+
+
     def setup_ffmpeg(self) -> list:
         """Automate the installation of FFmpeg on Windows using Scoop."""
         results = []
@@ -44,6 +44,170 @@ LOG_FFMPEG_DEBUG = "ffmpeg_debug.log"
 
 TEMP_SUFFIX = "_temp_processing"
 
+# Directory scanner. SCAN_WORKERS directories are listed concurrently. When SCAN_INDEX_ENABLED,
+# files processed successfully are recorded with their size and mtime in SCAN_INDEX_FILE
+# (resolved inside LOG_DIR), so `--only-changed` runs only pick up new or modified files.
+SCAN_WORKERS = 8
+SCAN_INDEX_ENABLED = True
+SCAN_INDEX_FILE = "scan_index.sqlite"
+
+# Job order of directory runs: "scan" starts files in scan order (default), "longest" starts
+# the files with the highest estimated cost (duration x audio streams x codec factor) first so
+# the batch does not end on one long file, "shortest" the cheapest first for quick early
+# results. Upcoming files are probed ahead by PROBE_PREFETCH_WORKERS threads, ORDER_WINDOW
+# files at a time (0 = the whole batch is probed and ordered before the first file starts,
+# which delays the start of large batches).
+JOB_ORDER = "scan"
+ORDER_WINDOW = 200
+PROBE_PREFETCH_WORKERS = 4
+# Per-codec cost factors (relative to AAC) measured on this machine by `--calibrate`; they
+# replace the built-in estimates of the job order for these codecs. Empty = built-in only.
+CODEC_COST_FACTORS: Dict[str, float] = {}
+
+# Pipelined batch normalize. Files pass through an analysis stage (probe, skip check, first
+# pass) and an encode stage (second pass, remux, rename) connected by a bounded queue, so the
+# analysis of upcoming files overlaps with the encoding of earlier ones. ANALYSIS_WORKERS and
+# ENCODE_WORKERS limit each stage independently (0 = the batch worker count, `--workers`).
+ANALYSIS_WORKERS = 0
+ENCODE_WORKERS = 0
+
+# Persistent first-pass loudness cache. Measurements are keyed by path, size, mtime and a
+# partial content hash, so unchanged files go straight to the encode pass. A relative
+# ANALYSIS_CACHE_FILE is resolved inside LOG_DIR.
+ANALYSIS_CACHE_ENABLED = True
+ANALYSIS_CACHE_FILE = "analysis_cache.sqlite"
+
+# First-pass analysis backend:
+# - "loudnorm": ffmpeg's loudnorm filter (default; no extra dependencies).
+# - "native": ffmpeg decodes to raw float PCM and a NumPy EBU R128 meter computes the
+#    measurements. Requires numpy; falls back to "loudnorm" when it is not installed.
+ANALYSIS_BACKEND = "loudnorm"
+
+# Segmented analysis (native backend only). Files at least SEGMENT_ANALYSIS_MIN_DURATION
+# seconds long are split into time segments of at least SEGMENT_ANALYSIS_MIN_SEGMENT seconds
+# that are decoded and measured in parallel; the per-segment gating histograms are merged,
+# so the result matches a single pass. SEGMENT_ANALYSIS_WORKERS caps the number of segments
+# (0 = number of CPUs). Set SEGMENT_ANALYSIS_MIN_DURATION to 0 to disable.
+SEGMENT_ANALYSIS_MIN_DURATION = 1800
+SEGMENT_ANALYSIS_MIN_SEGMENT = 300
+SEGMENT_ANALYSIS_WORKERS = 0
+
+# Segment-parallel encode (opt-in). When every audio stream only needs a linear gain (always
+# for boost; for normalize when loudnorm would run in linear mode) and the file is at least
+# SEGMENTED_ENCODE_MIN_DURATION seconds long, each stream is encoded as frame-aligned chunks
+# of at least SEGMENTED_ENCODE_MIN_CHUNK seconds in parallel (up to SEGMENTED_ENCODE_WORKERS
+# processes, 0 = number of CPUs), then concatenated and remuxed with the copied video and
+# subtitles. Only aac, ac3, eac3 and mp2 output is chunked. 0 disables it (default).
+SEGMENTED_ENCODE_MIN_DURATION = 0
+SEGMENTED_ENCODE_MIN_CHUNK = 120
+SEGMENTED_ENCODE_WORKERS = 0
+
+# Total CPU threads shared by all ffmpeg processes running at once. Every ffmpeg run reserves
+# an explicit `-threads` / `-filter_threads` count from this budget according to its stage and
+# number of audio streams, instead of each process sizing itself to the whole machine.
+# 0 = number of CPUs.
+THREAD_BUDGET = 0
+
+# Admission control for batch jobs. A job starts only when its estimated memory fits
+# MEMORY_BUDGET_MB (0 = half of the installed memory) and the disk it reads from runs fewer
+# than IO_JOBS_PER_DEVICE jobs (0 = no per-disk limit; 1-2 suits spinning disks, where
+# parallel reads of large files thrash the heads). Jobs waiting for the same disk are
+# started directory by directory.
+MEMORY_BUDGET_MB = 0
+IO_JOBS_PER_DEVICE = 0
+
+# Adaptive batch concurrency. With AUTOSCALE_ENABLED the number of jobs each pipeline stage
+# runs at once follows the system load (load average, CPU and I/O wait, free memory),
+# sampled every AUTOSCALE_INTERVAL seconds. It starts at the worker count and stays between
+# AUTOSCALE_MIN_WORKERS and AUTOSCALE_MAX_WORKERS (0 = number of CPUs, at least the worker
+# count). Shrinking only holds back new jobs; running jobs are never interrupted.
+AUTOSCALE_ENABLED = False
+AUTOSCALE_MIN_WORKERS = 1
+AUTOSCALE_MAX_WORKERS = 0
+AUTOSCALE_INTERVAL = 10
+
+# Directory for temporary files: encode temp outputs, segment chunks and audio-only working
+# copies. Empty = temp outputs next to the source and working copies in the system temp
+# directory. Point it at local NVMe or tmpfs when the library lives on a NAS.
+SCRATCH_DIR = ""
+
+# Output tree. When set, results are written to OUTPUT_ROOT at the same path relative to the
+# processed directory (single files: directly into OUTPUT_ROOT) and originals are never
+# modified, so runs can read from read-only snapshots. Files whose output is newer than the
+# input are skipped, make-style. Empty = replace files in place (default). `--output-root`
+# overrides it for one run.
+OUTPUT_ROOT = ""
+
+# Local staging for libraries on network shares. When enabled, batch normalization copies each
+# file to SCRATCH_DIR (system temp directory when empty) with large sequential reads, processes
+# the local copy and copies the result back, checksum-verified, with an atomic rename. A
+# background thread stages up to STAGING_PREFETCH files ahead of the ones being processed.
+STAGING_ENABLED = False
+STAGING_PREFETCH = 2
+
+# Files of at least AUDIO_WORKING_COPY_MIN_MB megabytes are analyzed from an audio-only working
+# copy: the selected audio streams are first stream-copied (`-c copy`) into a temporary .mka in
+# SCRATCH_DIR, every analysis decode reads that copy, and the large original is read again
+# only for the final mux. 0 disables it (default).
+AUDIO_WORKING_COPY_MIN_MB = 0
+
+# Audio streams to normalize/boost; the others are copied untouched (no analysis, no encode).
+# A list of selectors whose matches are combined: "lang=eng,jpn" (language tag), "default" /
+# "original" / "comment" / ... (disposition flag), "0,2" (audio stream positions). Empty = all.
+# `--streams` overrides it for one run.
+STREAM_SELECTION = []
+
+# When normalizing, audio streams whose measurement is already within SKIP_TOLERANCE of
+# NORMALIZATION_PARAMS are stream-copied (`-c:a:N copy`); only the other streams are re-encoded.
+STREAM_COPY_IN_TOLERANCE = True
+
+# Sidecar audio output for files with video: instead of rewriting the container, normalizing
+# writes only the selected audio streams next to it ("mka": one {stem}.normalized.mka with
+# all of them; "tracks": one {stem}.{track}.{lang}.mka per stream) and leaves the original
+# untouched. With a skip policy, files whose sidecars are newer than the source are skipped.
+# "off" = rewrite the container (default). `--sidecar` overrides it for one run.
+SIDECAR_MODE = "off"
+
+# Multi-target normalization. Each profile is {"name", "I", "TP", "LRA", optional "output"}
+# (TP/LRA default to NORMALIZATION_PARAMS). When profiles are set, normalizing analyzes a file
+# once and writes one output per profile from a single ffmpeg run (asplit), leaving the source
+# untouched. Outputs are named by the profile's "output" or TARGET_OUTPUT_TEMPLATE; placeholders
+# {stem}, {ext}, {name}, {I}, {TP}, {LRA}; relative paths are next to the source. `--targets`
+# picks a subset of the profiles for one run. Empty list = normalize in place (default).
+TARGET_PROFILES = []
+TARGET_OUTPUT_TEMPLATE = "{stem}.{name}{ext}"
+
+# Metadata-only normalization ("tag" mode) for the audio-only extensions listed in
+# TAG_MODE_EXTENSIONS (supported: .mp3, .flac, .ogg, .m4a, .opus). Instead of re-encoding,
+# the measured loudness is written as ReplayGain 2.0 track/album gain and peak tags (Opus:
+# R128_TRACK_GAIN / R128_ALBUM_GAIN) with a stream-copy remux. ReplayGain gains are relative
+# to REPLAYGAIN_REFERENCE_LUFS; R128 gains are always relative to -23 LUFS. In batch runs,
+# files tagged in the same directory also get album tags. Empty list = always re-encode.
+TAG_MODE_EXTENSIONS = []
+REPLAYGAIN_REFERENCE_LUFS = -18.0
+
+# Lossless MP3 gain. For single-stream MP3 files (output codec "inherit" or "mp3"), boost and
+# linear-mode normalization change each frame's global_gain field instead of re-encoding,
+# when the gain is a multiple of 1.5 dB within LOSSLESS_GAIN_TOLERANCE_DB (and, for
+# normalization, the rounded gain keeps the true peak within the target).
+LOSSLESS_GAIN_ENABLED = True
+LOSSLESS_GAIN_TOLERANCE_DB = 0.5
+
+# Skip policy for files that do not need normalizing:
+# - "off": always re-encode every file (default).
+# - "tagged": skip files whose cached measurements are within SKIP_TOLERANCE of
+#    NORMALIZATION_PARAMS, or (without a cached measurement) whose audio tracks all carry the
+#    "[molexAudio Normalized]" title tag.
+# - "measure": like "tagged", but untagged files without a cached measurement are measured
+#    first; the measurement is cached, so files that do need work go straight to the encode pass.
+# SKIP_TOLERANCE: "I" is the allowed integrated loudness deviation (LU) in either direction,
+# "TP" the allowed true peak overshoot (dB) above the target.
+SKIP_POLICY = "off"
+SKIP_TOLERANCE: Dict[str, float] = {
+    "I": 1.0,
+    "TP": 0.5,
+}
+
 
 
 #! ---- Helper functions to load and override config from JSON file ---- !#
@@ -70,6 +234,47 @@ def _write_default_config(path: str) -> None:
         "LOG_FILE": LOG_FILE,
         "LOG_FFMPEG_DEBUG": LOG_FFMPEG_DEBUG,
         "TEMP_SUFFIX": TEMP_SUFFIX,
+        "SCAN_WORKERS": SCAN_WORKERS,
+        "JOB_ORDER": JOB_ORDER,
+        "ORDER_WINDOW": ORDER_WINDOW,
+        "PROBE_PREFETCH_WORKERS": PROBE_PREFETCH_WORKERS,
+        "CODEC_COST_FACTORS": CODEC_COST_FACTORS,
+        "SCAN_INDEX_ENABLED": SCAN_INDEX_ENABLED,
+        "SCAN_INDEX_FILE": SCAN_INDEX_FILE,
+        "ANALYSIS_WORKERS": ANALYSIS_WORKERS,
+        "ENCODE_WORKERS": ENCODE_WORKERS,
+        "ANALYSIS_CACHE_ENABLED": ANALYSIS_CACHE_ENABLED,
+        "ANALYSIS_CACHE_FILE": ANALYSIS_CACHE_FILE,
+        "ANALYSIS_BACKEND": ANALYSIS_BACKEND,
+        "SEGMENT_ANALYSIS_MIN_DURATION": SEGMENT_ANALYSIS_MIN_DURATION,
+        "SEGMENT_ANALYSIS_MIN_SEGMENT": SEGMENT_ANALYSIS_MIN_SEGMENT,
+        "SEGMENT_ANALYSIS_WORKERS": SEGMENT_ANALYSIS_WORKERS,
+        "SEGMENTED_ENCODE_MIN_DURATION": SEGMENTED_ENCODE_MIN_DURATION,
+        "SEGMENTED_ENCODE_MIN_CHUNK": SEGMENTED_ENCODE_MIN_CHUNK,
+        "SEGMENTED_ENCODE_WORKERS": SEGMENTED_ENCODE_WORKERS,
+        "THREAD_BUDGET": THREAD_BUDGET,
+        "MEMORY_BUDGET_MB": MEMORY_BUDGET_MB,
+        "IO_JOBS_PER_DEVICE": IO_JOBS_PER_DEVICE,
+        "AUTOSCALE_ENABLED": AUTOSCALE_ENABLED,
+        "AUTOSCALE_MIN_WORKERS": AUTOSCALE_MIN_WORKERS,
+        "AUTOSCALE_MAX_WORKERS": AUTOSCALE_MAX_WORKERS,
+        "AUTOSCALE_INTERVAL": AUTOSCALE_INTERVAL,
+        "SCRATCH_DIR": SCRATCH_DIR,
+        "OUTPUT_ROOT": OUTPUT_ROOT,
+        "STAGING_ENABLED": STAGING_ENABLED,
+        "STAGING_PREFETCH": STAGING_PREFETCH,
+        "AUDIO_WORKING_COPY_MIN_MB": AUDIO_WORKING_COPY_MIN_MB,
+        "STREAM_SELECTION": STREAM_SELECTION,
+        "STREAM_COPY_IN_TOLERANCE": STREAM_COPY_IN_TOLERANCE,
+        "SIDECAR_MODE": SIDECAR_MODE,
+        "TARGET_PROFILES": TARGET_PROFILES,
+        "TARGET_OUTPUT_TEMPLATE": TARGET_OUTPUT_TEMPLATE,
+        "TAG_MODE_EXTENSIONS": TAG_MODE_EXTENSIONS,
+        "REPLAYGAIN_REFERENCE_LUFS": REPLAYGAIN_REFERENCE_LUFS,
+        "LOSSLESS_GAIN_ENABLED": LOSSLESS_GAIN_ENABLED,
+        "LOSSLESS_GAIN_TOLERANCE_DB": LOSSLESS_GAIN_TOLERANCE_DB,
+        "SKIP_POLICY": SKIP_POLICY,
+        "SKIP_TOLERANCE": SKIP_TOLERANCE,
     }
     try:
         with open(path, "w", encoding="utf-8") as fh:
@@ -78,6 +283,24 @@ def _write_default_config(path: str) -> None:
         pass
 
 
+def update_config(values: Dict[str, Any]) -> str:
+    """Merge `values` into config.json (keeping all other keys) and return its path.
+
+    The running process keeps the values it loaded; the new ones apply from the next start.
+    """
+    path = _get_config_path()
+    data: Dict[str, Any] = {}
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    data.update(values)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return path
+
+
 def _load_json_config():
     """Load configuration overrides from a JSON file."""
     path = _get_config_path()
@@ -92,6 +315,16 @@ def _load_json_config():
 
     global VERSION, NORMALIZATION_PARAMS, SUPPORTED_EXTENSIONS
     global AUDIO_CODEC, AUDIO_BITRATE, LOG_DIR, LOG_FILE, LOG_FFMPEG_DEBUG, TEMP_SUFFIX
+    global SCAN_WORKERS, SCAN_INDEX_ENABLED, SCAN_INDEX_FILE, JOB_ORDER, ORDER_WINDOW, PROBE_PREFETCH_WORKERS
+    global CODEC_COST_FACTORS, ANALYSIS_WORKERS, ENCODE_WORKERS
+    global STREAM_SELECTION, STREAM_COPY_IN_TOLERANCE, TAG_MODE_EXTENSIONS, REPLAYGAIN_REFERENCE_LUFS
+    global TARGET_PROFILES, TARGET_OUTPUT_TEMPLATE, SIDECAR_MODE
+    global LOSSLESS_GAIN_ENABLED, LOSSLESS_GAIN_TOLERANCE_DB
+    global ANALYSIS_CACHE_ENABLED, ANALYSIS_CACHE_FILE, ANALYSIS_BACKEND, SKIP_POLICY
+    global SEGMENT_ANALYSIS_MIN_DURATION, SEGMENT_ANALYSIS_MIN_SEGMENT, SEGMENT_ANALYSIS_WORKERS
+    global SEGMENTED_ENCODE_MIN_DURATION, SEGMENTED_ENCODE_MIN_CHUNK, SEGMENTED_ENCODE_WORKERS
+    global AUTOSCALE_ENABLED, AUTOSCALE_MIN_WORKERS, AUTOSCALE_MAX_WORKERS, AUTOSCALE_INTERVAL
+    global THREAD_BUDGET, MEMORY_BUDGET_MB, IO_JOBS_PER_DEVICE, SCRATCH_DIR, OUTPUT_ROOT, AUDIO_WORKING_COPY_MIN_MB, STAGING_ENABLED, STAGING_PREFETCH
 
     if isinstance(data.get("VERSION"), str):
         VERSION = data.get("VERSION")
@@ -124,4 +357,97 @@ def _load_json_config():
     if isinstance(data.get("TEMP_SUFFIX"), str):
         TEMP_SUFFIX = data.get("TEMP_SUFFIX")
 
+    if isinstance(data.get("SCAN_WORKERS"), int) and data.get("SCAN_WORKERS") > 0:
+        SCAN_WORKERS = data.get("SCAN_WORKERS")
+    if isinstance(data.get("SCAN_INDEX_ENABLED"), bool):
+        SCAN_INDEX_ENABLED = data.get("SCAN_INDEX_ENABLED")
+    if isinstance(data.get("SCAN_INDEX_FILE"), str):
+        SCAN_INDEX_FILE = data.get("SCAN_INDEX_FILE")
+    if data.get("JOB_ORDER") in ("scan", "longest", "shortest"):
+        JOB_ORDER = data.get("JOB_ORDER")
+    if isinstance(data.get("ORDER_WINDOW"), int) and data.get("ORDER_WINDOW") >= 0:
+        ORDER_WINDOW = data.get("ORDER_WINDOW")
+    if isinstance(data.get("PROBE_PREFETCH_WORKERS"), int) and data.get("PROBE_PREFETCH_WORKERS") > 0:
+        PROBE_PREFETCH_WORKERS = data.get("PROBE_PREFETCH_WORKERS")
+    if isinstance(data.get("CODEC_COST_FACTORS"), dict):
+        CODEC_COST_FACTORS = {str(k).lower(): float(v) for k, v in data.get("CODEC_COST_FACTORS").items()
+                              if isinstance(v, (int, float)) and v > 0}
+    if isinstance(data.get("ANALYSIS_WORKERS"), int) and data.get("ANALYSIS_WORKERS") >= 0:
+        ANALYSIS_WORKERS = data.get("ANALYSIS_WORKERS")
+    if isinstance(data.get("ENCODE_WORKERS"), int) and data.get("ENCODE_WORKERS") >= 0:
+        ENCODE_WORKERS = data.get("ENCODE_WORKERS")
+    if isinstance(data.get("THREAD_BUDGET"), int) and data.get("THREAD_BUDGET") >= 0:
+        THREAD_BUDGET = data.get("THREAD_BUDGET")
+    if isinstance(data.get("MEMORY_BUDGET_MB"), (int, float)) and data.get("MEMORY_BUDGET_MB") >= 0:
+        MEMORY_BUDGET_MB = data.get("MEMORY_BUDGET_MB")
+    if isinstance(data.get("IO_JOBS_PER_DEVICE"), int) and data.get("IO_JOBS_PER_DEVICE") >= 0:
+        IO_JOBS_PER_DEVICE = data.get("IO_JOBS_PER_DEVICE")
+    if isinstance(data.get("AUTOSCALE_ENABLED"), bool):
+        AUTOSCALE_ENABLED = data.get("AUTOSCALE_ENABLED")
+    if isinstance(data.get("AUTOSCALE_MIN_WORKERS"), int) and data.get("AUTOSCALE_MIN_WORKERS") > 0:
+        AUTOSCALE_MIN_WORKERS = data.get("AUTOSCALE_MIN_WORKERS")
+    if isinstance(data.get("AUTOSCALE_MAX_WORKERS"), int) and data.get("AUTOSCALE_MAX_WORKERS") >= 0:
+        AUTOSCALE_MAX_WORKERS = data.get("AUTOSCALE_MAX_WORKERS")
+    if isinstance(data.get("AUTOSCALE_INTERVAL"), (int, float)) and data.get("AUTOSCALE_INTERVAL") > 0:
+        AUTOSCALE_INTERVAL = data.get("AUTOSCALE_INTERVAL")
+    if isinstance(data.get("SCRATCH_DIR"), str):
+        SCRATCH_DIR = data.get("SCRATCH_DIR")
+    if isinstance(data.get("OUTPUT_ROOT"), str):
+        OUTPUT_ROOT = data.get("OUTPUT_ROOT")
+    if isinstance(data.get("STAGING_ENABLED"), bool):
+        STAGING_ENABLED = data.get("STAGING_ENABLED")
+    if isinstance(data.get("STAGING_PREFETCH"), int) and data.get("STAGING_PREFETCH") >= 0:
+        STAGING_PREFETCH = data.get("STAGING_PREFETCH")
+    if isinstance(data.get("AUDIO_WORKING_COPY_MIN_MB"), (int, float)):
+        AUDIO_WORKING_COPY_MIN_MB = max(float(data.get("AUDIO_WORKING_COPY_MIN_MB")), 0.0)
+    if isinstance(data.get("STREAM_SELECTION"), list):
+        STREAM_SELECTION = [str(v) for v in data.get("STREAM_SELECTION")]
+    elif isinstance(data.get("STREAM_SELECTION"), str):
+        STREAM_SELECTION = [data.get("STREAM_SELECTION")]
+    if isinstance(data.get("STREAM_COPY_IN_TOLERANCE"), bool):
+        STREAM_COPY_IN_TOLERANCE = data.get("STREAM_COPY_IN_TOLERANCE")
+    if data.get("SIDECAR_MODE") in ("off", "mka", "tracks"):
+        SIDECAR_MODE = data.get("SIDECAR_MODE")
+    if isinstance(data.get("TARGET_PROFILES"), list):
+        TARGET_PROFILES = [p for p in data.get("TARGET_PROFILES") if isinstance(p, dict)]
+    if isinstance(data.get("TARGET_OUTPUT_TEMPLATE"), str) and data.get("TARGET_OUTPUT_TEMPLATE"):
+        TARGET_OUTPUT_TEMPLATE = data.get("TARGET_OUTPUT_TEMPLATE")
+    if isinstance(data.get("TAG_MODE_EXTENSIONS"), list):
+        TAG_MODE_EXTENSIONS = [str(e).lower() for e in data.get("TAG_MODE_EXTENSIONS")]
+    if isinstance(data.get("REPLAYGAIN_REFERENCE_LUFS"), (int, float)):
+        REPLAYGAIN_REFERENCE_LUFS = float(data.get("REPLAYGAIN_REFERENCE_LUFS"))
+    if isinstance(data.get("LOSSLESS_GAIN_ENABLED"), bool):
+        LOSSLESS_GAIN_ENABLED = data.get("LOSSLESS_GAIN_ENABLED")
+    if isinstance(data.get("LOSSLESS_GAIN_TOLERANCE_DB"), (int, float)) and data.get("LOSSLESS_GAIN_TOLERANCE_DB") >= 0:
+        LOSSLESS_GAIN_TOLERANCE_DB = float(data.get("LOSSLESS_GAIN_TOLERANCE_DB"))
+
+    if isinstance(data.get("ANALYSIS_CACHE_ENABLED"), bool):
+        ANALYSIS_CACHE_ENABLED = data.get("ANALYSIS_CACHE_ENABLED")
+    if isinstance(data.get("ANALYSIS_CACHE_FILE"), str):
+        ANALYSIS_CACHE_FILE = data.get("ANALYSIS_CACHE_FILE")
+
+    if data.get("ANALYSIS_BACKEND") in ("loudnorm", "native"):
+        ANALYSIS_BACKEND = data.get("ANALYSIS_BACKEND")
+    if isinstance(data.get("SEGMENT_ANALYSIS_MIN_DURATION"), (int, float)):
+        SEGMENT_ANALYSIS_MIN_DURATION = max(float(data.get("SEGMENT_ANALYSIS_MIN_DURATION")), 0.0)
+    if isinstance(data.get("SEGMENT_ANALYSIS_MIN_SEGMENT"), (int, float)):
+        SEGMENT_ANALYSIS_MIN_SEGMENT = max(float(data.get("SEGMENT_ANALYSIS_MIN_SEGMENT")), 1.0)
+    if isinstance(data.get("SEGMENT_ANALYSIS_WORKERS"), int):
+        SEGMENT_ANALYSIS_WORKERS = max(data.get("SEGMENT_ANALYSIS_WORKERS"), 0)
+    if isinstance(data.get("SEGMENTED_ENCODE_MIN_DURATION"), (int, float)):
+        SEGMENTED_ENCODE_MIN_DURATION = max(float(data.get("SEGMENTED_ENCODE_MIN_DURATION")), 0.0)
+    if isinstance(data.get("SEGMENTED_ENCODE_MIN_CHUNK"), (int, float)):
+        SEGMENTED_ENCODE_MIN_CHUNK = max(float(data.get("SEGMENTED_ENCODE_MIN_CHUNK")), 1.0)
+    if isinstance(data.get("SEGMENTED_ENCODE_WORKERS"), int):
+        SEGMENTED_ENCODE_WORKERS = max(data.get("SEGMENTED_ENCODE_WORKERS"), 0)
+    if data.get("SKIP_POLICY") in ("off", "tagged", "measure"):
+        SKIP_POLICY = data.get("SKIP_POLICY")
+    st = data.get("SKIP_TOLERANCE")
+    if isinstance(st, dict):
+        for k, v in st.items():
+            try:
+                SKIP_TOLERANCE[k] = float(v)
+            except Exception:
+                pass
+
 _load_json_config()
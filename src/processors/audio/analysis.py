@@ -0,0 +1,117 @@
+"""
+Loudness analysis helpers (single-decode loudnorm first pass).
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+
+_LABELED_BLOCK_RE = re.compile(r"\[Parsed_loudnorm_(\d+)[^\]]*\]\s*(\{[^{}]*\})", re.DOTALL)
+_BLOCK_RE = re.compile(r"\{[^{}]*\}", re.DOTALL)
+
+
+def loudnorm_analysis_filter(params: Dict[str, float]) -> str:
+    """Build the measurement-only loudnorm filter string for the given targets."""
+    return f"loudnorm=I={params['I']}:TP={params['TP']}:LRA={params['LRA']}:print_format=json"
+
+
+def loudnorm_second_pass_filter(metadata: Dict[str, Any], params: Dict[str, float], offset: Optional[Any] = None) -> str:
+    """Build the second-pass loudnorm filter that applies first-pass measurements for the given targets."""
+    if offset is None:
+        offset = metadata.get('target_offset', 0)
+    return (
+        f"loudnorm="
+        f"I={params['I']}:"
+        f"TP={params['TP']}:"
+        f"LRA={params['LRA']}:"
+        f"measured_I={metadata['input_i']}:"
+        f"measured_TP={metadata['input_tp']}:"
+        f"measured_LRA={metadata['input_lra']}:"
+        f"measured_thresh={metadata['input_thresh']}:"
+        f"offset={offset}"
+    )
+
+
+def build_analysis_command(media_path: str, stream_count: int, params: Dict[str, float], positions: Optional[List[int]] = None) -> List[str]:
+    """Build one ffmpeg command that measures every audio stream from a single read of the input.
+
+    A single stream keeps the plain `-af` form; multiple streams get one loudnorm per
+    `[0:a:i]` inside a `filter_complex`, all mapped into one null output. `positions`
+    picks the input audio streams to measure (default: the first `stream_count`).
+    """
+    positions = list(positions) if positions is not None else list(range(stream_count))
+    if stream_count <= 1:
+        return [
+            "ffmpeg", "-i", media_path,
+            "-threads", "0",
+            "-map", f"0:a:{positions[0] if positions else 0}",
+            "-af", loudnorm_analysis_filter(params),
+            "-f", "null", "-"
+        ]
+    graph = ";".join(f"[0:a:{p}]{loudnorm_analysis_filter(params)}[m{i}]" for i, p in enumerate(positions))
+    cmd = ["ffmpeg", "-i", media_path, "-threads", "0", "-filter_complex", graph]
+    for i in range(stream_count):
+        cmd.extend(["-map", f"[m{i}]"])
+    cmd.extend(["-f", "null", "-"])
+    return cmd
+
+
+def build_audio_copy_command(media_path: str, positions: List[int], output_path: str) -> List[str]:
+    """Build the stream-copy extraction of the given audio streams into an audio-only Matroska file."""
+    cmd = ["ffmpeg", "-y", "-i", media_path]
+    for p in positions:
+        cmd.extend(["-map", f"0:a:{p}"])
+    cmd.extend(["-c", "copy", "-f", "matroska", output_path])
+    return cmd
+
+
+def parse_loudnorm_output(output: str, stream_count: int) -> List[Dict[str, Any]]:
+    """Extract one loudnorm JSON block per stream from ffmpeg stderr, in stream order."""
+    labeled = _LABELED_BLOCK_RE.findall(output or "")
+    if labeled:
+        blocks = [block for _, block in sorted(labeled, key=lambda m: int(m[0]))]
+    else:
+        blocks = _BLOCK_RE.findall(output or "")
+    loudness_data = []
+    for i in range(stream_count):
+        if i >= len(blocks):
+            raise ValueError(f"Failed to get loudness data for stream {i}")
+        try:
+            loudness_data.append(json.loads(blocks[i]))
+        except Exception:
+            raise ValueError(f"Failed to get loudness data for stream {i}")
+    return loudness_data
+
+
+def within_tolerance(metadata: Dict[str, Any], params: Dict[str, float], tolerance: Dict[str, float]) -> bool:
+    """Return True if measured loudness/true peak already meet the target within tolerance."""
+    try:
+        input_i = float(metadata["input_i"])
+        input_tp = float(metadata["input_tp"])
+    except Exception:
+        return False
+    if abs(input_i - float(params["I"])) > float(tolerance.get("I", 0.0)):
+        return False
+    return input_tp <= float(params["TP"]) + float(tolerance.get("TP", 0.0))
+
+
+def linear_gain_db(metadata: Dict[str, Any], params: Dict[str, float]) -> Optional[float]:
+    """Return the gain loudnorm applies in linear mode, or None if it would switch to dynamic mode.
+
+    Mirrors loudnorm's own check: the file is not silent, its loudness range fits
+    the target and applying the gain keeps the true peak at or below the target.
+    """
+    try:
+        input_i = float(metadata["input_i"])
+        input_tp = float(metadata["input_tp"])
+        input_lra = float(metadata["input_lra"])
+        input_thresh = float(metadata["input_thresh"])
+    except Exception:
+        return None
+    if input_thresh <= -70.0 or input_lra > float(params["LRA"]):
+        return None
+    gain = float(params["I"]) - input_i
+    if input_tp + gain > float(params["TP"]):
+        return None
+    return gain
@@ -0,0 +1,163 @@
+"""
+Persistent loudness-analysis cache (SQLite) keyed by file identity.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional
+from core.config import LOG_DIR, ANALYSIS_CACHE_FILE
+
+
+MEASURED_KEYS = ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")
+PARTIAL_HASH_BYTES = 64 * 1024
+
+
+def default_cache_path() -> str:
+    """Resolve the cache database path the same way the logger resolves LOG_DIR."""
+    return os.path.join(os.getcwd(), LOG_DIR, ANALYSIS_CACHE_FILE)
+
+
+def file_identity(media_path: str) -> Optional[Dict[str, Any]]:
+    """Return (path, size, mtime, partial hash) identity of a file, or None if it cannot be read."""
+    try:
+        st = os.stat(media_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(st.st_size).encode("ascii"))
+        with open(media_path, "rb") as fh:
+            digest.update(fh.read(PARTIAL_HASH_BYTES))
+            if st.st_size > 2 * PARTIAL_HASH_BYTES:
+                fh.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+                digest.update(fh.read(PARTIAL_HASH_BYTES))
+        return {
+            "path": os.path.abspath(media_path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": digest.hexdigest(),
+        }
+    except OSError:
+        return None
+
+
+def _same_target(a: Optional[Dict[str, float]], b: Dict[str, float]) -> bool:
+    """Compare two I/TP/LRA target dicts numerically."""
+    if not a:
+        return False
+    try:
+        return all(abs(float(a[k]) - float(b[k])) < 1e-9 for k in ("I", "TP", "LRA"))
+    except Exception:
+        return False
+
+
+class LoudnessCache:
+    """Stores per-stream first-pass measurements so unchanged files skip analysis.
+
+    Measured input values do not depend on the normalization target; only
+    `target_offset` does, so it is reset to 0 when a cached entry is read back
+    for a different target than it was measured with.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_cache_path()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use."""
+        if not self._ready:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._ready:
+            with self._lock:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS loudness ("
+                    "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, hash TEXT, "
+                    "target TEXT, streams TEXT, updated REAL)"
+                )
+                conn.commit()
+                self._ready = True
+        return conn
+
+    def _read(self, ident: Dict[str, Any]):
+        """Return (stored target, per-stream data) of the row for an unchanged file, or None."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT size, mtime_ns, hash, target, streams FROM loudness WHERE path = ?",
+                    (ident["path"],),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return None
+        if not row:
+            return None
+        size, mtime_ns, digest, target, streams = row
+        if size != ident["size"] or mtime_ns != ident["mtime_ns"] or digest != ident["hash"]:
+            return None
+        try:
+            data = json.loads(streams)
+            stored_target = json.loads(target) if target else None
+        except ValueError:
+            return None
+        if not isinstance(data, list):
+            return None
+        return stored_target, data
+
+    def get(self, media_path: str, params: Dict[str, float], stream_count: Optional[int] = None) -> Optional[List[Optional[Dict[str, Any]]]]:
+        """Return cached loudness data for an unchanged file, or None on a miss.
+
+        Streams that were never measured (outside an earlier stream selection) are None.
+        """
+        ident = file_identity(media_path)
+        if ident is None:
+            return None
+        found = self._read(ident)
+        if found is None:
+            return None
+        stored_target, data = found
+        if stream_count is not None and len(data) != stream_count:
+            return None
+        if not _same_target(stored_target, params):
+            data = [dict(d, target_offset=0.0) if d is not None else None for d in data]
+        return data
+
+    def put(self, media_path: str, loudness_data: List[Optional[Dict[str, Any]]], params: Dict[str, float]) -> bool:
+        """Store the measured values for `media_path`; returns False when nothing was written.
+
+        None entries (streams that were not measured) keep the measurement cached for that
+        stream, if any.
+        """
+        ident = file_identity(media_path)
+        if ident is None:
+            return False
+        streams = [{k: d.get(k) for k in MEASURED_KEYS if k in d} if d is not None else None for d in loudness_data]
+        target = {k: params.get(k) for k in ("I", "TP", "LRA")}
+        if any(d is None for d in streams):
+            found = self._read(ident)
+            if found is not None and len(found[1]) == len(streams):
+                stored_target, previous = found
+                if not _same_target(stored_target, target):
+                    previous = [dict(d, target_offset=0.0) if d is not None else None for d in previous]
+                streams = [d if d is not None else p for d, p in zip(streams, previous)]
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO loudness (path, size, mtime_ns, hash, target, streams, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (ident["path"], ident["size"], ident["mtime_ns"], ident["hash"],
+                     json.dumps(target), json.dumps(streams), time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return False
+        return True
@@ -0,0 +1,143 @@
+"""
+Operation chains: several audio operations applied in a single decode/encode pass.
+
+A chain is a comma-separated list of operations applied left to right to every
+selected audio stream, e.g. "normalize,boost=10,codec=aac":
+- "normalize": two-pass loudnorm to NORMALIZATION_PARAMS (the first pass measures the source);
+- "boost=P": change the volume by P percent (negative values attenuate), as `--boost` does;
+- "rate=HZ": resample to HZ;
+- "channels=N": mix to N channels (1, 2, 6 or 8);
+- "codec=NAME", "bitrate=RATE": output encoder and bitrate (default AUDIO_CODEC / AUDIO_BITRATE).
+The filters of all operations form one filter chain per stream, so each file is
+decoded and written once however many operations are chained.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from .analysis import loudnorm_second_pass_filter
+from .utils import channels_to_layout
+
+
+OPERATIONS = ("normalize", "boost", "rate", "channels", "codec", "bitrate")
+CHANNEL_COUNTS = (1, 2, 6, 8)
+
+
+def parse_chain(value: Union[str, Iterable[str]]) -> List[Tuple[str, Any]]:
+    """Parse "normalize,boost=10,..." (or a list of operations) into (name, value) pairs; raises ValueError."""
+    items = value.split(",") if isinstance(value, str) else list(value or [])
+    ops: List[Tuple[str, Any]] = []
+    for item in (str(i).strip() for i in items):
+        if not item:
+            continue
+        name, has_value, arg = item.partition("=")
+        name, arg = name.strip().lower(), arg.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {item}")
+        if (name == "normalize") == bool(has_value):
+            raise ValueError(f"Invalid operation: {item}")
+        if name in ("normalize", "codec", "bitrate") and any(n == name for n, _ in ops):
+            raise ValueError(f"Operation given twice: {name}")
+        try:
+            if name == "boost":
+                arg = float(arg)
+                if arg <= -100:
+                    raise ValueError
+            elif name == "rate":
+                arg = int(arg)
+                if arg <= 0:
+                    raise ValueError
+            elif name == "channels":
+                arg = int(arg)
+                if arg not in CHANNEL_COUNTS:
+                    raise ValueError
+            elif name in ("codec", "bitrate") and not arg:
+                raise ValueError
+        except ValueError:
+            raise ValueError(f"Invalid operation: {item}")
+        if name == "normalize" and any(n == "channels" for n, _ in ops):
+            # the first pass measures the source layout, a preceding downmix would change its loudness
+            raise ValueError("normalize must come before channels")
+        ops.append((name, None if name == "normalize" else arg))
+    if not ops:
+        raise ValueError("Empty operation chain")
+    return ops
+
+
+def describe(ops: List[Tuple[str, Any]]) -> str:
+    """Format a parsed chain back into its "normalize,boost=10" form."""
+    return ",".join(name if value is None else f"{name}={value:g}" if isinstance(value, float) else f"{name}={value}" for name, value in ops)
+
+
+def needs_analysis(ops: List[Tuple[str, Any]]) -> bool:
+    """True if the chain normalizes and therefore needs the first-pass measurement."""
+    return any(name == "normalize" for name, _ in ops)
+
+
+def _shift(metadata: Dict[str, Any], gain_db: float) -> Dict[str, Any]:
+    """Measurement of the source after a linear gain of `gain_db` (loudness range is unchanged)."""
+    if not gain_db:
+        return metadata
+    shifted = dict(metadata)
+    for key in ("input_i", "input_tp", "input_thresh"):
+        shifted[key] = f"{float(metadata[key]) + gain_db:.2f}"
+    return shifted
+
+
+def stream_filter(ops: List[Tuple[str, Any]], metadata: Optional[Dict[str, Any]], params: Dict[str, float],
+                  stream: Dict[str, Any]) -> str:
+    """Build the filter chain for one audio stream.
+
+    Boosts ahead of "normalize" shift the measurement handed to loudnorm by their gain.
+    loudnorm upsamples to 192 kHz, so its output is resampled back to the source rate
+    unless a later "rate" operation sets one.
+    """
+    parts = []
+    gain_db = 0.0
+    resample = False
+    for name, value in ops:
+        if name == "normalize":
+            parts.append(loudnorm_second_pass_filter(_shift(metadata, gain_db), params))
+            resample = True
+        elif name == "boost":
+            multiplier = 1.0 + value / 100.0
+            parts.append(f"volume={multiplier}")
+            gain_db += 20 * math.log10(multiplier)
+        elif name == "rate":
+            parts.append(f"aresample={value}")
+            resample = False
+        elif name == "channels":
+            parts.append(f"aformat=channel_layouts={channels_to_layout(value)}")
+    if resample:
+        try:
+            rate = int(stream.get("sample_rate") or 48000)
+        except (TypeError, ValueError):
+            rate = 48000
+        parts.append(f"aresample={rate}")
+    return ",".join(parts) or "anull"
+
+
+def output_options(ops: List[Tuple[str, Any]], stream: Dict[str, Any], codec: str, fallback_codec: str, bitrate: str) -> Tuple[str, str]:
+    """Return (encoder, bitrate) for one stream; `codec` is AUDIO_CODEC ("inherit" keeps the source codec)."""
+    chosen = dict((n, v) for n, v in ops if n in ("codec", "bitrate"))
+    codec = chosen.get("codec", codec)
+    if codec == "inherit":
+        codec = stream.get("codec_name") or fallback_codec
+    return codec, chosen.get("bitrate", bitrate)
+
+
+def title_tag(ops: List[Tuple[str, Any]]) -> Optional[Tuple[str, str]]:
+    """Title tag (operation, extra) describing the final level, None for format-only chains.
+
+    A track is only tagged "Normalized" when nothing changes its level after the
+    normalize step; boosts after it are reported as one combined "Boosted N%".
+    """
+    tag = None
+    multiplier = 1.0
+    for name, value in ops:
+        if name == "normalize":
+            tag, multiplier = ("Normalized", ""), 1.0
+        elif name == "boost":
+            multiplier *= 1.0 + value / 100.0
+            tag = ("Boosted", f"{(multiplier - 1.0) * 100:g}%")
+    return tag
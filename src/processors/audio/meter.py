@@ -0,0 +1,485 @@
+"""
+Native EBU R128 / ITU-R BS.1770 loudness meter fed by a raw float PCM pipe.
+
+The meter is an alternative to ffmpeg's `loudnorm` first pass. ffmpeg only
+decodes (and resamples to 48 kHz) into `f32le` on stdout; K-weighting, block
+gating, loudness range and 4x oversampled true peak are computed here with
+NumPy on fixed-size, preallocated block buffers.
+
+Block loudness values are collected in mergeable histograms (0.01 LU bins
+holding block counts and summed energy), so measurements of separate parts of
+a file can be combined exactly.
+"""
+
+import functools
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency; callers fall back to loudnorm
+    np = None
+
+
+ANALYSIS_SAMPLE_RATE = 48000
+SUBBLOCK_SECONDS = 0.1
+MOMENTARY_SUBBLOCKS = 4
+SHORT_TERM_SUBBLOCKS = 30
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE_INTEGRATED = -10.0
+RELATIVE_GATE_LRA = -20.0
+HIST_MIN = -70.0
+HIST_MAX = 10.0
+HIST_STEP = 0.01
+TRUE_PEAK_OVERSAMPLE = 4
+TRUE_PEAK_TAPS = 12
+READ_SECONDS = 0.5
+# Audio decoded ahead of each time segment so that filter state and the 3 s
+# short-term window are fully primed at the segment boundary.
+SEGMENT_PREROLL_SECONDS = 3.0
+
+# Documented agreement with ffmpeg's loudnorm first pass on program material
+# (LU for input_i/input_lra/input_thresh, dB for input_tp). loudnorm measures
+# true peak on a 192 kHz upsampled signal, this meter with a 12-tap 4x
+# interpolator at 48 kHz, hence the wider true-peak bound.
+LOUDNORM_TOLERANCE = {"input_i": 0.2, "input_tp": 0.5, "input_lra": 1.0, "input_thresh": 0.3}
+
+# BS.1770 channel weights for ffmpeg's default layouts (LFE excluded, surrounds +1.5 dB).
+_CHANNEL_WEIGHTS = {
+    1: (1.0,),
+    2: (1.0, 1.0),
+    3: (1.0, 1.0, 1.0),
+    4: (1.0, 1.0, 1.41, 1.41),
+    5: (1.0, 1.0, 1.0, 1.41, 1.41),
+    6: (1.0, 1.0, 1.0, 0.0, 1.41, 1.41),
+    7: (1.0, 1.0, 1.0, 0.0, 1.41, 1.41, 1.41),
+    8: (1.0, 1.0, 1.0, 0.0, 1.41, 1.41, 1.41, 1.41),
+}
+
+
+def numpy_available() -> bool:
+    """Return True if the native meter can be used."""
+    return np is not None
+
+
+def channel_weights(channels: int) -> List[float]:
+    """Return BS.1770 per-channel weights for a channel count."""
+    return list(_CHANNEL_WEIGHTS.get(channels, (1.0,) * max(channels, 1)))
+
+
+def k_weighting_coefficients(sample_rate: int) -> List[Tuple[List[float], List[float]]]:
+    """Return (b, a) biquad coefficients of the two K-weighting stages for `sample_rate`."""
+    f0 = 1681.974450955533
+    gain_db = 3.999843853973347
+    q = 0.7071752369554196
+    k = math.tan(math.pi * f0 / sample_rate)
+    vh = 10.0 ** (gain_db / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf = (
+        [(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+        [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0],
+    )
+    f0 = 38.13547087602444
+    q = 0.5003270373238773
+    k = math.tan(math.pi * f0 / sample_rate)
+    a0 = 1.0 + k / q + k * k
+    highpass = (
+        [1.0, -2.0, 1.0],
+        [1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0],
+    )
+    return [shelf, highpass]
+
+
+@functools.lru_cache(maxsize=None)
+def _k_weighting_impulse_response(sample_rate: int) -> "np.ndarray":
+    """Impulse response of the cascaded K-weighting filter, 2^ceil(log2(0.2 s)) samples long.
+
+    Computed as the inverse FFT of the filter's frequency response on that grid; the response
+    has decayed by far more than float precision within that length, so the time aliasing is
+    negligible. Cached per sample rate (read-only), as every meter needs it.
+    """
+    length = 1 << int(math.ceil(math.log2(sample_rate * 0.2)))
+    response = np.ones(length // 2 + 1, dtype=np.complex128)
+    for b, a in k_weighting_coefficients(sample_rate):
+        response *= np.fft.rfft(b, length) / np.fft.rfft(a, length)
+    h = np.fft.irfft(response, length)
+    h.setflags(write=False)
+    return h
+
+
+def _true_peak_phases() -> "np.ndarray":
+    """Kaiser-windowed sinc fractional-delay filters for the interpolated phases (taps x phases)."""
+    half = TRUE_PEAK_TAPS // 2
+    n = np.arange(TRUE_PEAK_TAPS) - (half - 1)
+    phases = []
+    for p in range(1, TRUE_PEAK_OVERSAMPLE):
+        d = n - p / TRUE_PEAK_OVERSAMPLE
+        window = np.i0(6.0 * np.sqrt(np.clip(1.0 - (d / half) ** 2, 0.0, None))) / np.i0(6.0)
+        h = np.sinc(d) * window
+        phases.append(h / h.sum())
+    return np.stack(phases, axis=1)
+
+
+def _to_lufs(energy: float) -> float:
+    """Convert a mean-square K-weighted energy into LUFS."""
+    if energy <= 0:
+        return float("-inf")
+    return -0.691 + 10.0 * math.log10(energy)
+
+
+class LoudnessHistogram:
+    """Mergeable histogram of gating-block loudness (block counts and summed energy per bin)."""
+
+    def __init__(self):
+        self.bins = int(round((HIST_MAX - HIST_MIN) / HIST_STEP))
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.energy = np.zeros(self.bins, dtype=np.float64)
+
+    def add(self, energies: "np.ndarray") -> None:
+        """Add block energies, dropping blocks at or below the absolute gate."""
+        energies = energies[energies > 0]
+        if not energies.size:
+            return
+        loudness = -0.691 + 10.0 * np.log10(energies)
+        keep = loudness > ABSOLUTE_GATE
+        if not keep.any():
+            return
+        idx = ((loudness[keep] - HIST_MIN) / HIST_STEP).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        self.energy += np.bincount(idx, weights=energies[keep], minlength=self.bins)
+
+    def merge(self, other: "LoudnessHistogram") -> "LoudnessHistogram":
+        """Add the blocks of another histogram into this one."""
+        self.counts += other.counts
+        self.energy += other.energy
+        return self
+
+    def _first_bin_above(self, threshold: float) -> int:
+        """Index of the first bin whose lower edge is at or above `threshold`."""
+        return min(max(int(math.ceil((threshold - HIST_MIN) / HIST_STEP - 1e-9)), 0), self.bins)
+
+    def gated_mean(self, relative_gate: float) -> Tuple[Optional[float], Optional[float]]:
+        """Return (gated loudness, relative threshold) using a relative gate in LU."""
+        total = int(self.counts.sum())
+        if not total:
+            return None, None
+        threshold = _to_lufs(float(self.energy.sum()) / total) + relative_gate
+        start = self._first_bin_above(threshold)
+        count = int(self.counts[start:].sum())
+        if not count:
+            return None, threshold
+        return _to_lufs(float(self.energy[start:].sum()) / count), threshold
+
+    def loudness_range(self) -> Tuple[float, Optional[float]]:
+        """Return (LRA, relative threshold) per EBU Tech 3342 from short-term block loudness."""
+        total = int(self.counts.sum())
+        if not total:
+            return 0.0, None
+        threshold = _to_lufs(float(self.energy.sum()) / total) + RELATIVE_GATE_LRA
+        start = self._first_bin_above(threshold)
+        counts = self.counts[start:]
+        n = int(counts.sum())
+        if n < 2:
+            return 0.0, threshold
+        cumulative = np.cumsum(counts)
+        low = int(np.searchsorted(cumulative, 0.10 * n, side="left"))
+        high = int(np.searchsorted(cumulative, 0.95 * n, side="left"))
+        return (high - low) * HIST_STEP, threshold
+
+
+class LoudnessMeter:
+    """Streaming BS.1770 meter for one audio stream of interleaved float samples."""
+
+    def __init__(self, channels: int, sample_rate: int = ANALYSIS_SAMPLE_RATE, skip_subblocks: int = 0):
+        if np is None:
+            raise RuntimeError("NumPy is required for the native loudness meter")
+        self.channels = max(int(channels), 1)
+        self.sample_rate = int(sample_rate)
+        self.weights = np.asarray(channel_weights(self.channels), dtype=np.float64)[:, None]
+
+        h = _k_weighting_impulse_response(self.sample_rate)
+        self._taps = h.size
+        self._fft_size = 4 * self._taps
+        self._hop = self._fft_size - self._taps + 1
+        self._kernel = np.fft.rfft(h, self._fft_size)
+        self._block = np.zeros((self.channels, self._fft_size))
+        self._fill = 0
+
+        self._tp_phases = _true_peak_phases()
+        self._tp_history = np.zeros((self.channels, TRUE_PEAK_TAPS - 1))
+        self.sample_peak = 0.0
+        self.true_peak = 0.0
+
+        self.subblock_len = int(round(self.sample_rate * SUBBLOCK_SECONDS))
+        self._sb_acc = 0.0
+        self._sb_fill = 0
+        self._sb_history = np.zeros(0)
+        self.subblocks = 0
+        self.skip_subblocks = int(skip_subblocks)
+
+        self.momentary = LoudnessHistogram()
+        self.short_term = LoudnessHistogram()
+        self.max_momentary = float("-inf")
+        self.max_short_term = float("-inf")
+
+    def process(self, samples: "np.ndarray") -> None:
+        """Feed a (frames, channels) array of float samples."""
+        if samples.size == 0:
+            return
+        x = samples.T
+        self._update_true_peak(x)
+        pos = 0
+        frames = x.shape[1]
+        start = self._taps - 1
+        while pos < frames:
+            take = min(self._hop - self._fill, frames - pos)
+            self._block[:, start + self._fill:start + self._fill + take] = x[:, pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == self._hop:
+                self._filter_block(self._hop)
+
+    def finish(self) -> None:
+        """Flush buffered samples; the trailing partial gating sub-block is discarded."""
+        if self._fill:
+            start = self._taps - 1
+            self._block[:, start + self._fill:] = 0.0
+            self._filter_block(self._fill)
+
+    def _filter_block(self, valid: int) -> None:
+        """Overlap-save K-weighting of the current block and gating of its output."""
+        spectrum = np.fft.rfft(self._block, axis=1)
+        spectrum *= self._kernel
+        filtered = np.fft.irfft(spectrum, self._fft_size, axis=1)[:, self._taps - 1:self._taps - 1 + valid]
+        power = (filtered * filtered * self.weights).sum(axis=0)
+        self._block[:, :self._taps - 1] = self._block[:, self._hop:]
+        self._fill = 0
+        self._accumulate(power)
+
+    def _update_true_peak(self, x: "np.ndarray") -> None:
+        """Track sample peak and 4x oversampled true peak with continuity across calls."""
+        peak = float(np.abs(x).max())
+        self.sample_peak = max(self.sample_peak, peak)
+        extended = np.concatenate((self._tp_history, x), axis=1)
+        windows = np.lib.stride_tricks.sliding_window_view(extended, TRUE_PEAK_TAPS, axis=1)
+        interpolated = float(np.abs(windows @ self._tp_phases).max()) if windows.shape[1] else 0.0
+        self.true_peak = max(self.true_peak, peak, interpolated)
+        self._tp_history = extended[:, -(TRUE_PEAK_TAPS - 1):].copy()
+
+    def _accumulate(self, power: "np.ndarray") -> None:
+        """Sum weighted power into 100 ms sub-blocks and emit momentary/short-term blocks."""
+        completed = []
+        pos = 0
+        if self._sb_fill:
+            take = min(self.subblock_len - self._sb_fill, power.size)
+            self._sb_acc += float(power[:take].sum())
+            self._sb_fill += take
+            pos = take
+            if self._sb_fill == self.subblock_len:
+                completed.append(np.array([self._sb_acc]))
+                self._sb_acc = 0.0
+                self._sb_fill = 0
+        whole = (power.size - pos) // self.subblock_len
+        if whole:
+            end = pos + whole * self.subblock_len
+            completed.append(power[pos:end].reshape(whole, self.subblock_len).sum(axis=1))
+            pos = end
+        if pos < power.size:
+            self._sb_acc += float(power[pos:].sum())
+            self._sb_fill += power.size - pos
+        if completed:
+            self._emit_blocks(np.concatenate(completed))
+
+    def _emit_blocks(self, new: "np.ndarray") -> None:
+        """Form 400 ms and 3 s blocks (100 ms hop) ending in the newly completed sub-blocks."""
+        history = self._sb_history
+        seq = np.concatenate((history, new))
+        cumulative = np.concatenate(([0.0], np.cumsum(seq)))
+        first_global = self.subblocks - history.size
+        ends = np.arange(history.size, seq.size)
+        ends = ends[first_global + ends >= self.skip_subblocks]
+        for width, hist, attr in (
+            (MOMENTARY_SUBBLOCKS, self.momentary, "max_momentary"),
+            (SHORT_TERM_SUBBLOCKS, self.short_term, "max_short_term"),
+        ):
+            valid = ends[first_global + ends - width + 1 >= 0]
+            valid = valid[valid - width + 1 >= 0]
+            if not valid.size:
+                continue
+            energies = (cumulative[valid + 1] - cumulative[valid + 1 - width]) / (width * self.subblock_len)
+            hist.add(energies)
+            top = _to_lufs(float(energies.max()))
+            if top > getattr(self, attr):
+                setattr(self, attr, top)
+        self.subblocks += new.size
+        self._sb_history = seq[-(SHORT_TERM_SUBBLOCKS - 1):].copy()
+
+    def result(self) -> Dict[str, Any]:
+        """Return measurements in the same shape as loudnorm's JSON block."""
+        return measurements_from_histograms(self.momentary, self.short_term, self.true_peak)
+
+
+def merge_meters(meters: List[LoudnessMeter]) -> Dict[str, Any]:
+    """Merge meters of consecutive time segments of one stream into a single measurement."""
+    momentary = LoudnessHistogram()
+    short_term = LoudnessHistogram()
+    true_peak = 0.0
+    for m in meters:
+        momentary.merge(m.momentary)
+        short_term.merge(m.short_term)
+        true_peak = max(true_peak, m.true_peak)
+    return measurements_from_histograms(momentary, short_term, true_peak)
+
+
+def plan_segments(duration: float, workers: int, min_segment_seconds: float) -> List[Dict[str, Any]]:
+    """Split `duration` seconds into up to `workers` segments on the 100 ms gating grid.
+
+    Each segment decodes from `start` for `length` seconds (None = to the end of
+    the input) and counts only the blocks ending after its first
+    `skip_subblocks` sub-blocks, i.e. inside its own time range. Returns an
+    empty list when the file is too short to be worth splitting.
+    """
+    try:
+        count = int(min(int(workers), duration // float(min_segment_seconds)))
+    except Exception:
+        return []
+    if count <= 1:
+        return []
+    total = int(duration / SUBBLOCK_SECONDS)
+    preroll = int(round(SEGMENT_PREROLL_SECONDS / SUBBLOCK_SECONDS))
+    bounds = [round(total * k / count) for k in range(count + 1)]
+    segments = []
+    for k in range(count):
+        first, last = bounds[k], bounds[k + 1]
+        pre = min(first, preroll)
+        segments.append({
+            "start": (first - pre) * SUBBLOCK_SECONDS,
+            "length": None if k == count - 1 else (last - first + pre) * SUBBLOCK_SECONDS,
+            "skip_subblocks": pre,
+        })
+    return segments
+
+
+def measurements_from_histograms(momentary: LoudnessHistogram, short_term: LoudnessHistogram, true_peak: float) -> Dict[str, Any]:
+    """Build a loudnorm-shaped measurement dict from gating histograms and a linear true peak."""
+    integrated, threshold = momentary.gated_mean(RELATIVE_GATE_INTEGRATED)
+    lra, _ = short_term.loudness_range()
+    if integrated is None:
+        integrated = ABSOLUTE_GATE
+    if threshold is None:
+        threshold = ABSOLUTE_GATE
+    tp = 20.0 * math.log10(true_peak) if true_peak > 0 else -99.0
+    return {
+        "input_i": f"{integrated:.2f}",
+        "input_tp": f"{tp:.2f}",
+        "input_lra": f"{lra:.2f}",
+        "input_thresh": f"{threshold:.2f}",
+        "target_offset": "0.00",
+        "normalization_type": "native",
+    }
+
+
+# Native channel names in layout order, used to relabel each decoded stream before `amerge`.
+_MERGE_CHANNELS = ("FL", "FR", "FC", "LFE", "BL", "BR", "FLC", "FRC", "BC", "SL", "SR",
+                   "TC", "TFL", "TFC", "TFR", "TBL", "TBC", "TBR")
+
+
+def _merge_layout(channels: int) -> str:
+    """A layout of `channels` channels starting with FL, so every `amerge` input overlaps the others."""
+    return "+".join(_MERGE_CHANNELS[:channels])
+
+
+def build_pcm_command(media_path: str, audio_streams: List[Dict[str, Any]], segment: Optional[Dict[str, Any]] = None,
+                      positions: Optional[List[int]] = None, duration: Optional[float] = None) -> Tuple[List[str], List[int]]:
+    """Build an ffmpeg command decoding all audio streams into one interleaved f32le pipe.
+
+    Returns the command and the channel count of each stream, in order. Multiple
+    streams are resampled to the analysis rate and merged with `amerge`, so the
+    container is still read and decoded once. Each stream is first relabelled to
+    a layout starting with FL: inputs with overlapping layouts are concatenated in
+    input order, where disjoint ones (mono FC + stereo) would be reordered. As
+    `amerge` ends with its shortest input, every stream is padded with silence
+    (which the gates ignore) to `duration` seconds, the length of the longest
+    stream. `segment` limits decoding to one time range from `plan_segments`.
+    `positions` gives the input audio stream of each entry in `audio_streams`
+    (default: 0, 1, ...).
+    """
+    positions = list(positions) if positions is not None else list(range(len(audio_streams)))
+    channel_counts = []
+    for s in audio_streams:
+        try:
+            ch = int(s.get('channels', 0) or 0)
+        except Exception:
+            ch = 0
+        channel_counts.append(ch if ch > 0 else 2)
+    cmd = ["ffmpeg", "-nostdin", "-v", "error"]
+    if segment:
+        cmd.extend(["-ss", f"{segment['start']:.3f}"])
+        if segment.get("length") is not None:
+            cmd.extend(["-t", f"{segment['length']:.3f}"])
+    cmd.extend(["-i", media_path, "-threads", "0"])
+    if len(audio_streams) == 1:
+        cmd.extend(["-map", f"0:a:{positions[0]}", "-af", f"aresample={ANALYSIS_SAMPLE_RATE}"])
+    else:
+        remaining = duration
+        if segment and segment.get("length") is not None:
+            remaining = segment["length"]
+        elif segment and duration is not None:
+            remaining = duration - segment["start"]
+        pad = f",apad=whole_dur={remaining:.3f}" if remaining is not None and remaining > 0 else ""
+        parts = []
+        for i, (p, ch) in enumerate(zip(positions, channel_counts)):
+            mapping = "|".join(str(c) for c in range(ch))
+            parts.append(f"[0:a:{p}]aresample={ANALYSIS_SAMPLE_RATE},channelmap=map={mapping}:channel_layout={_merge_layout(ch)}{pad}[r{i}]")
+        merge_inputs = "".join(f"[r{i}]" for i in range(len(audio_streams)))
+        parts.append(f"{merge_inputs}amerge=inputs={len(audio_streams)}[pcm]")
+        cmd.extend(["-filter_complex", ";".join(parts), "-map", "[pcm]"])
+    cmd.extend(["-ac", str(sum(channel_counts)), "-ar", str(ANALYSIS_SAMPLE_RATE), "-f", "f32le", "-c:a", "pcm_f32le", "-"])
+    return cmd, channel_counts
+
+
+def _read_into(stream, buf: "np.ndarray") -> int:
+    """Fill `buf` from a binary stream; returns the number of complete float32 values read."""
+    view = memoryview(buf).cast("B")
+    total = 0
+    while total < len(view):
+        n = stream.readinto(view[total:])
+        if not n:
+            break
+        total += n
+    return total // 4
+
+
+def meter_pcm(stream, channel_counts: List[int], sample_rate: int = ANALYSIS_SAMPLE_RATE, progress=None, skip_subblocks: int = 0) -> List[LoudnessMeter]:
+    """Run one meter per channel group over an interleaved f32le stream and return the meters."""
+    total_channels = sum(channel_counts)
+    meters = [LoudnessMeter(ch, sample_rate, skip_subblocks=skip_subblocks) for ch in channel_counts]
+    frames_per_read = int(sample_rate * READ_SECONDS)
+    buf = np.empty(frames_per_read * total_channels, dtype=np.float32)
+    offsets = np.cumsum([0] + channel_counts)
+    seconds = 0.0
+    while True:
+        values = _read_into(stream, buf)
+        frames = values // total_channels
+        if frames:
+            samples = buf[:frames * total_channels].reshape(frames, total_channels)
+            for meter, lo, hi in zip(meters, offsets[:-1], offsets[1:]):
+                meter.process(samples[:, lo:hi])
+            seconds += frames / sample_rate
+            if progress:
+                try:
+                    progress(seconds)
+                except Exception:
+                    pass
+        if frames < frames_per_read:
+            break
+    for meter in meters:
+        meter.finish()
+    return meters
+
+
+def measure_pcm(stream, channel_counts: List[int], sample_rate: int = ANALYSIS_SAMPLE_RATE, progress=None) -> List[Dict[str, Any]]:
+    """Meter an interleaved f32le stream split into per-stream channel groups."""
+    return [m.result() for m in meter_pcm(stream, channel_counts, sample_rate, progress)]
@@ -0,0 +1,183 @@
+"""
+Lossless MP3 gain adjustment by rewriting each frame's `global_gain` side-info field.
+
+Every granule/channel of an MPEG audio layer III frame stores an 8-bit `global_gain`
+quantizer step; changing it by one scales the decoded samples by 2^(1/4), i.e. about
+1.5 dB. Only those side-info bits (and the frame CRC, when present) are changed, so
+the file is copied through a reusable buffer without decoding and the audio is
+bit-exact apart from the gain. This is the technique used by mp3gain.
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+
+GAIN_STEP_DB = 20 * math.log10(2 ** 0.25)
+READ_SIZE = 1 << 20
+MAX_FRAME_BYTES = 2881  # MPEG-1 layer III, 320 kbps at 32 kHz, padded
+
+_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),  # MPEG-1
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),      # MPEG-2 / 2.5
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def gain_steps(gain_db: float, tolerance_db: float) -> Optional[int]:
+    """Return the number of 1.5 dB steps for `gain_db`, or None if it is not representable within tolerance."""
+    try:
+        steps = int(round(float(gain_db) / GAIN_STEP_DB))
+    except Exception:
+        return None
+    if steps == 0 or abs(steps * GAIN_STEP_DB - float(gain_db)) > float(tolerance_db):
+        return None
+    return steps
+
+
+def parse_header(data, pos: int) -> Optional[Tuple[int, int, int, int, int]]:
+    """Parse a layer III frame header at `pos` (the buffer must hold at least 4 bytes from `pos`).
+
+    Returns (frame length, side-info length, channels, MPEG version id, stream key) or
+    None. The stream key (version, layer, sample rate) is used to reject false syncs.
+    """
+    if data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    if version == 1 or layer != 1:
+        return None
+    bitrate_idx, rate_idx = data[pos + 2] >> 4, (data[pos + 2] >> 2) & 0x03
+    if not 0 < bitrate_idx < 15 or rate_idx == 3:
+        return None
+    kbps = _BITRATES[3 if version == 3 else 2][bitrate_idx]
+    rate = _SAMPLE_RATES[version][rate_idx]
+    padding = (data[pos + 2] >> 1) & 0x01
+    channels = 1 if (data[pos + 3] >> 6) == 3 else 2
+    if version == 3:
+        length = 144000 * kbps // rate + padding
+        side = 17 if channels == 1 else 32
+    else:
+        length = 72000 * kbps // rate + padding
+        side = 9 if channels == 1 else 17
+    return length, side, channels, version, (version << 4) | (rate_idx << 2) | layer
+
+
+def _gain_offsets(version: int, channels: int):
+    """Bit offsets of every `global_gain` field inside the side info."""
+    if version == 3:
+        start = 9 + (5 if channels == 1 else 3) + 4 * channels
+        return [start + (gr * channels + ch) * 59 + 21 for gr in range(2) for ch in range(channels)]
+    start = 8 + (1 if channels == 1 else 2)
+    return [start + ch * 63 + 21 for ch in range(channels)]
+
+
+def _get8(buf, bit: int) -> int:
+    byte, shift = bit >> 3, bit & 7
+    return (((buf[byte] << 8) | buf[byte + 1]) >> (8 - shift)) & 0xFF
+
+
+def _set8(buf, bit: int, value: int) -> None:
+    byte, shift = bit >> 3, bit & 7
+    word = (buf[byte] << 8) | buf[byte + 1]
+    mask = 0xFF << (8 - shift)
+    word = (word & ~mask & 0xFFFF) | (value << (8 - shift))
+    buf[byte] = word >> 8
+    buf[byte + 1] = word & 0xFF
+
+
+def _crc16(data) -> int:
+    """CRC-16 (polynomial 0x8005, initial 0xFFFF) as used for MPEG audio frames."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x8005) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+def adjust_frame(buf, pos: int, header: Tuple[int, int, int, int, int], steps: int) -> int:
+    """Add `steps` to every global_gain of the frame at `pos` in place; returns the number of clipped fields.
+
+    Frames whose side info is all zero (Xing/Info/VBRI header frames) are left alone.
+    """
+    _, side_len, channels, version, _ = header
+    protected = not (buf[pos + 1] & 0x01)
+    side_start = pos + 4 + (2 if protected else 0)
+    if not any(buf[side_start:side_start + side_len]):
+        return 0
+    # a bytearray slice for the side info keeps bit arithmetic local; the spare byte covers the last field
+    side = bytearray(buf[side_start:side_start + side_len]) + b"\x00"
+    clipped = 0
+    for bit in _gain_offsets(version, channels):
+        value = _get8(side, bit) + steps
+        if value < 0 or value > 255:
+            clipped += 1
+            value = min(max(value, 0), 255)
+        _set8(side, bit, value)
+    buf[side_start:side_start + side_len] = side[:side_len]
+    if protected:
+        crc = _crc16(bytes(buf[pos + 2:pos + 4]) + bytes(side[:side_len]))
+        buf[pos + 4] = crc >> 8
+        buf[pos + 5] = crc & 0xFF
+    return clipped
+
+
+def _id3v2_size(data) -> int:
+    """Size of a leading ID3v2 tag (header, body and footer), 0 if there is none."""
+    if len(data) < 10 or bytes(data[:3]) != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def apply_gain(src_path: str, dst_path: str, steps: int, read_size: int = READ_SIZE) -> Dict[str, int]:
+    """Copy `src_path` to `dst_path` with the gain of every layer III frame changed by `steps`.
+
+    The file is streamed through one buffer that is reused for the whole copy. Bytes
+    that are not audio frames (ID3v2/ID3v1/APE tags, junk) are copied unchanged.
+    Returns {"frames": ..., "clipped": ...}; raises ValueError if no frames are found.
+    """
+    buf = bytearray(read_size + 2 * MAX_FRAME_BYTES)
+    view = memoryview(buf)
+    frames = clipped = 0
+    stream_key = None
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        fill = src.readinto(view[:read_size])
+        eof = fill < read_size
+        pos = 0
+        skip = _id3v2_size(buf[:10]) if fill >= 10 else 0
+        while True:
+            if skip:
+                n = min(skip, fill - pos)
+                pos += n
+                skip -= n
+            while not skip and fill - pos >= 4:
+                header = parse_header(buf, pos) if pos + 4 <= fill else None
+                if header is None or (stream_key is not None and header[4] != stream_key):
+                    pos += 1  # not a frame: copy the byte through and resync
+                    continue
+                end = pos + header[0]
+                if end > fill or (stream_key is None and end + 4 > fill and not eof):
+                    break  # partial frame (or no room to confirm the first one): read more first
+                if stream_key is None and end + 4 <= fill:
+                    following = parse_header(buf, end)
+                    if following is None or following[4] != header[4]:
+                        pos += 1  # a false sync before the first real frame
+                        continue
+                clipped += adjust_frame(buf, pos, header, steps)
+                stream_key = header[4]
+                frames += 1
+                pos = end
+            dst.write(view[:pos])
+            tail = fill - pos
+            buf[:tail] = buf[pos:fill]
+            pos, fill = 0, tail
+            if eof:
+                dst.write(view[:fill])
+                break
+            got = src.readinto(view[fill:fill + read_size])
+            fill += got
+            eof = got == 0
+    if not frames:
+        raise ValueError(f"No MPEG audio layer III frames found in {src_path}")
+    return {"frames": frames, "clipped": clipped}
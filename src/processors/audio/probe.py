@@ -1,56 +1,155 @@
 """
 Probe helpers that use ffprobe to discover media streams.
+
+`probe_media` runs a single `-show_streams -show_format` ffprobe per file and
+keeps the parsed result in a small in-run LRU keyed by path, size and mtime, so
+the batch UI, the worker and the processor share one probe per file.
 """
 
+import os
 import json
-from typing import Any, Dict, List
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 from .runner import run_command
 from core.logger import Logger
 
 
-def get_audio_streams(media_path: str, logger: Logger) -> List[Dict[str, Any]]:
-    """Get audio stream information using ffprobe, with fallbacks for missing metadata."""
+PROBE_CACHE_SIZE = 256
+
+_probe_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_probe_lock = threading.Lock()
+
+
+def _probe_key(media_path: str) -> Optional[tuple]:
+    """LRU key for a file, or None if it cannot be stat'ed (such results are never cached)."""
+    try:
+        st = os.stat(media_path)
+    except OSError:
+        return None
+    return (os.path.abspath(media_path), st.st_size, st.st_mtime_ns)
+
+
+def cached_probe(media_path: str) -> Optional[Dict[str, Any]]:
+    """Return the cached probe result for an unchanged file, if any."""
+    key = _probe_key(media_path)
+    if key is None:
+        return None
+    with _probe_lock:
+        info = _probe_cache.get(key)
+        if info is not None:
+            _probe_cache.move_to_end(key)
+        return info
+
+
+def ensure_probe_cache_size(entries: int) -> None:
+    """Grow the LRU to hold at least `entries` results (it never shrinks below PROBE_CACHE_SIZE)."""
+    global PROBE_CACHE_SIZE
+    with _probe_lock:
+        PROBE_CACHE_SIZE = max(PROBE_CACHE_SIZE, int(entries))
+
+
+def clear_probe_cache() -> None:
+    """Drop all cached probe results."""
+    with _probe_lock:
+        _probe_cache.clear()
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _audio_stream_fallbacks(media_path: str, logger: Logger) -> List[Dict[str, Any]]:
+    """Retry audio stream discovery for files whose full probe reported no audio streams."""
+    streams: List[Dict[str, Any]] = []
+    try:
+        fallback_cmd = [
+            "ffprobe", "-v", "error", "-select_streams", "a",
+            "-show_entries", "stream=index,codec_name,channels,tags", "-print_format", "json", media_path
+        ]
+        fallback_proc = run_command(fallback_cmd)
+        fallback_data = json.loads(fallback_proc.stdout) if fallback_proc.stdout else {}
+        streams = fallback_data.get("streams", [])
+        logger.info(f"ffprobe fallback returned {len(streams)} audio streams for {media_path}")
+    except Exception:
+        streams = []
+    if not streams:
+        try:
+            probe_count_cmd = ["ffprobe", "-v", "error", "-select_streams", "a", "-show_entries", "stream=index", "-of", "csv=p=0", media_path]
+            probe_count_proc = run_command(probe_count_cmd)
+            lines = probe_count_proc.stdout.strip().splitlines() if probe_count_proc.stdout else []
+            if lines:
+                logger.info(f"Creating {len(lines)} placeholder audio stream entries for {media_path}")
+                streams = []
+                for idx in range(len(lines)):
+                    streams.append({"index": idx, "tags": {}})
+        except Exception:
+            pass
+    return streams
+
+
+def probe_media(media_path: str, logger: Optional[Logger] = None) -> Optional[Dict[str, Any]]:
+    """Probe a file once and return its audio, video and subtitle streams, duration, start time and bitrate.
+
+    Returns None if ffprobe fails. Results are cached per (path, size, mtime).
+    """
+    cached = cached_probe(media_path)
+    if cached is not None:
+        return cached
+    logger = logger or Logger()
     ffprobe_cmd = [
         "ffprobe", "-i", media_path,
-        "-show_streams", "-select_streams", "a",
+        "-show_streams", "-show_format",
         "-loglevel", "quiet", "-print_format", "json"
     ]
     try:
         result = run_command(ffprobe_cmd)
         data = json.loads(result.stdout)
-        streams = data.get("streams", [])
-        if not streams:
-            try:
-                fallback_cmd = [
-                    "ffprobe", "-v", "error", "-select_streams", "a",
-                    "-show_entries", "stream=index,codec_name,channels,tags", "-print_format", "json", media_path
-                ]
-                fallback_proc = run_command(fallback_cmd)
-                fallback_data = json.loads(fallback_proc.stdout) if fallback_proc.stdout else {}
-                streams = fallback_data.get("streams", [])
-                logger.info(f"ffprobe fallback returned {len(streams)} audio streams for {media_path}")
-            except Exception:
-                streams = []
-            if not streams:
-                try:
-                    probe_count_cmd = ["ffprobe", "-v", "error", "-select_streams", "a", "-show_entries", "stream=index", "-of", "csv=p=0", media_path]
-                    probe_count_proc = run_command(probe_count_cmd)
-                    lines = probe_count_proc.stdout.strip().splitlines() if probe_count_proc.stdout else []
-                    if lines:
-                        logger.info(f"Creating {len(lines)} placeholder audio stream entries for {media_path}")
-                        streams = []
-                        for idx in range(len(lines)):
-                            streams.append({"index": idx, "tags": {}})
-                except Exception:
-                    pass
-        return streams
     except Exception as e:
         logger.error(f"ffprobe failed: {e}")
-        return []
+        return None
+    streams = data.get("streams", [])
+    fmt = data.get("format", {}) or {}
+    info = {
+        "audio": [s for s in streams if s.get("codec_type") == "audio"],
+        "video": [s for s in streams if s.get("codec_type") == "video"],
+        "subtitle": [s for s in streams if s.get("codec_type") == "subtitle"],
+        "duration": _to_float(fmt.get("duration")),
+        "bit_rate": _to_float(fmt.get("bit_rate")),
+        "start_time": _to_float(fmt.get("start_time")),
+    }
+    if not info["audio"]:
+        info["audio"] = _audio_stream_fallbacks(media_path, logger)
+    # Files with a single audio stream and no video (MP3 with ID3, ...) keep the title in the
+    # container tags; expose it on the stream so the track-title checks see it.
+    title = (fmt.get("tags") or {}).get("title")
+    if title and len(info["audio"]) == 1 and not info["video"]:
+        stream_tags = info["audio"][0].setdefault("tags", {})
+        stream_tags.setdefault("title", title)
+    key = _probe_key(media_path)
+    if key is not None:
+        with _probe_lock:
+            _probe_cache[key] = info
+            _probe_cache.move_to_end(key)
+            while len(_probe_cache) > PROBE_CACHE_SIZE:
+                _probe_cache.popitem(last=False)
+    return info
+
+
+def get_audio_streams(media_path: str, logger: Logger) -> List[Dict[str, Any]]:
+    """Get audio stream information using ffprobe, with fallbacks for missing metadata."""
+    info = probe_media(media_path, logger)
+    return list(info["audio"]) if info else []
 
 
 def get_video_streams(media_path: str) -> List[Dict[str, Any]]:
     """Get video stream information using ffprobe."""
+    cached = cached_probe(media_path)
+    if cached is not None:
+        return list(cached["video"])
     ffprobe_cmd = [
         "ffprobe", "-i", media_path,
         "-show_streams", "-select_streams", "v",
@@ -59,3 +158,20 @@ def get_video_streams(media_path: str) -> List[Dict[str, Any]]:
     result = run_command(ffprobe_cmd)
     data = json.loads(result.stdout)
     return data.get("streams", [])
+
+
+def get_duration(media_path: str) -> Optional[float]:
+    """Get the container duration in seconds using ffprobe, or None if it is unknown."""
+    cached = cached_probe(media_path)
+    if cached is not None:
+        return cached["duration"]
+    ffprobe_cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-print_format", "json", media_path
+    ]
+    try:
+        result = run_command(ffprobe_cmd)
+        data = json.loads(result.stdout)
+        return float(data.get("format", {}).get("duration"))
+    except Exception:
+        return None
@@ -3,15 +3,35 @@ Main AudioProcessor implementation, using modular helpers.
 """
 
 import os
-import re
-import json
+import math
+import time
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Dict, Any
-from core.config import NORMALIZATION_PARAMS, AUDIO_CODEC, AUDIO_BITRATE, FALLBACK_AUDIO_CODEC
+from core.config import NORMALIZATION_PARAMS, AUDIO_CODEC, AUDIO_BITRATE, FALLBACK_AUDIO_CODEC, ANALYSIS_CACHE_ENABLED
+from core.config import SKIP_POLICY, SKIP_TOLERANCE, ANALYSIS_BACKEND, TAG_MODE_EXTENSIONS, REPLAYGAIN_REFERENCE_LUFS
+from core.config import LOSSLESS_GAIN_ENABLED, LOSSLESS_GAIN_TOLERANCE_DB, STREAM_COPY_IN_TOLERANCE, STREAM_SELECTION
+from core.config import TARGET_PROFILES, TARGET_OUTPUT_TEMPLATE, SIDECAR_MODE, SCRATCH_DIR, OUTPUT_ROOT, AUDIO_WORKING_COPY_MIN_MB
+from core.config import SEGMENT_ANALYSIS_MIN_DURATION, SEGMENT_ANALYSIS_MIN_SEGMENT, SEGMENT_ANALYSIS_WORKERS
+from core.config import SEGMENTED_ENCODE_MIN_DURATION, SEGMENTED_ENCODE_MIN_CHUNK, SEGMENTED_ENCODE_WORKERS, TEMP_SUFFIX
 from core.logger import Logger
 from core.signal_handler import SignalHandler
-from .runner import run_command, popen
-from .probe import get_audio_streams, get_video_streams
-from .utils import update_track_title, create_temp_file, channels_to_layout
+from .runner import run_command, popen, open_pipe
+from .threads import shared_budget, with_threads
+from . import meter
+from . import segmented
+from . import tags
+from . import mp3gain
+from . import targets as targets_module
+from . import chain
+from . import sidecar
+from .streams import parse_selectors, select_streams
+from .probe import get_audio_streams, get_video_streams, get_duration, probe_media
+from .analysis import build_analysis_command, build_audio_copy_command, parse_loudnorm_output, within_tolerance, linear_gain_db, loudnorm_second_pass_filter
+from .cache import LoudnessCache
+from .utils import update_track_title, is_normalized_title, create_temp_file, temp_base, move_into_place, channels_to_layout
 from rich.console import Console
 from rich.live import Live
 from rich.spinner import Spinner
@@ -20,69 +40,771 @@ from rich.text import Text
 
 
 class AudioProcessor:
-    def __init__(self):
+    def __init__(self, skip_policy: Optional[str] = None, analysis_backend: Optional[str] = None,
+                 stream_selection: Optional[List[str]] = None, targets: Optional[List[str]] = None,
+                 sidecar_mode: Optional[str] = None, output_root: Optional[str] = None):
         self.logger = Logger()
+        self.analysis_cache = LoudnessCache() if ANALYSIS_CACHE_ENABLED else None
+        self.thread_budget = shared_budget()
+        self.skip_policy = skip_policy or SKIP_POLICY
+        self.analysis_backend = analysis_backend or ANALYSIS_BACKEND
+        if self.analysis_backend == "native" and not meter.numpy_available():
+            self.logger.warning("NumPy is not installed; using the loudnorm analysis backend")
+            self.analysis_backend = "loudnorm"
+        try:
+            self.stream_selectors = parse_selectors(stream_selection if stream_selection is not None else STREAM_SELECTION)
+        except ValueError as e:
+            self.logger.warning(f"{e}; processing all audio streams")
+            self.stream_selectors = []
+        self.sidecar_mode = sidecar_mode or SIDECAR_MODE
+        self.output_root = output_root or OUTPUT_ROOT or None
+        # directory whose tree is mirrored under output_root; set per run by the batch processor
+        self.input_root: Optional[str] = None
+        # local staged copy -> library path, filled by the batch processor's staging area
+        self.staged_sources: Dict[str, str] = {}
+        try:
+            self.target_profiles = targets_module.select_profiles(targets_module.parse_profiles(TARGET_PROFILES, NORMALIZATION_PARAMS), targets)
+        except ValueError as e:
+            self.logger.warning(f"{e}; normalizing in place")
+            self.target_profiles = []
 
     def _get_audio_streams(self, media_path: str):
         """Compatibility wrapper for existing callers that used a private method."""
         return get_audio_streams(media_path, self.logger)
 
-    def normalize_audio(self, media_path: str, show_ui: bool = False, progress_callback=None) -> Optional[str]:
-        """Normalize audio tracks in the given media file."""
+    def probe_media(self, media_path: str) -> Optional[Dict[str, Any]]:
+        """Probe a file once (audio/video/subtitle streams, duration, bitrate) for reuse by callers."""
+        return probe_media(media_path, self.logger)
+
+    def source_path(self, path: str) -> str:
+        """The library path of `path`: the original of a locally staged copy, else `path` itself."""
+        return self.staged_sources.get(path, path)
+
+    def output_for(self, path: str) -> str:
+        """Where the result for `path` is written: `path` itself, or its mirror under `output_root`.
+
+        Staged copies resolve to their library path, so results go back to the share.
+        """
+        path = self.source_path(path)
+        if not self.output_root:
+            return path
+        root = os.path.abspath(self.input_root or os.path.dirname(path))
+        rel = os.path.relpath(os.path.abspath(path), root)
+        if rel.startswith(os.pardir):
+            rel = os.path.basename(path)
+        return os.path.join(self.output_root, rel)
+
+    def is_target_output(self, path: str) -> bool:
+        """True if `path` is an output written for one of this run's target profiles."""
+        if not self.target_profiles:
+            return False
+        return targets_module.is_target_output(path, self.target_profiles, TARGET_OUTPUT_TEMPLATE)
+
+    def output_up_to_date(self, media_path: str) -> bool:
+        """True if `output_root` is set and the file's output is at least as new as the file."""
+        if not self.output_root:
+            return False
         try:
-            audio_streams = get_audio_streams(media_path, self.logger)
-            if not audio_streams:
-                raise ValueError("No audio streams found")
+            return os.stat(self.output_for(media_path)).st_mtime_ns >= os.stat(media_path).st_mtime_ns
+        except OSError:
+            return False
 
-            self.logger.info(f"Found {len(audio_streams)} audio stream(s)")
+    def _finalize_output(self, temp_output: str, media_path: str) -> str:
+        """Move a finished temp output to the file's output path and return that path."""
+        final_path = self.output_for(media_path)
+        move_into_place(temp_output, final_path)
+        try:
+            SignalHandler.unregister_temp_file(temp_output)
+        except Exception:
+            pass
+        return final_path
 
-            loudness_data = []
-            for i, stream in enumerate(audio_streams):
-                if progress_callback:
+    def selected_streams(self, audio_streams: List[Dict[str, Any]]) -> List[int]:
+        """Positions of the audio streams to process under the stream selection (all by default)."""
+        return select_streams(audio_streams, self.stream_selectors)
+
+    def _measure_loudness(self, media_path: str, audio_streams: List[Dict[str, Any]], progress_callback=None, backend: Optional[str] = None,
+                          positions: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Run the single-decode first pass with the configured backend and return per-stream measurements.
+
+        `positions` gives the input audio stream of each entry in `audio_streams` when only
+        some of the file's streams are measured.
+        """
+        if (backend or self.analysis_backend) == "native":
+            extra = {"positions": positions} if positions is not None else {}
+            return self._measure_loudness_native(media_path, audio_streams, progress_callback, **extra)
+        if progress_callback:
+            try:
+                progress_callback("analyzing", last_line=f"{len(audio_streams)} stream(s)...")
+            except Exception:
+                pass
+        analyze_cmd = build_analysis_command(media_path, len(audio_streams), NORMALIZATION_PARAMS, positions)
+        with self.thread_budget.reserve("analysis", len(audio_streams)) as threads:
+            analyze_cmd = with_threads(analyze_cmd, threads)
+            if progress_callback:
+                process = popen(analyze_cmd)
+                ffmpeg_log = []
+                try:
+                    SignalHandler.register_child_pid(process.pid)
+                except Exception:
+                    pass
+                try:
+                    for line in process.stderr:
+                        last_line = line.strip()
+                        ffmpeg_log.append(last_line)
+                        if last_line:
+                            try:
+                                progress_callback("analyzing", last_line=last_line)
+                            except Exception:
+                                pass
+                    process.wait()
+                finally:
                     try:
-                        progress_callback("analyzing", last_line=f"Stream {i+1}...")
+                        SignalHandler.unregister_child_pid(process.pid)
                     except Exception:
                         pass
-                analyze_cmd = [
-                    "ffmpeg", "-i", media_path,
-                    "-threads", "0",
-                    "-map", f"0:a:{i}",
-                    "-af", f"loudnorm=I={NORMALIZATION_PARAMS['I']}:TP={NORMALIZATION_PARAMS['TP']}:LRA={NORMALIZATION_PARAMS['LRA']}:print_format=json",
-                    "-f", "null", "-"
-                ]
+                loudness_data = parse_loudnorm_output("\n".join(ffmpeg_log), len(audio_streams))
+            else:
+                result = run_command(analyze_cmd)
+                loudness_data = parse_loudnorm_output(result.stderr, len(audio_streams))
+        return loudness_data
+
+    def _measure_loudness_native(self, media_path: str, audio_streams: List[Dict[str, Any]], progress_callback=None,
+                                 positions: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """Decode all streams to a float PCM pipe and measure them with the NumPy meter.
+
+        Long files are split into time segments that are decoded and metered in
+        parallel; the per-segment histograms are then merged per stream.
+        """
+        segments = self._plan_analysis_segments(media_path)
+        if progress_callback:
+            try:
+                suffix = f", {len(segments)} segments" if segments else ""
+                progress_callback("analyzing", last_line=f"{len(audio_streams)} stream(s) (native meter{suffix})...")
+            except Exception:
+                pass
+
+        measured = [0.0] * max(len(segments), 1)
+        lock = threading.Lock()
+
+        def reporter(slot):
+            def report(seconds):
+                with lock:
+                    measured[slot] = seconds
+                    total = sum(measured)
                 if progress_callback:
-                    process = popen(analyze_cmd)
-                    ffmpeg_log = []
+                    progress_callback("analyzing", last_line=f"Measured {total:.0f}s of audio")
+            return report
+
+        if not segments:
+            meters = self._meter_pcm(media_path, audio_streams, None, reporter(0), positions)
+            return [m.result() for m in meters]
+
+        with ThreadPoolExecutor(max_workers=len(segments)) as pool:
+            futures = [
+                pool.submit(self._meter_pcm, media_path, audio_streams, segment, reporter(i), positions)
+                for i, segment in enumerate(segments)
+            ]
+            per_segment = [f.result() for f in futures]
+        return [meter.merge_meters(list(stream_meters)) for stream_meters in zip(*per_segment)]
+
+    def _plan_analysis_segments(self, media_path: str) -> List[Dict[str, Any]]:
+        """Return the time segments for a segmented analysis, or [] for a single pass."""
+        if not SEGMENT_ANALYSIS_MIN_DURATION:
+            return []
+        duration = get_duration(media_path)
+        if duration is None or duration < SEGMENT_ANALYSIS_MIN_DURATION:
+            return []
+        workers = SEGMENT_ANALYSIS_WORKERS or os.cpu_count() or 1
+        return meter.plan_segments(duration, workers, SEGMENT_ANALYSIS_MIN_SEGMENT)
+
+    def _meter_pcm(self, media_path: str, audio_streams: List[Dict[str, Any]], segment: Optional[Dict[str, Any]], report,
+                   positions: Optional[List[int]] = None) -> List["meter.LoudnessMeter"]:
+        """Run one PCM decode (optionally of a single segment) and return one meter per stream."""
+        # the container duration is that of its longest stream; shorter streams are padded to it
+        duration = get_duration(media_path) if len(audio_streams) > 1 else None
+        pcm_cmd, channel_counts = meter.build_pcm_command(media_path, audio_streams, segment, positions, duration)
+        skip_subblocks = segment["skip_subblocks"] if segment else 0
+        with self.thread_budget.reserve("analysis", len(audio_streams)) as threads:
+            pcm_cmd = with_threads(pcm_cmd, threads)
+            process = open_pipe(pcm_cmd)
+            try:
+                SignalHandler.register_child_pid(process.pid)
+            except Exception:
+                pass
+            try:
+                try:
+                    meters = meter.meter_pcm(process.stdout, channel_counts, progress=report, skip_subblocks=skip_subblocks)
+                except Exception:
+                    process.kill()
+                    raise
+                stderr_output = process.stderr.read().decode("utf-8", errors="replace")
+                process.wait()
+            finally:
+                try:
+                    SignalHandler.unregister_child_pid(process.pid)
+                except Exception:
+                    pass
+            if process.returncode != 0:
+                try:
+                    self.logger.log_ffmpeg("ANALYZE_NATIVE", media_path, stderr_output)
+                except Exception:
+                    pass
+                raise RuntimeError(f"PCM decode failed for {media_path}: ffmpeg exit {process.returncode}")
+        return meters
+
+    def benchmark_analysis(self, media_path: str) -> Dict[str, Any]:
+        """Time both analysis backends on a file and compare their measurements (cache bypassed)."""
+        audio_streams = get_audio_streams(media_path, self.logger)
+        if not audio_streams:
+            raise ValueError("No audio streams found")
+        report: Dict[str, Any] = {"file": media_path, "streams": []}
+        measured = {}
+        for backend in ("loudnorm", "native"):
+            started = time.perf_counter()
+            measured[backend] = self._measure_loudness(media_path, audio_streams, backend=backend)
+            report[f"{backend}_seconds"] = time.perf_counter() - started
+        for ref, nat in zip(measured["loudnorm"], measured["native"]):
+            delta = {}
+            for key in meter.LOUDNORM_TOLERANCE:
+                try:
+                    delta[key] = float(nat[key]) - float(ref[key])
+                except Exception:
+                    delta[key] = float("nan")
+            ok = all(abs(delta[k]) <= tol for k, tol in meter.LOUDNORM_TOLERANCE.items())
+            report["streams"].append({"loudnorm": ref, "native": nat, "delta": delta, "within_tolerance": ok})
+        return report
+
+    def _get_cached_analysis(self, media_path: str, stream_count: int) -> Optional[List[Dict[str, Any]]]:
+        """Return cached first-pass measurements for an unchanged file, if any.
+
+        Streams that were never measured (outside an earlier stream selection) are None.
+        """
+        if self.analysis_cache is None:
+            return None
+        try:
+            return self.analysis_cache.get(self.source_path(media_path), NORMALIZATION_PARAMS, stream_count)
+        except Exception:
+            return None
+
+    def _store_analysis(self, media_path: str, loudness_data: List[Optional[Dict[str, Any]]]) -> None:
+        """Persist first-pass measurements; cache failures never fail the job.
+
+        None entries (unselected streams) keep a previously cached measurement.
+        """
+        if self.analysis_cache is None:
+            return
+        try:
+            self.analysis_cache.put(self.source_path(media_path), loudness_data, NORMALIZATION_PARAMS)
+        except Exception:
+            pass
+
+    def check_skip(self, media_path: str, audio_streams: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Return a reason string if the file can be left untouched under the skip policy."""
+        if self.output_up_to_date(media_path):
+            return "Output is up to date"
+        if self.skip_policy not in ("tagged", "measure") and not self.stream_selectors:
+            return None
+        if audio_streams is None:
+            audio_streams = get_audio_streams(media_path, self.logger)
+        if not audio_streams:
+            return None
+        selected = self.selected_streams(audio_streams)
+        if not selected:
+            return "No audio streams match the stream selection"
+        if self.skip_policy not in ("tagged", "measure"):
+            return None
+        if self.sidecar_mode != "off" and sidecar.up_to_date(media_path, self._sidecar_outputs(media_path, audio_streams, selected)):
+            return "Sidecar audio is up to date"
+
+        cached = self._get_cached_analysis(media_path, len(audio_streams))
+        loudness_data = [cached[i] for i in selected] if cached else None
+        if loudness_data is None or any(m is None for m in loudness_data):
+            titles = [audio_streams[i].get('tags', {}).get('title', '') for i in selected]
+            if all(is_normalized_title(t) for t in titles):
+                return "Already normalized (track title tag)"
+            if self.skip_policy != "measure":
+                return None
+            loudness_data = [m for m in self._first_pass(media_path, audio_streams) if m is not None]
+
+        if all(within_tolerance(m, NORMALIZATION_PARAMS, SKIP_TOLERANCE) for m in loudness_data):
+            levels = ", ".join(f"{m.get('input_i')} LUFS / {m.get('input_tp')} dBTP" for m in loudness_data)
+            return f"Within tolerance ({levels})"
+        return None
+
+    def _encode_segmented(self, media_path: str, audio_streams: List[Dict[str, Any]], audio_filters: List[str],
+                          titles: List[str], encode_args: List[str], stage: str, progress_callback=None,
+                          media_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Encode linear-gain audio as parallel frame-aligned chunks and replace `media_path`.
+
+        A None entry in `audio_filters` stream-copies that stream instead of encoding it.
+        Returns the final path, or None when the file does not qualify (short file,
+        mode disabled, an output codec that cannot be chunked, or an encoded stream that
+        does not start with the file) so the caller runs its single-process encode. Raises if a chunk, the concatenation or the remux fails.
+        """
+        if not SEGMENTED_ENCODE_MIN_DURATION:
+            return None
+        duration = media_info.get("duration") if media_info else get_duration(media_path)
+        if duration is None or duration < SEGMENTED_ENCODE_MIN_DURATION:
+            return None
+        workers = SEGMENTED_ENCODE_WORKERS or os.cpu_count() or 1
+        file_start = media_info.get("start_time") if media_info else None
+
+        plans = []
+        for i, stream in enumerate(audio_streams):
+            if audio_filters[i] is None:
+                plans.append(None)
+                continue
+            # the concatenated raw stream has no timestamps: a delayed start would be lost
+            if abs(segmented.start_offset(stream, file_start)) > segmented.START_OFFSET_TOLERANCE:
+                return None
+            codec = AUDIO_CODEC if AUDIO_CODEC != "inherit" else (stream.get('codec_name') or FALLBACK_AUDIO_CODEC)
+            spec = segmented.chunk_codec(codec)
+            if spec is None:
+                return None
+            try:
+                sr = int(stream.get('sample_rate') or 48000)
+            except Exception:
+                sr = 48000
+            chunks = segmented.plan_chunks(duration, sr, spec[0], workers, SEGMENTED_ENCODE_MIN_CHUNK)
+            if not chunks:
+                return None
+            plans.append((codec.lower(), sr, chunks))
+        if not any(plans):
+            return None
+
+        work_dir = f"{temp_base(media_path)}{TEMP_SUFFIX}_chunks"
+        os.makedirs(work_dir, exist_ok=True)
+        jobs = []
+        try:
+            for i, plan in enumerate(plans):
+                if plan is None:
+                    continue
+                codec, sr, chunks = plan
+                raw_ext = segmented.CHUNK_CODECS[codec][2]
+                for k, chunk in enumerate(chunks):
+                    chunk_path = os.path.join(work_dir, f"a{i}_{k:04d}.{raw_ext}")
                     try:
-                        SignalHandler.register_child_pid(process.pid)
+                        SignalHandler.register_temp_file(chunk_path)
                     except Exception:
                         pass
+                    cmd = segmented.build_chunk_command(media_path, i, chunk, codec, sr, audio_filters[i], encode_args, chunk_path)
+                    jobs.append((i, chunk, chunk_path, cmd))
+
+            done = [0]
+            lock = threading.Lock()
+
+            def encode(job):
+                with self.thread_budget.reserve("chunk") as threads:
+                    run_command(with_threads(job[3], threads))
+                with lock:
+                    done[0] += 1
+                    count = done[0]
+                if progress_callback:
                     try:
-                        for line in process.stderr:
-                            last_line = line.strip()
-                            ffmpeg_log.append(last_line)
-                            if last_line:
-                                try:
-                                    progress_callback("analyzing", last_line=last_line)
-                                except Exception:
-                                    pass
-                        process.wait()
-                    finally:
+                        progress_callback(stage, last_line=f"Encoded chunk {count}/{len(jobs)}")
+                    except Exception:
+                        pass
+
+            if progress_callback:
+                try:
+                    progress_callback(stage, last_line=f"Encoding {len(jobs)} chunks in parallel...")
+                except Exception:
+                    pass
+            with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+                for future in [pool.submit(encode, job) for job in jobs]:
+                    future.result()
+
+            stream_paths = []
+            for i, plan in enumerate(plans):
+                if plan is None:
+                    stream_paths.append(None)
+                    continue
+                codec, sr, chunks = plan
+                stream_path = os.path.join(work_dir, f"a{i}.{segmented.CHUNK_CODECS[codec][2]}")
+                with open(stream_path, "wb") as out:
+                    for stream_index, chunk, chunk_path, _ in jobs:
+                        if stream_index == i:
+                            segmented.append_chunk(chunk_path, chunk, codec, out)
+                stream_paths.append(stream_path)
+
+            temp_output = create_temp_file(media_path)
+            remux_cmd = segmented.build_remux_command(
+                media_path, stream_paths, audio_streams, titles, bool(media_info["video"] if media_info else get_video_streams(media_path)), temp_output
+            )
+            try:
+                with self.thread_budget.reserve("copy") as threads:
+                    run_command(with_threads(remux_cmd, threads))
+            except Exception:
+                if os.path.exists(temp_output):
+                    os.remove(temp_output)
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                raise
+        finally:
+            for _, _, chunk_path, _ in jobs:
+                try:
+                    SignalHandler.unregister_temp_file(chunk_path)
+                except Exception:
+                    pass
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        final_path = self._finalize_output(temp_output, media_path)
+        self.logger.info(f"Segment-parallel encode: {len(jobs)} chunks for {media_path}")
+        return final_path
+
+    def _lossless_gain(self, media_path: str, audio_streams: List[Dict[str, Any]], gain_db: float, stage: str,
+                       progress_callback=None, max_gain_db: Optional[float] = None, title: Optional[str] = None) -> Optional[str]:
+        """Apply `gain_db` to a single-stream MP3 file by rewriting frame global_gain fields.
+
+        `title` (our "Normalized"/"Boosted" track title) is then written to the ID3 tag with a
+        stream-copy remux, like every encode does, so the skip check recognizes the file.
+        Returns the final path, or None when the file or gain does not qualify (or the
+        rewrite fails) so the caller runs its regular encode.
+        """
+        if not LOSSLESS_GAIN_ENABLED or len(audio_streams) != 1 or AUDIO_CODEC not in ("inherit", "mp3"):
+            return None
+        if os.path.splitext(media_path)[1].lower() != ".mp3" or (audio_streams[0].get('codec_name') or "").lower() != "mp3":
+            return None
+        steps = mp3gain.gain_steps(gain_db, LOSSLESS_GAIN_TOLERANCE_DB)
+        if steps is None or (max_gain_db is not None and steps * mp3gain.GAIN_STEP_DB > max_gain_db):
+            return None
+        if progress_callback:
+            try:
+                progress_callback(stage, last_line=f"Lossless MP3 gain: {steps:+d} step(s) ({steps * mp3gain.GAIN_STEP_DB:+.2f} dB)")
+            except Exception:
+                pass
+        temp_output = create_temp_file(media_path)
+        gain_output = f"{temp_base(media_path)}{TEMP_SUFFIX}.gain.mp3" if title else temp_output
+        try:
+            if title:
+                SignalHandler.register_temp_file(gain_output)
+        except Exception:
+            pass
+        try:
+            stats = mp3gain.apply_gain(media_path, gain_output, steps)
+        except Exception as e:
+            self.logger.warning(f"Lossless MP3 gain failed for {media_path}, re-encoding instead: {e}")
+            for path in {gain_output, temp_output}:
+                self._remove_scratch_file(path)
+            return None
+        if title:
+            try:
+                with self.thread_budget.reserve("copy") as threads:
+                    run_command(with_threads(tags.build_tag_command(gain_output, {"title": title}, ".mp3", temp_output), threads))
+            except Exception as e:
+                self.logger.warning(f"Could not write the track title of {media_path}: {e}")
+                os.replace(gain_output, temp_output)
+            self._remove_scratch_file(gain_output)
+        final_path = self._finalize_output(temp_output, media_path)
+        if stats["clipped"]:
+            self.logger.warning(f"Lossless MP3 gain clipped {stats['clipped']} global_gain field(s) in {media_path}")
+        self.logger.info(f"Lossless MP3 gain: {steps:+d} step(s) on {stats['frames']} frames for {media_path}")
+        return final_path
+
+    def _audio_working_copy(self, media_path: str, positions: List[int], progress_callback=None) -> Optional[str]:
+        """Stream-copy the given audio streams of a large file into a scratch .mka for analysis.
+
+        Returns the copy's path, or None when the file is below AUDIO_WORKING_COPY_MIN_MB or
+        the extraction failed (the original is then analyzed directly).
+        """
+        if not AUDIO_WORKING_COPY_MIN_MB or not positions:
+            return None
+        try:
+            if os.path.getsize(media_path) < AUDIO_WORKING_COPY_MIN_MB * 1024 * 1024:
+                return None
+        except OSError:
+            return None
+        copy_path = None
+        try:
+            stem = os.path.splitext(os.path.basename(media_path))[0]
+            fd, copy_path = tempfile.mkstemp(prefix=f"{stem}.", suffix=".audio.mka", dir=SCRATCH_DIR or None)
+            os.close(fd)
+            try:
+                SignalHandler.register_temp_file(copy_path)
+            except Exception:
+                pass
+            if progress_callback:
+                try:
+                    progress_callback("analyzing", last_line="Extracting audio working copy...")
+                except Exception:
+                    pass
+            with self.thread_budget.reserve("copy") as threads:
+                run_command(with_threads(build_audio_copy_command(media_path, positions, copy_path), threads))
+            return copy_path
+        except Exception as e:
+            self.logger.warning(f"Audio working copy failed for {media_path}, analyzing the original: {e}")
+            if copy_path:
+                self._remove_scratch_file(copy_path)
+            return None
+
+    def _remove_scratch_file(self, path: str) -> None:
+        """Delete a temporary scratch file and forget it in the signal handler."""
+        try:
+            SignalHandler.unregister_temp_file(path)
+        except Exception:
+            pass
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+    def _first_pass(self, media_path: str, audio_streams: List[Dict[str, Any]], progress_callback=None) -> List[Optional[Dict[str, Any]]]:
+        """Return first-pass measurements from the cache, or measure and cache them.
+
+        Only the selected streams are measured; the result has one entry per audio
+        stream, with None for streams outside the stream selection.
+        """
+        selected = self.selected_streams(audio_streams)
+        cached = self._get_cached_analysis(media_path, len(audio_streams))
+        if cached is not None and all(cached[i] is not None for i in selected):
+            self.logger.info(f"Using cached loudness analysis: {media_path}")
+            return [cached[i] if i in selected else None for i in range(len(audio_streams))]
+        working_copy = self._audio_working_copy(media_path, selected, progress_callback)
+        try:
+            if working_copy:
+                # the copy holds only the selected streams, in order
+                measured = self._measure_loudness(working_copy, [audio_streams[i] for i in selected], progress_callback)
+            elif len(selected) == len(audio_streams):
+                measured = self._measure_loudness(media_path, audio_streams, progress_callback)
+            else:
+                measured = self._measure_loudness(media_path, [audio_streams[i] for i in selected], progress_callback, positions=selected)
+        finally:
+            if working_copy:
+                self._remove_scratch_file(working_copy)
+        if len(measured) != len(selected):
+            raise ValueError(f"Expected {len(selected)} measurement(s), got {len(measured)}")
+        loudness_data = [None] * len(audio_streams)
+        for i, m in zip(selected, measured):
+            loudness_data[i] = m
+        self._store_analysis(media_path, loudness_data)
+        return loudness_data
+
+    def analyze_audio(self, media_path: str, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Run only the first pass and return per-stream measurements (None on failure).
+
+        The result can be handed to `normalize_audio(loudness_data=...)`, which lets the batch
+        pipeline analyze upcoming files while earlier ones are still encoding.
+        """
+        try:
+            audio_streams = media_info["audio"] if media_info else get_audio_streams(media_path, self.logger)
+            if not audio_streams:
+                raise ValueError("No audio streams found")
+            loudness_data = self._first_pass(media_path, audio_streams, progress_callback)
+            if len(loudness_data) != len(audio_streams):
+                raise ValueError(f"Expected {len(audio_streams)} measurement(s), got {len(loudness_data)}")
+            return loudness_data
+        except Exception as e:
+            self.logger.error(f"Analysis failed for {media_path}: {e}")
+            return None
+
+    def tag_mode(self, media_path: str) -> bool:
+        """Return True if `media_path` is normalized by writing gain tags instead of re-encoding."""
+        ext = os.path.splitext(media_path)[1].lower()
+        return ext in TAG_MODE_EXTENSIONS and tags.tag_format(ext) is not None
+
+    def tag_audio(self, media_path: str, track: Dict[str, Any], album: Optional[Dict[str, Any]] = None, progress_callback=None) -> Optional[str]:
+        """Write loudness gain tags for a single-stream file with a stream-copy remux (no re-encode).
+
+        `track` and `album` are first-pass measurements (`input_i`, `input_tp`); album tags are
+        only written when `album` is given.
+        """
+        ext = os.path.splitext(media_path)[1].lower()
+        try:
+            style = tags.tag_format(ext)[0]
+            gain_tags = tags.gain_tags(style, track, album, REPLAYGAIN_REFERENCE_LUFS)
+            if progress_callback:
+                try:
+                    progress_callback("tagging", last_line=", ".join(f"{k}={v}" for k, v in gain_tags.items() if "GAIN" in k))
+                except Exception:
+                    pass
+            temp_output = create_temp_file(media_path)
+            with self.thread_budget.reserve("copy") as threads:
+                run_command(with_threads(tags.build_tag_command(media_path, gain_tags, ext, temp_output), threads))
+            final_path = self._finalize_output(temp_output, media_path)
+            self.logger.success(f"Gain tags written: {final_path}")
+            return final_path
+        except Exception as e:
+            self.logger.error(f"Tagging failed for {media_path}: {e}")
+            if 'temp_output' in locals() and os.path.exists(temp_output):
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                os.remove(temp_output)
+            return None
+
+    def _run_ffmpeg(self, ffmpeg_cmd: List[str], media_path: str, stage: str, log_label: str, progress_callback=None, show_ui: bool = False,
+                    streams: int = 1) -> None:
+        """Run an encode, streaming ffmpeg's progress lines to `progress_callback(stage, ...)` when given.
+
+        `streams` is the number of encoded audio streams, used to size the thread reservation.
+        Raises RuntimeError if ffmpeg fails.
+        """
+        with self.thread_budget.reserve("encode", streams) as threads:
+            ffmpeg_cmd = with_threads(ffmpeg_cmd, threads)
+            if not progress_callback:
+                run_command(ffmpeg_cmd, capture_output=(not show_ui))
+                return
+            try:
+                progress_callback(stage)
+            except Exception:
+                pass
+            process = popen(ffmpeg_cmd)
+            ffmpeg_log = []
+            try:
+                SignalHandler.register_child_pid(process.pid)
+            except Exception:
+                pass
+            try:
+                for line in process.stderr:
+                    last_line = line.strip()
+                    ffmpeg_log.append(last_line)
+                    if last_line:
                         try:
-                            SignalHandler.unregister_child_pid(process.pid)
+                            progress_callback(stage, last_line=last_line)
                         except Exception:
                             pass
-                    stderr_output = "\n".join(ffmpeg_log)
-                    match = re.search(r'\{.*\}', stderr_output, re.DOTALL)
-                    if not match:
-                        raise ValueError(f"Failed to get loudness data for stream {i}")
-                    loudness_data.append(json.loads(match.group()))
-                else:
-                    result = run_command(analyze_cmd)
-                    match = re.search(r'\{.*\}', result.stderr, re.DOTALL)
-                    if not match:
-                        raise ValueError(f"Failed to get loudness data for stream {i}")
-                    loudness_data.append(json.loads(match.group()))
+                process.wait()
+            finally:
+                try:
+                    SignalHandler.unregister_child_pid(process.pid)
+                except Exception:
+                    pass
+            try:
+                if ffmpeg_log:
+                    self.logger.log_ffmpeg(log_label, media_path, "\n".join(ffmpeg_log))
+            except Exception:
+                pass
+            if process.returncode != 0:
+                raise RuntimeError(f"ffmpeg exit {process.returncode}")
+
+    def _sidecar_outputs(self, media_path: str, audio_streams: List[Dict[str, Any]], selected: List[int]) -> List[Dict[str, Any]]:
+        """Planned sidecar files for `media_path`, placed under `output_root` when set."""
+        outputs = sidecar.sidecar_outputs(self.source_path(media_path), audio_streams, selected, self.sidecar_mode)
+        return [dict(o, path=self.output_for(o["path"])) for o in outputs]
+
+    def _normalize_sidecar(self, media_path: str, audio_streams: List[Dict[str, Any]], loudness_data: List[Optional[Dict[str, Any]]],
+                           copy_streams: List[bool], show_ui: bool = False, progress_callback=None) -> Optional[str]:
+        """Write the selected audio streams to sidecar file(s) (see `sidecar`); the media file is not rewritten.
+
+        Returns `media_path` once the sidecars are in place, None if ffmpeg failed.
+        """
+        selected = [i for i, m in enumerate(loudness_data) if m is not None]
+        outputs = self._sidecar_outputs(media_path, audio_streams, selected)
+        filter_parts = [f"[0:a:{i}]{loudnorm_second_pass_filter(loudness_data[i], NORMALIZATION_PARAMS)}[a{i}]" for i in selected if not copy_streams[i]]
+        codecs = [(s.get('codec_name') or FALLBACK_AUDIO_CODEC) if AUDIO_CODEC == "inherit" else AUDIO_CODEC for s in audio_streams]
+        titles = [update_track_title(s.get('tags', {}).get('title', f'Track {i+1}'), "Normalized") for i, s in enumerate(audio_streams)]
+
+        temp_outputs = []
+        try:
+            temp_outputs = [create_temp_file(o["path"]) for o in outputs]
+            ffmpeg_cmd = sidecar.build_sidecar_command(media_path, audio_streams, filter_parts, copy_streams, codecs, AUDIO_BITRATE, titles, outputs, temp_outputs)
+            self._run_ffmpeg(ffmpeg_cmd, media_path, "normalizing", "NORMALIZE_SIDECAR", progress_callback, show_ui,
+                             streams=copy_streams.count(False))
+            for temp_output, output in zip(temp_outputs, outputs):
+                move_into_place(temp_output, output["path"])
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+            temp_outputs = []
+            self.logger.success(f"Sidecar audio written: {', '.join(o['path'] for o in outputs)}")
+            return media_path
+        except Exception as e:
+            self.logger.error(f"Normalization failed for {media_path}: {e}")
+            return None
+        finally:
+            for temp_output in temp_outputs:
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                if os.path.exists(temp_output):
+                    os.remove(temp_output)
+
+    def _normalize_targets(self, media_path: str, audio_streams: List[Dict[str, Any]], loudness_data: List[Optional[Dict[str, Any]]],
+                           show_ui: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Write one output per target profile from a single ffmpeg run; the source file is left unchanged.
+
+        Returns `media_path` once every output is in place, None if ffmpeg failed.
+        """
+        profiles = self.target_profiles
+        source = self.source_path(media_path)
+        outputs = [self.output_for(targets_module.output_path(source, p, TARGET_OUTPUT_TEMPLATE)) for p in profiles]
+        keys = {os.path.normcase(os.path.abspath(o)) for o in outputs}
+        if len(keys) != len(outputs) or os.path.normcase(os.path.abspath(source)) in keys:
+            raise ValueError("Target outputs must differ from each other and from the source file")
+
+        unselected = [m is None for m in loudness_data]
+        copy_plan = [
+            [unselected[i] or (STREAM_COPY_IN_TOLERANCE and within_tolerance(m, p, SKIP_TOLERANCE)) for i, m in enumerate(loudness_data)]
+            for p in profiles
+        ]
+        # the measured target_offset only applies to the target the analysis ran with
+        offsets = [None if all(float(p[k]) == float(NORMALIZATION_PARAMS[k]) for k in targets_module.PROFILE_KEYS) else 0 for p in profiles]
+        codecs = [(s.get('codec_name') or FALLBACK_AUDIO_CODEC) if AUDIO_CODEC == "inherit" else AUDIO_CODEC for s in audio_streams]
+        titles = [None if unselected[i] else update_track_title(s.get('tags', {}).get('title', f'Track {i+1}'), "Normalized") for i, s in enumerate(audio_streams)]
+        video_streams = media_info["video"] if media_info else get_video_streams(media_path)
+
+        temp_outputs = []
+        try:
+            for out in outputs:
+                if os.path.dirname(out):
+                    os.makedirs(os.path.dirname(out), exist_ok=True)
+                temp_outputs.append(create_temp_file(out))
+            ffmpeg_cmd = targets_module.build_multi_target_command(
+                media_path, loudness_data, profiles, copy_plan, offsets, codecs, AUDIO_BITRATE, titles, bool(video_streams), temp_outputs
+            )
+            self.logger.info(f"Writing {len(profiles)} target(s) ({', '.join(p['name'] for p in profiles)}): {media_path}")
+            self._run_ffmpeg(ffmpeg_cmd, media_path, "normalizing", "NORMALIZE_TARGETS", progress_callback, show_ui,
+                             streams=sum(row.count(False) for row in copy_plan))
+
+            for temp_output, out in zip(temp_outputs, outputs):
+                move_into_place(temp_output, out)
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+            temp_outputs = []
+            self.logger.success(f"Normalization complete: {', '.join(outputs)}")
+            return media_path
+        except Exception as e:
+            self.logger.error(f"Normalization failed for {media_path}: {e}")
+            return None
+        finally:
+            for temp_output in temp_outputs:
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                if os.path.exists(temp_output):
+                    os.remove(temp_output)
+
+    def normalize_audio(self, media_path: str, show_ui: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None,
+                        loudness_data: Optional[List[Dict[str, Any]]] = None) -> Optional[str]:
+        """Normalize audio tracks in the given media file.
+
+        `media_info` is an optional `probe_media` result to reuse instead of probing again, and
+        `loudness_data` an optional `analyze_audio` result to reuse instead of the first pass.
+        """
+        try:
+            audio_streams = media_info["audio"] if media_info else get_audio_streams(media_path, self.logger)
+            if not audio_streams:
+                raise ValueError("No audio streams found")
+
+            self.logger.info(f"Found {len(audio_streams)} audio stream(s)")
+
+            if loudness_data is None or len(loudness_data) != len(audio_streams):
+                loudness_data = self._first_pass(media_path, audio_streams, progress_callback)
+            # streams outside the stream selection have no measurement and are copied untouched
+            unselected = [m is None for m in loudness_data]
+            if all(unselected):
+                self.logger.info(f"No audio streams match the stream selection, nothing to do: {media_path}")
+                return media_path
 
             if progress_callback:
                 try:
@@ -90,34 +812,69 @@ class AudioProcessor:
                 except Exception:
                     pass
 
+            if self.target_profiles:
+                return self._normalize_targets(media_path, audio_streams, loudness_data, show_ui, progress_callback, media_info)
+
+            if len(audio_streams) == 1 and self.tag_mode(media_path):
+                return self.tag_audio(media_path, loudness_data[0], progress_callback=progress_callback)
+
+            # streams already within SKIP_TOLERANCE of the target are stream-copied, not re-encoded
+            in_tolerance = [m is not None and STREAM_COPY_IN_TOLERANCE and within_tolerance(m, NORMALIZATION_PARAMS, SKIP_TOLERANCE) for m in loudness_data]
+            if any(in_tolerance):
+                self.logger.info(f"Stream-copying {sum(in_tolerance)} in-tolerance audio stream(s): {media_path}")
+            copy_streams = [u or t for u, t in zip(unselected, in_tolerance)]
+            if all(copy_streams):
+                self.logger.info(f"All audio streams are already within tolerance, nothing to do: {media_path}")
+                return media_path
+
+            gains =[None if m is None else linear_gain_db(m, NORMALIZATION_PARAMS) for m in loudness_data]
+            if len(gains) == 1 and gains[0] is not None and not copy_streams[0]:
+                lossless_path = self._lossless_gain(
+                    media_path, audio_streams, gains[0], "normalizing", progress_callback,
+                    max_gain_db=float(NORMALIZATION_PARAMS['TP']) - float(loudness_data[0]['input_tp']),
+                    title=update_track_title(audio_streams[0].get('tags', {}).get('title', 'Track 1'), "Normalized")
+                )
+                if lossless_path:
+                    self.logger.success(f"Normalization complete: {media_path}")
+                    return lossless_path
+            if self.sidecar_mode != "off":
+                video_streams = media_info["video"] if media_info else get_video_streams(media_path)
+                if video_streams:
+                    return self._normalize_sidecar(media_path, audio_streams, loudness_data, copy_streams, show_ui, progress_callback)
+            if not all(copy_streams) and all(g is not None for c, g in zip(copy_streams, gains) if not c):
+                titles = [None if unselected[i] else update_track_title(s.get('tags', {}).get('title', f'Track {i+1}'), "Normalized") for i, s in enumerate(audio_streams)]
+                segmented_path = self._encode_segmented(
+                    media_path, audio_streams, [None if c else f"volume={g:.2f}dB" for c, g in zip(copy_streams, gains)], titles, ["-b:a", AUDIO_BITRATE],
+                    "normalizing", progress_callback, media_info
+                )
+                if segmented_path:
+                    self.logger.success(f"Normalization complete: {media_path}")
+                    return segmented_path
+
             filter_parts = []
             for i, metadata in enumerate(loudness_data):
-                filter_parts.append(
-                    f"[0:a:{i}]loudnorm="
-                    f"I={NORMALIZATION_PARAMS['I']}:"
-                    f"TP={NORMALIZATION_PARAMS['TP']}:"
-                    f"LRA={NORMALIZATION_PARAMS['LRA']}:"
-                    f"measured_I={metadata['input_i']}:"
-                    f"measured_TP={metadata['input_tp']}:"
-                    f"measured_LRA={metadata['input_lra']}:"
-                    f"measured_thresh={metadata['input_thresh']}:"
-                    f"offset={metadata.get('target_offset', 0)}"
-                    f"[a{i}]"
-                )
+                if copy_streams[i]:
+                    continue
+                filter_parts.append(f"[0:a:{i}]{loudnorm_second_pass_filter(metadata, NORMALIZATION_PARAMS)}[a{i}]")
 
             temp_output = create_temp_file(media_path)
-            video_streams = get_video_streams(media_path)
-            ffmpeg_cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0", "-filter_complex", ";".join(filter_parts)]
+            video_streams = media_info["video"] if media_info else get_video_streams(media_path)
+            ffmpeg_cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0"]
+            if filter_parts:
+                ffmpeg_cmd.extend(["-filter_complex", ";".join(filter_parts)])
             if video_streams:
                 ffmpeg_cmd.extend(["-map", "0:v"])
 
             ffmpeg_cmd.extend(["-map", "0:s?"])
 
             for i, stream in enumerate(audio_streams):
+                if unselected[i]:
+                    ffmpeg_cmd.extend(["-map", f"0:a:{i}"])
+                    continue
                 original_title = stream.get('tags', {}).get('title', f'Track {i+1}')
                 new_title = update_track_title(original_title, "Normalized")
                 ffmpeg_cmd.extend([
-                    "-map", f"[a{i}]",
+                    "-map", f"0:a:{i}" if copy_streams[i] else f"[a{i}]",
                     f"-metadata:s:a:{i}", f"title={new_title}",
                     f"-metadata:s:a:{i}", f"handler_name={new_title}"
                 ])
@@ -126,6 +883,9 @@ class AudioProcessor:
             if AUDIO_CODEC == "inherit":
                 ffmpeg_cmd.extend(["-c:v", "copy"])
                 for i, s in enumerate(audio_streams):
+                    if copy_streams[i]:
+                        ffmpeg_cmd.extend([f"-c:a:{i}", "copy"])
+                        continue
                     codec = s.get('codec_name') or FALLBACK_AUDIO_CODEC
                     ffmpeg_cmd.extend([f"-c:a:{i}", codec, f"-b:a:{i}", AUDIO_BITRATE])
                 ffmpeg_cmd.extend(["-c:s", "copy", temp_output])
@@ -134,64 +894,61 @@ class AudioProcessor:
                     "-c:v", "copy",
                     "-c:a", AUDIO_CODEC,
                     "-b:a", AUDIO_BITRATE,
-                    "-c:s", "copy",
-                    temp_output
                 ])
+                for i in range(len(audio_streams)):
+                    if copy_streams[i]:
+                        ffmpeg_cmd.extend([f"-c:a:{i}", "copy"])
+                ffmpeg_cmd.extend(["-c:s", "copy", temp_output])
 
             if progress_callback:
                 try:
                     progress_callback("normalizing")
                 except Exception:
                     pass
-            if progress_callback:
-                process = popen(ffmpeg_cmd)
-                ffmpeg_log = []
-                try:
-                    SignalHandler.register_child_pid(process.pid)
-                except Exception:
-                    pass
-                try:
-                    for line in process.stderr:
-                        last_line = line.strip()
-                        ffmpeg_log.append(last_line)
-                        if last_line:
-                            try:
-                                progress_callback("normalizing", last_line=last_line)
-                            except Exception:
-                                pass
-                    process.wait()
-                finally:
+            with self.thread_budget.reserve("encode", copy_streams.count(False)) as threads:
+                ffmpeg_cmd = with_threads(ffmpeg_cmd, threads)
+                if progress_callback:
+                    process = popen(ffmpeg_cmd)
+                    ffmpeg_log = []
                     try:
-                        SignalHandler.unregister_child_pid(process.pid)
+                        SignalHandler.register_child_pid(process.pid)
                     except Exception:
                         pass
-                try:
-                    if ffmpeg_log:
-                        self.logger.log_ffmpeg("NORMALIZE", media_path, "\n".join(ffmpeg_log))
-                except Exception:
-                    pass
-                if process.returncode != 0:
-                    self.logger.error(f"Normalization failed for {media_path}: ffmpeg exit {process.returncode}")
-                    if 'temp_output' in locals() and os.path.exists(temp_output):
+                    try:
+                        for line in process.stderr:
+                            last_line = line.strip()
+                            ffmpeg_log.append(last_line)
+                            if last_line:
+                                try:
+                                    progress_callback("normalizing", last_line=last_line)
+                                except Exception:
+                                    pass
+                        process.wait()
+                    finally:
                         try:
-                            SignalHandler.unregister_temp_file(temp_output)
+                            SignalHandler.unregister_child_pid(process.pid)
                         except Exception:
                             pass
-                        os.remove(temp_output)
-                    return None
-            else:
-                run_command(ffmpeg_cmd, capture_output=(not show_ui))
+                    try:
+                        if ffmpeg_log:
+                            self.logger.log_ffmpeg("NORMALIZE", media_path, "\n".join(ffmpeg_log))
+                    except Exception:
+                        pass
+                    if process.returncode != 0:
+                        self.logger.error(f"Normalization failed for {media_path}: ffmpeg exit {process.returncode}")
+                        if 'temp_output' in locals() and os.path.exists(temp_output):
+                            try:
+                                SignalHandler.unregister_temp_file(temp_output)
+                            except Exception:
+                                pass
+                            os.remove(temp_output)
+                        return None
+                else:
+                    run_command(ffmpeg_cmd, capture_output=(not show_ui))
 
-            final_path = media_path
-            if os.path.exists(final_path):
-                os.remove(final_path)
-            os.rename(temp_output, final_path)
-            try:
-                SignalHandler.unregister_temp_file(temp_output)
-            except Exception:
-                pass
+            final_path = self._finalize_output(temp_output, media_path)
 
-            self.logger.success(f"Normalization complete: {media_path}")
+            self.logger.success(f"Normalization complete: {final_path}")
             return final_path
 
         except Exception as e:
@@ -205,23 +962,31 @@ class AudioProcessor:
             return None
 
 
-    def boost_audio(self, media_path: str, boost_percent: float, show_ui: bool = False, dry_run: bool = False, progress_callback=None) -> Optional[str]:
+    def boost_audio(self, media_path: str, boost_percent: float, show_ui: bool = False, dry_run: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """Boost audio tracks in the given media file by the specified percentage."""
         try:
             # self.logger.info(f"Starting volume boost ({boost_percent}%): {media_path}")
 
-            audio_streams = get_audio_streams(media_path, self.logger)
+            audio_streams = media_info["audio"] if media_info else get_audio_streams(media_path, self.logger)
             if not audio_streams:
                 raise ValueError("No audio streams found")
 
             self.logger.info(f"Found {len(audio_streams)} audio stream(s)")
             
             volume_multiplier = 1.0 + (boost_percent / 100.0)
-
-            temp_output = create_temp_file(media_path)
+            # streams outside the stream selection are copied untouched
+            selected = self.selected_streams(audio_streams)
+            if not selected:
+                self.logger.info(f"No audio streams match the stream selection, nothing to do: {media_path}")
+                return media_path
+            unselected = [i not in selected for i in range(len(audio_streams))]
 
             filter_parts = []
+            stream_filters = []
             for i, stream in enumerate(audio_streams):
+                if unselected[i]:
+                    stream_filters.append(None)
+                    continue
                 original_title = stream.get('tags', {}).get('title', f'Track {i+1}')
                 new_title = update_track_title(original_title, "Boosted", f"{boost_percent}%")
                 ch = int(stream.get('channels', 0) or 0)
@@ -230,33 +995,66 @@ class AudioProcessor:
                     sr = int(stream.get('sample_rate') or 48000)
                 except Exception:
                     sr = 48000
-                filter_parts.append(
-                    f"[0:a:{i}]aformat=channel_layouts={layout}:sample_fmts=s16:sample_rates={sr},volume={volume_multiplier}[a{i}]"
+                stream_filters.append(f"aformat=channel_layouts={layout}:sample_fmts=s16:sample_rates={sr},volume={volume_multiplier}")
+                filter_parts.append(f"[0:a:{i}]{stream_filters[-1]}[a{i}]")
+
+            max_channels = 0
+            for s in (audio_streams[i] for i in selected):
+                try:
+                    ch = int(s.get('channels', 0) or 0)
+                except Exception:
+                    ch = 0
+                max_channels = max(max_channels, ch)
+            if max_channels <= 0:
+                max_channels = 2
+
+            if not dry_run and volume_multiplier > 0:
+                lossless_path = self._lossless_gain(
+                    media_path, audio_streams, 20 * math.log10(volume_multiplier), "boosting", progress_callback,
+                    title=update_track_title(audio_streams[0].get('tags', {}).get('title', 'Track 1'), "Boosted", f"{boost_percent}%")
                 )
+                if lossless_path:
+                    self.logger.success(f"Boost complete: {media_path}")
+                    return lossless_path
 
+            if not dry_run:
+                titles = [None if unselected[i] else update_track_title(s.get('tags', {}).get('title', f'Track {i+1}'), "Boosted", f"{boost_percent}%") for i, s in enumerate(audio_streams)]
+                segmented_path = self._encode_segmented(
+                    media_path, audio_streams, stream_filters, titles, ["-b:a", AUDIO_BITRATE, "-ac", str(max_channels)],
+                    "boosting", progress_callback, media_info
+                )
+                if segmented_path:
+                    self.logger.success(f"Boost complete: {media_path}")
+                    return segmented_path
+
+            temp_output = create_temp_file(media_path)
             ffmpeg_cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0", "-filter_complex", ";".join(filter_parts)]
-            video_streams = get_video_streams(media_path)
+            video_streams = media_info["video"] if media_info else get_video_streams(media_path)
             if video_streams:
                 ffmpeg_cmd.extend(["-map", "0:v"]) 
 
             ffmpeg_cmd.extend(["-map", "0:s?"])
 
             for i, stream in enumerate(audio_streams):
+                if unselected[i]:
+                    ffmpeg_cmd.extend(["-map", f"0:a:{i}"])
+                    continue
                 original_title = stream.get('tags', {}).get('title', f'Track {i+1}')
                 new_title = update_track_title(original_title, "Boosted", f"{boost_percent}%")
                 ffmpeg_cmd.extend(["-map", f"[a{i}]"])
                 ffmpeg_cmd.extend([f"-metadata:s:a:{i}", f"title={new_title}", f"-metadata:s:a:{i}", f"handler_name={new_title}"])
-            max_channels = 0
-            for s in audio_streams:
-                try:
-                    ch = int(s.get('channels', 0) or 0)
-                except Exception:
-                    ch = 0
-                max_channels = max(max_channels, ch)
-            if max_channels <= 0:
-                max_channels = 2
             # Per-stream codec selection when inheriting original codec
-            if AUDIO_CODEC == "inherit":
+            if any(unselected):
+                # copied streams take no encoder options, so everything is set per encoded stream
+                ffmpeg_cmd.extend(["-c:v", "copy"])
+                for i, s in enumerate(audio_streams):
+                    if unselected[i]:
+                        ffmpeg_cmd.extend([f"-c:a:{i}", "copy"])
+                        continue
+                    codec = (s.get('codec_name') or FALLBACK_AUDIO_CODEC) if AUDIO_CODEC == "inherit" else AUDIO_CODEC
+                    ffmpeg_cmd.extend([f"-c:a:{i}", codec, f"-b:a:{i}", AUDIO_BITRATE, f"-ac:a:{i}", str(max_channels)])
+                ffmpeg_cmd.extend(["-c:s", "copy", temp_output])
+            elif AUDIO_CODEC == "inherit":
                 ffmpeg_cmd.extend(["-c:v", "copy", "-ac", str(max_channels)])
                 for i, s in enumerate(audio_streams):
                     codec = s.get('codec_name') or FALLBACK_AUDIO_CODEC
@@ -265,150 +1063,145 @@ class AudioProcessor:
             else:
                 ffmpeg_cmd.extend(["-c:v", "copy", "-c:a", AUDIO_CODEC, "-b:a", AUDIO_BITRATE, "-ac", str(max_channels), "-c:s", "copy", temp_output])
             
-            run_success = False
-            if show_ui:
-                console = Console()
-                with Live(console=console, refresh_per_second=8) as live:
-                    spinner = Spinner("dots", text=Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]"), style="green")
-                    live.update(Panel(spinner, title="Boosting audio", border_style="green"))
-                    ffmpeg_command_str = ' '.join(ffmpeg_cmd)
-                    try:
-                        self.logger.log_ffmpeg("BOOST_CMD_ARGS", media_path, repr(ffmpeg_cmd))
-                    except Exception:
-                        pass
-                    try:
-                        self.logger.log_ffmpeg("BOOST_CMD", media_path, ffmpeg_command_str)
-                    except Exception:
-                        pass
-                    process = popen(ffmpeg_cmd)
-                    ffmpeg_log = []
-                    try:
-                        SignalHandler.register_child_pid(process.pid)
-                    except Exception:
-                        pass
-                    for line in process.stderr:
-                        last_line = line.strip()
-                        ffmpeg_log.append(last_line)
-                        if last_line:
-                            spinner.text = Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]\n{last_line}")
-                        else:
-                            spinner.text = Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]")
-                        if progress_callback:
-                            try:
-                                progress_callback("boosting", last_line=last_line)
-                            except Exception:
-                                pass
+            with self.thread_budget.reserve("encode", len(selected)) as threads:
+                ffmpeg_cmd = with_threads(ffmpeg_cmd, threads)
+                run_success = False
+                if show_ui:
+                    console = Console()
+                    with Live(console=console, refresh_per_second=8) as live:
+                        spinner = Spinner("dots", text=Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]"), style="green")
                         live.update(Panel(spinner, title="Boosting audio", border_style="green"))
-                    process.wait()
-                    try:
-                        SignalHandler.unregister_child_pid(process.pid)
-                    except Exception:
-                        pass
-
-                    try:
-                        if ffmpeg_log:
-                            self.logger.log_ffmpeg("BOOST", media_path, "\n".join(ffmpeg_log))
-                    except Exception:
-                        pass
-
-                    if process.returncode != 0:
-                        self.logger.error(f"Boost failed for {media_path}: ffmpeg exit {process.returncode}")
-                        if os.path.exists(temp_output):
-                            try:
-                                SignalHandler.unregister_temp_file(temp_output)
-                            except Exception:
-                                pass
-                            try:
-                                os.remove(temp_output)
-                            except Exception:
-                                pass
-                        return None
-                    run_success = True
-
-            else:
-                if progress_callback:
-                    if dry_run:
-                        return media_path
-                    process = popen(ffmpeg_cmd)
-                    ffmpeg_log = []
-                    try:
-                        SignalHandler.register_child_pid(process.pid)
-                    except Exception:
-                        pass
-                    try:
+                        ffmpeg_command_str = ' '.join(ffmpeg_cmd)
+                        try:
+                            self.logger.log_ffmpeg("BOOST_CMD_ARGS", media_path, repr(ffmpeg_cmd))
+                        except Exception:
+                            pass
+                        try:
+                            self.logger.log_ffmpeg("BOOST_CMD", media_path, ffmpeg_command_str)
+                        except Exception:
+                            pass
+                        process = popen(ffmpeg_cmd)
+                        ffmpeg_log = []
+                        try:
+                            SignalHandler.register_child_pid(process.pid)
+                        except Exception:
+                            pass
                         for line in process.stderr:
                             last_line = line.strip()
                             ffmpeg_log.append(last_line)
                             if last_line:
+                                spinner.text = Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]\n{last_line}")
+                            else:
+                                spinner.text = Text.from_markup(f"[bold green]Boosting {len(audio_streams)} audio track{'s' if len(audio_streams) != 1 else ''} by {boost_percent}%...[/bold green]")
+                            if progress_callback:
                                 try:
                                     progress_callback("boosting", last_line=last_line)
                                 except Exception:
                                     pass
+                            live.update(Panel(spinner, title="Boosting audio", border_style="green"))
                         process.wait()
-                    finally:
                         try:
                             SignalHandler.unregister_child_pid(process.pid)
                         except Exception:
                             pass
-                    try:
-                        if ffmpeg_log:
-                            self.logger.log_ffmpeg("BOOST", media_path, "\n".join(ffmpeg_log))
-                    except Exception:
-                        pass
-                    if process.returncode != 0:
-                        self.logger.error(f"Boost failed for {media_path}: ffmpeg exit {process.returncode}")
-                        if os.path.exists(temp_output):
-                            try:
-                                SignalHandler.unregister_temp_file(temp_output)
-                            except Exception:
-                                pass
+
+                        try:
+                            if ffmpeg_log:
+                                self.logger.log_ffmpeg("BOOST", media_path, "\n".join(ffmpeg_log))
+                        except Exception:
+                            pass
+
+                        if process.returncode != 0:
+                            self.logger.error(f"Boost failed for {media_path}: ffmpeg exit {process.returncode}")
+                            if os.path.exists(temp_output):
+                                try:
+                                    SignalHandler.unregister_temp_file(temp_output)
+                                except Exception:
+                                    pass
+                                try:
+                                    os.remove(temp_output)
+                                except Exception:
+                                    pass
+                            return None
+                        run_success = True
+
+                else:
+                    if progress_callback:
+                        if dry_run:
+                            return media_path
+                        process = popen(ffmpeg_cmd)
+                        ffmpeg_log = []
+                        try:
+                            SignalHandler.register_child_pid(process.pid)
+                        except Exception:
+                            pass
+                        try:
+                            for line in process.stderr:
+                                last_line = line.strip()
+                                ffmpeg_log.append(last_line)
+                                if last_line:
+                                    try:
+                                        progress_callback("boosting", last_line=last_line)
+                                    except Exception:
+                                        pass
+                            process.wait()
+                        finally:
                             try:
-                                os.remove(temp_output)
+                                SignalHandler.unregister_child_pid(process.pid)
                             except Exception:
                                 pass
-                        return None
-                    run_success = True
-                else:
-                    if dry_run:
-                        return media_path
-                    try:
-                        result = run_command(ffmpeg_cmd, capture_output=True)
                         try:
-                            if result.stderr:
-                                self.logger.log_ffmpeg("BOOST", media_path, result.stderr)
+                            if ffmpeg_log:
+                                self.logger.log_ffmpeg("BOOST", media_path, "\n".join(ffmpeg_log))
                         except Exception:
                             pass
+                        if process.returncode != 0:
+                            self.logger.error(f"Boost failed for {media_path}: ffmpeg exit {process.returncode}")
+                            if os.path.exists(temp_output):
+                                try:
+                                    SignalHandler.unregister_temp_file(temp_output)
+                                except Exception:
+                                    pass
+                                try:
+                                    os.remove(temp_output)
+                                except Exception:
+                                    pass
+                            return None
                         run_success = True
-                    except Exception as e:
+                    else:
+                        if dry_run:
+                            return media_path
                         try:
-                            self.logger.log_ffmpeg("BOOST_ERROR", media_path, str(e))
-                        except Exception:
-                            pass
-                        self.logger.error(f"Boost failed for {media_path}: {e}")
-                        if os.path.exists(temp_output):
+                            result = run_command(ffmpeg_cmd, capture_output=True)
                             try:
-                                SignalHandler.unregister_temp_file(temp_output)
+                                if result.stderr:
+                                    self.logger.log_ffmpeg("BOOST", media_path, result.stderr)
                             except Exception:
                                 pass
+                            run_success = True
+                        except Exception as e:
                             try:
-                                os.remove(temp_output)
+                                self.logger.log_ffmpeg("BOOST_ERROR", media_path, str(e))
                             except Exception:
                                 pass
-                        return None
+                            self.logger.error(f"Boost failed for {media_path}: {e}")
+                            if os.path.exists(temp_output):
+                                try:
+                                    SignalHandler.unregister_temp_file(temp_output)
+                                except Exception:
+                                    pass
+                                try:
+                                    os.remove(temp_output)
+                                except Exception:
+                                    pass
+                            return None
             if not run_success:
                 return None
             if not os.path.exists(temp_output):
                 self.logger.error(f"Expected temp output not found: {temp_output}")
                 return None
-            final_path = media_path
-            if os.path.exists(final_path):
-                os.remove(final_path)
-            os.rename(temp_output, final_path)
-            try:
-                SignalHandler.unregister_temp_file(temp_output)
-            except Exception:
-                pass
-            self.logger.success(f"Boost complete: {media_path}")
+            final_path = self._finalize_output(temp_output, media_path)
+            self.logger.success(f"Boost complete: {final_path}")
             return final_path
         except Exception as e:
             self.logger.error(f"Boost failed for {media_path}: {e}")
@@ -422,3 +1215,76 @@ class AudioProcessor:
                 except Exception:
                     pass
             return None
+
+    def process_chain(self, media_path: str, operations, show_ui: bool = False, dry_run: bool = False, progress_callback=None,
+                      media_info: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Apply an operation chain (see `chain`) to the selected audio streams in one encode.
+
+        `operations` is a chain string such as "normalize,boost=10" or a `parse_chain` result.
+        Video, subtitles and unselected audio streams are copied.
+        """
+        try:
+            ops = chain.parse_chain(operations) if isinstance(operations, str) else list(operations)
+            audio_streams = media_info["audio"] if media_info else get_audio_streams(media_path, self.logger)
+            if not audio_streams:
+                raise ValueError("No audio streams found")
+
+            selected = self.selected_streams(audio_streams)
+            if not selected:
+                self.logger.info(f"No audio streams match the stream selection, nothing to do: {media_path}")
+                return media_path
+            unselected = [i not in selected for i in range(len(audio_streams))]
+
+            loudness_data = [None] * len(audio_streams)
+            if chain.needs_analysis(ops):
+                loudness_data = self._first_pass(media_path, audio_streams, progress_callback)
+                if progress_callback:
+                    try:
+                        progress_callback("show_params")
+                    except Exception:
+                        pass
+
+            tag = chain.title_tag(ops)
+            filter_parts = []
+            ffmpeg_cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0"]
+            stream_args = []
+            for i, stream in enumerate(audio_streams):
+                if unselected[i]:
+                    stream_args.extend(["-map", f"0:a:{i}", f"-c:a:{i}", "copy"])
+                    continue
+                filter_parts.append(f"[0:a:{i}]{chain.stream_filter(ops, loudness_data[i], NORMALIZATION_PARAMS, stream)}[a{i}]")
+                codec, bitrate = chain.output_options(ops, stream, AUDIO_CODEC, FALLBACK_AUDIO_CODEC, AUDIO_BITRATE)
+                stream_args.extend(["-map", f"[a{i}]", f"-c:a:{i}", codec, f"-b:a:{i}", bitrate])
+                if tag:
+                    new_title = update_track_title(stream.get('tags', {}).get('title', f'Track {i+1}'), *tag)
+                    stream_args.extend([f"-metadata:s:a:{i}", f"title={new_title}", f"-metadata:s:a:{i}", f"handler_name={new_title}"])
+            ffmpeg_cmd.extend(["-filter_complex", ";".join(filter_parts)])
+            video_streams = media_info["video"] if media_info else get_video_streams(media_path)
+            if video_streams:
+                ffmpeg_cmd.extend(["-map", "0:v"])
+            ffmpeg_cmd.extend(["-map", "0:s?"])
+            ffmpeg_cmd.extend(stream_args)
+            temp_output = create_temp_file(media_path)
+            ffmpeg_cmd.extend(["-c:v", "copy", "-c:s", "copy", temp_output])
+            if dry_run:
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                self.logger.info(f"Dry run: {' '.join(ffmpeg_cmd)}")
+                return media_path
+
+            self._run_ffmpeg(ffmpeg_cmd, media_path, "processing", "CHAIN", progress_callback, show_ui, streams=unselected.count(False))
+
+            final_path = self._finalize_output(temp_output, media_path)
+            self.logger.success(f"Chain {chain.describe(ops)} complete: {final_path}")
+            return final_path
+        except Exception as e:
+            self.logger.error(f"Chain failed for {media_path}: {e}")
+            if 'temp_output' in locals() and os.path.exists(temp_output):
+                try:
+                    SignalHandler.unregister_temp_file(temp_output)
+                except Exception:
+                    pass
+                os.remove(temp_output)
+            return None
@@ -33,14 +33,24 @@ def run_command(command: List[str], capture_output: bool = True) -> subprocess.C
         raise RuntimeError(f"Command failed: {' '.join(command)}\n{e.stderr}")
 
 
-def popen(command: List[str]) -> subprocess.Popen:
-    """Start a process with stderr PIPE for live UI consumption."""
+def _resolve_bundled(command: List[str]) -> List[str]:
+    """Swap ffmpeg/ffprobe for a bundled executable when running frozen."""
     try:
         prog = command[0]
         if os.path.basename(prog) in ("ffmpeg", "ffprobe", "ffmpeg.exe", "ffprobe.exe"):
             bundled = get_bundled_executable(os.path.basename(prog))
             if bundled:
-                command = [bundled] + command[1:]
+                return [bundled] + command[1:]
     except Exception:
         pass
-    return subprocess.Popen(command, stderr=subprocess.PIPE, text=True, encoding='utf-8')
+    return command
+
+
+def popen(command: List[str]) -> subprocess.Popen:
+    """Start a process with stderr PIPE for live UI consumption."""
+    return subprocess.Popen(_resolve_bundled(command), stderr=subprocess.PIPE, text=True, encoding='utf-8')
+
+
+def open_pipe(command: List[str]) -> subprocess.Popen:
+    """Start a process with binary stdout PIPE (raw PCM) and stderr PIPE for errors."""
+    return subprocess.Popen(_resolve_bundled(command), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=1 << 20)
@@ -0,0 +1,200 @@
+"""
+Segment-parallel encode pass for linear-gain jobs.
+
+Each audio stream is cut into chunks on its codec's frame grid. Every chunk is
+encoded in its own ffmpeg process as a raw elementary stream, starting a few
+frames early (pre-roll) and ending a few frames late (post-roll), so that the
+frames kept around each boundary were encoded with the real neighbouring
+audio. Pre/post-roll frames (and the encoder priming frame) are then cut out
+at frame level and the kept frames are concatenated byte for byte; frame
+alignment keeps every chunk on the same sample grid, so there is no drift and
+no extra priming or padding at the joins. The concatenated streams are finally
+remuxed next to the copied video and subtitle streams.
+
+The raw streams carry no timestamps, so the remuxed audio starts with the file
+and runs without gaps. Streams that start later (or earlier) than the file, an
+audio delay common in MKV, are therefore left to the single-process encode.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Codec name -> (samples per frame, encoder priming in whole frames, raw muxer).
+# Only fixed-frame codecs whose raw streams can be split at frame headers are listed;
+# anything else falls back to the single-process encode.
+CHUNK_CODECS: Dict[str, Tuple[int, int, str]] = {
+    "aac": (1024, 1, "adts"),
+    "ac3": (1536, 0, "ac3"),
+    "eac3": (1536, 0, "eac3"),
+    "mp2": (1152, 0, "mp2"),
+}
+CHUNK_PREROLL_FRAMES = 8
+# Streams starting more than this many seconds away from the start of the file are not chunked.
+START_OFFSET_TOLERANCE = 0.001
+
+_AC3_BITRATES = (32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384, 448, 512, 576, 640)
+_MP2_BITRATES = {
+    3: (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP2_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def chunk_codec(codec: Optional[str]) -> Optional[Tuple[int, int, str]]:
+    """Return (frame size, priming frames, raw format) if `codec` can be chunk-encoded."""
+    return CHUNK_CODECS.get((codec or "").lower())
+
+
+def start_offset(stream: Dict[str, Any], file_start: Optional[float] = None) -> float:
+    """Seconds between the start of the file (`file_start`, 0 if unknown) and the first sample of `stream`."""
+    try:
+        start = float(stream.get("start_time"))
+    except (TypeError, ValueError):
+        return 0.0
+    return start - (file_start or 0.0)
+
+
+def _frame_length(data: bytes, pos: int, codec: str) -> int:
+    """Byte length of the frame starting at `pos`, or 0 if there is no valid header there."""
+    if codec == "aac":
+        if len(data) - pos < 7 or data[pos] != 0xFF or (data[pos + 1] & 0xF6) != 0xF0:
+            return 0
+        return ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+    if codec in ("ac3", "eac3"):
+        if len(data) - pos < 6 or data[pos] != 0x0B or data[pos + 1] != 0x77:
+            return 0
+        if (data[pos + 5] >> 3) > 10:  # bsid 11-16: E-AC-3 syntax
+            return (((data[pos + 2] & 0x07) << 8) | data[pos + 3]) * 2 + 2
+        fscod, code = data[pos + 4] >> 6, data[pos + 4] & 0x3F
+        if fscod == 3 or code >> 1 >= len(_AC3_BITRATES):
+            return 0
+        kbps = _AC3_BITRATES[code >> 1]
+        words = (kbps * 2, kbps * 960 // 441 + (code & 1), kbps * 3)[fscod]
+        return words * 2
+    if codec == "mp2":
+        if len(data) - pos < 4 or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+            return 0
+        version = (data[pos + 1] >> 3) & 0x03
+        if version == 1 or ((data[pos + 1] >> 1) & 0x03) != 2:
+            return 0
+        bitrate_idx, rate_idx = data[pos + 2] >> 4, (data[pos + 2] >> 2) & 0x03
+        if not 0 < bitrate_idx < 15 or rate_idx == 3:
+            return 0
+        kbps = _MP2_BITRATES[3 if version == 3 else 2][bitrate_idx]
+        rate = _MP2_SAMPLE_RATES[version][rate_idx]
+        return 144000 * kbps // rate + ((data[pos + 2] >> 1) & 0x01)
+    return 0
+
+
+def split_frames(data: bytes, codec: str) -> List[Tuple[int, int]]:
+    """Return (offset, length) of each frame in a raw elementary stream."""
+    frames = []
+    pos = 0
+    while pos < len(data):
+        length = _frame_length(data, pos, codec)
+        if length <= 0 or pos + length > len(data):
+            raise ValueError(f"Invalid {codec} frame at byte {pos}")
+        frames.append((pos, length))
+        pos += length
+    return frames
+
+
+def plan_chunks(duration: float, sample_rate: int, frame_size: int, workers: int, min_chunk_seconds: float) -> List[Dict[str, Any]]:
+    """Split a stream into up to `workers` frame-aligned chunks of at least `min_chunk_seconds`.
+
+    Frame counts are relative to the start of the stream. Each chunk records
+    the frame range it contributes (`first`, `frames`; `frames` is None for the
+    last chunk, which runs to the end) and the pre-roll it decodes ahead of it.
+    Returns an empty list when splitting is not worthwhile.
+    """
+    try:
+        count = int(min(int(workers), duration // float(min_chunk_seconds)))
+        total = int(duration * sample_rate) // frame_size
+    except Exception:
+        return []
+    if count <= 1 or total < count * 2 * CHUNK_PREROLL_FRAMES:
+        return []
+    bounds = [total * k // count for k in range(count + 1)]
+    chunks = []
+    for k in range(count):
+        first = bounds[k]
+        chunks.append({
+            "first": first,
+            "frames": None if k == count - 1 else bounds[k + 1] - first,
+            "preroll": min(first, CHUNK_PREROLL_FRAMES),
+        })
+    return chunks
+
+
+def build_chunk_command(media_path: str, stream_index: int, chunk: Dict[str, Any], codec: str,
+                        sample_rate: int, audio_filter: str, encode_args: List[str], output_path: str) -> List[str]:
+    """Build the ffmpeg command encoding one chunk (with pre/post-roll) of one audio stream."""
+    frame_size, _, raw_format = CHUNK_CODECS[codec]
+    start = (chunk["first"] - chunk["preroll"]) * frame_size / sample_rate
+    cmd = ["ffmpeg", "-y", "-nostdin", "-v", "error"]
+    if start > 0:
+        cmd.extend(["-ss", f"{start:.6f}"])
+    if chunk["frames"] is not None:
+        frames = chunk["preroll"] + chunk["frames"] + CHUNK_PREROLL_FRAMES
+        cmd.extend(["-t", f"{frames * frame_size / sample_rate:.6f}"])
+    cmd.extend([
+        "-i", media_path, "-threads", "1",
+        "-map", f"0:a:{stream_index}",
+        "-af", audio_filter,
+        "-ar", str(sample_rate),
+    ])
+    cmd.extend(encode_args)
+    cmd.extend(["-c:a", codec, "-f", raw_format, output_path])
+    return cmd
+
+
+def append_chunk(chunk_path: str, chunk: Dict[str, Any], codec: str, out) -> int:
+    """Append the frames a chunk contributes to `out`; returns the number of frames written."""
+    _, priming, _ = CHUNK_CODECS[codec]
+    with open(chunk_path, "rb") as fh:
+        data = fh.read()
+    frames = split_frames(data, codec)
+    start = chunk["preroll"] + priming
+    end = len(frames) if chunk["frames"] is None else start + chunk["frames"]
+    if end > len(frames):
+        raise ValueError(f"Chunk {os.path.basename(chunk_path)} is shorter than planned")
+    kept = frames[start:end]
+    if kept:
+        first_offset = kept[0][0]
+        last_offset, last_length = kept[-1]
+        out.write(data[first_offset:last_offset + last_length])
+    return len(kept)
+
+
+def build_remux_command(media_path: str, stream_paths: List[str], audio_streams: List[Dict[str, Any]],
+                        titles: List[str], has_video: bool, output_path: str) -> List[str]:
+    """Remux the concatenated audio streams with the original video and subtitle streams.
+
+    A None entry in `stream_paths` maps that audio stream straight from the source, and
+    a None title keeps the stream's original title.
+    """
+    cmd = ["ffmpeg", "-y", "-i", media_path]
+    inputs = []
+    input_count = 1
+    for i, path in enumerate(stream_paths):
+        if path is None:
+            inputs.append(f"0:a:{i}")
+        else:
+            cmd.extend(["-i", path])
+            inputs.append(f"{input_count}:a")
+            input_count += 1
+    if has_video:
+        cmd.extend(["-map", "0:v"])
+    cmd.extend(["-map", "0:s?"])
+    for i, stream in enumerate(audio_streams):
+        default = bool((stream.get("disposition") or {}).get("default"))
+        cmd.extend([
+            "-map", inputs[i],
+            f"-map_metadata:s:a:{i}", f"0:s:a:{i}",
+        ])
+        if titles[i] is not None:
+            cmd.extend([f"-metadata:s:a:{i}", f"title={titles[i]}", f"-metadata:s:a:{i}", f"handler_name={titles[i]}"])
+        cmd.extend([f"-disposition:a:{i}", "default" if default else "0"])
+    cmd.extend(["-c", "copy", output_path])
+    return cmd
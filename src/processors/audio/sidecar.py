@@ -0,0 +1,62 @@
+"""
+Sidecar audio output: write normalized audio next to a video file instead of rewriting it.
+
+- "mka": one `{stem}.normalized.mka` holding every selected audio stream;
+- "tracks": one `{stem}.{track}.{lang}.mka` per selected stream (track = 1-based
+  audio stream number, lang = the stream's language tag or "und").
+Players such as Jellyfin and Plex list files that share the video's name as external
+audio tracks. Only the audio is written, so the video container is read once and
+never copied.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+
+SIDECAR_MODES = ("off", "mka", "tracks")
+
+
+def _language(stream: Dict[str, Any]) -> str:
+    return ((stream.get("tags") or {}).get("language") or "und").lower()
+
+
+def sidecar_outputs(media_path: str, audio_streams: List[Dict[str, Any]], positions: List[int], mode: str) -> List[Dict[str, Any]]:
+    """Plan the sidecar files: [{"path": ..., "streams": [audio positions]}]."""
+    stem = os.path.splitext(media_path)[0]
+    if mode == "mka":
+        return [{"path": f"{stem}.normalized.mka", "streams": list(positions)}]
+    return [{"path": f"{stem}.{i + 1}.{_language(audio_streams[i])}.mka", "streams": [i]} for i in positions]
+
+
+def up_to_date(media_path: str, outputs: List[Dict[str, Any]]) -> bool:
+    """True if every planned sidecar exists and is not older than the media file."""
+    try:
+        source_mtime = os.stat(media_path).st_mtime_ns
+        return bool(outputs) and all(os.stat(o["path"]).st_mtime_ns >= source_mtime for o in outputs)
+    except OSError:
+        return False
+
+
+def build_sidecar_command(media_path: str, audio_streams: List[Dict[str, Any]], filter_parts: List[str],
+                          copy_streams: List[bool], codecs: List[str], bitrate: str, titles: List[Optional[str]],
+                          outputs: List[Dict[str, Any]], output_paths: List[str]) -> List[str]:
+    """Build one ffmpeg command writing the audio-only sidecar outputs.
+
+    Stream i is taken from the filter graph output `[a{i}]` and encoded with `codecs[i]`,
+    or stream-copied when `copy_streams[i]` is set. Language tags are carried over.
+    """
+    cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0"]
+    if filter_parts:
+        cmd.extend(["-filter_complex", ";".join(filter_parts)])
+    for output, path in zip(outputs, output_paths):
+        for j, i in enumerate(output["streams"]):
+            cmd.extend(["-map", f"0:a:{i}" if copy_streams[i] else f"[a{i}]"])
+            cmd.extend([f"-metadata:s:a:{j}", f"language={_language(audio_streams[i])}"])
+            if titles[i] is not None:
+                cmd.extend([f"-metadata:s:a:{j}", f"title={titles[i]}"])
+            if copy_streams[i]:
+                cmd.extend([f"-c:a:{j}", "copy"])
+            else:
+                cmd.extend([f"-c:a:{j}", codecs[i], f"-b:a:{j}", bitrate])
+        cmd.append(path)
+    return cmd
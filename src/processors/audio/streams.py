@@ -0,0 +1,73 @@
+"""
+Audio stream selection by language, disposition and index.
+
+A selector is one of:
+- "all": every audio stream (the default when no selector is given);
+- "lang=eng,jpn": streams whose `language` tag is one of the listed codes;
+- "default", "original", "comment", ... (or "disposition=default"): streams with
+  that ffprobe disposition flag set;
+- "0,2" (or "index=0,2"): audio streams by position (0 = first audio stream).
+Several selectors select the union of their matches.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+
+DISPOSITIONS = (
+    "default", "dub", "original", "comment", "lyrics", "karaoke", "forced",
+    "hearing_impaired", "visual_impaired", "clean_effects", "descriptions",
+)
+
+
+def parse_selector(text: str) -> Tuple[str, Any]:
+    """Parse one selector string into (kind, value); raises ValueError if it is invalid."""
+    text = (text or "").strip().lower()
+    key, _, value = text.partition("=")
+    if not _:
+        key, value = ("index", text) if text[:1].isdigit() else ("disposition", text)
+    key = {"language": "lang", "idx": "index"}.get(key, key)
+    if key == "disposition" and value == "all":
+        return ("all", None)
+    if key == "lang":
+        codes = tuple(c.strip() for c in value.split(",") if c.strip())
+        if not codes:
+            raise ValueError(f"Invalid stream selector: {text}")
+        return ("lang", codes)
+    if key == "index":
+        try:
+            positions = tuple(int(p) for p in value.split(",") if p.strip())
+        except ValueError:
+            raise ValueError(f"Invalid stream selector: {text}")
+        if not positions or min(positions) < 0:
+            raise ValueError(f"Invalid stream selector: {text}")
+        return ("index", positions)
+    if key == "disposition" and value in DISPOSITIONS:
+        return ("disposition", value)
+    raise ValueError(f"Invalid stream selector: {text}")
+
+
+def parse_selectors(values: Union[None, str, Iterable[str]]) -> List[Tuple[str, Any]]:
+    """Parse a selector string or list of strings; an empty result selects every stream."""
+    if values is None:
+        return []
+    if isinstance(values, str):
+        values = [values]
+    return [parse_selector(v) for v in values if v and str(v).strip()]
+
+
+def _matches(stream: Dict[str, Any], position: int, selector: Tuple[str, Any]) -> bool:
+    kind, value = selector
+    if kind == "all":
+        return True
+    if kind == "index":
+        return position in value
+    if kind == "lang":
+        return ((stream.get("tags") or {}).get("language") or "").lower() in value
+    return bool((stream.get("disposition") or {}).get(value))
+
+
+def select_streams(audio_streams: List[Dict[str, Any]], selectors: List[Tuple[str, Any]]) -> List[int]:
+    """Return the positions of the audio streams matched by any selector, in stream order."""
+    if not selectors:
+        return list(range(len(audio_streams)))
+    return [i for i, s in enumerate(audio_streams) if any(_matches(s, i, sel) for sel in selectors)]
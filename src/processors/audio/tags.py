@@ -0,0 +1,79 @@
+"""
+Loudness gain tags (ReplayGain 2.0 / Opus R128) for metadata-only normalization.
+
+Instead of re-encoding, the first-pass measurement is turned into track (and album)
+gain/peak tags that players apply at playback time. Tags are written with a
+stream-copy remux, so the audio bitstream is never touched.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Extension -> (tag style, where the tags go, extra muxer args).
+# Ogg-based formats keep their comments on the stream; the mov muxer only writes
+# non-iTunes keys with `use_metadata_tags`.
+TAG_FORMATS: Dict[str, Tuple[str, str, List[str]]] = {
+    ".mp3": ("replaygain", "global", ["-id3v2_version", "3"]),
+    ".flac": ("replaygain", "global", []),
+    ".ogg": ("replaygain", "stream", []),
+    ".m4a": ("replaygain", "global", ["-movflags", "use_metadata_tags"]),
+    ".opus": ("r128", "stream", []),
+}
+
+# RFC 7845: R128_*_GAIN values are Q7.8 integers relative to -23 LUFS.
+R128_REFERENCE_LUFS = -23.0
+
+
+def tag_format(extension: str) -> Optional[Tuple[str, str, List[str]]]:
+    """Return (style, target, muxer args) if gain tags can be written for `extension`."""
+    return TAG_FORMATS.get((extension or "").lower())
+
+
+def album_measurement(measurements: List[Dict[str, Any]], durations: List[Optional[float]]) -> Dict[str, str]:
+    """Combine per-track measurements into album loudness and peak.
+
+    Integrated loudness is the duration-weighted energy mean of the tracks (tracks
+    without a known duration weigh as much as the average known one); the album
+    peak is the highest track peak.
+    """
+    known = [d for d in durations if d]
+    fallback = (sum(known) / len(known)) if known else 1.0
+    energy = 0.0
+    total = 0.0
+    for m, d in zip(measurements, durations):
+        weight = float(d) if d else fallback
+        energy += weight * 10 ** (float(m["input_i"]) / 10.0)
+        total += weight
+    loudness = 10 * math.log10(energy / total) if energy > 0 and total > 0 else -70.0
+    peak = max(float(m["input_tp"]) for m in measurements)
+    return {"input_i": f"{loudness:.2f}", "input_tp": f"{peak:.2f}"}
+
+
+def gain_tags(style: str, track: Dict[str, Any], album: Optional[Dict[str, Any]], reference_lufs: float) -> Dict[str, str]:
+    """Build the tag dict for one file from its track (and optional album) measurement."""
+    tags = {}
+    for scope, m in (("TRACK", track), ("ALBUM", album)):
+        if m is None:
+            continue
+        loudness = float(m["input_i"])
+        if style == "r128":
+            tags[f"R128_{scope}_GAIN"] = str(max(-32768, min(32767, int(round((R128_REFERENCE_LUFS - loudness) * 256)))))
+        else:
+            tags[f"REPLAYGAIN_{scope}_GAIN"] = f"{reference_lufs - loudness:.2f} dB"
+            tags[f"REPLAYGAIN_{scope}_PEAK"] = f"{10 ** (float(m['input_tp']) / 20.0):.6f}"
+    if style != "r128":
+        tags["REPLAYGAIN_REFERENCE_LOUDNESS"] = f"{reference_lufs:.2f} LUFS"
+    return tags
+
+
+def build_tag_command(media_path: str, tags: Dict[str, str], extension: str, output_path: str) -> List[str]:
+    """Build the stream-copy remux that writes `tags` and keeps every stream and existing tag."""
+    _, target, muxer_args = TAG_FORMATS[extension.lower()]
+    cmd = ["ffmpeg", "-y", "-i", media_path, "-map", "0", "-map_metadata", "0", "-c", "copy"]
+    spec = "-metadata:s:a:0" if target == "stream" else "-metadata"
+    for key, value in tags.items():
+        cmd.extend([spec, f"{key}={value}"])
+    cmd.extend(muxer_args)
+    cmd.append(output_path)
+    return cmd
@@ -0,0 +1,179 @@
+"""
+Multi-target normalization: several loudness profiles rendered from one decode.
+
+The source is analyzed once; one ffmpeg run then splits every audio stream with
+`asplit`, applies a second-pass loudnorm per profile and writes one output file per
+profile (video and subtitles are stream-copied into each). The source is left as is.
+"""
+
+import os
+import re
+import string
+from typing import Any, Dict, Iterable, List, Optional
+
+from .analysis import loudnorm_second_pass_filter
+
+
+PROFILE_KEYS = ("I", "TP", "LRA")
+
+
+def parse_profiles(raw: Optional[Iterable[Any]], defaults: Dict[str, float]) -> List[Dict[str, Any]]:
+    """Validate profile dicts ({"name", "I", "TP", "LRA", optional "output"}); raises ValueError.
+
+    Missing TP/LRA fall back to `defaults` (NORMALIZATION_PARAMS); names must be unique.
+    """
+    profiles = []
+    for entry in raw or []:
+        if not isinstance(entry, dict) or not str(entry.get("name") or "").strip():
+            raise ValueError(f"Invalid target profile: {entry!r}")
+        profile = {"name": str(entry["name"]).strip()}
+        for key in PROFILE_KEYS:
+            value = entry.get(key, None if key == "I" else defaults.get(key))
+            try:
+                profile[key] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Target profile '{profile['name']}' needs a numeric {key}")
+        if entry.get("output"):
+            profile["output"] = str(entry["output"])
+        if any(p["name"] == profile["name"] for p in profiles):
+            raise ValueError(f"Duplicate target profile name: {profile['name']}")
+        profiles.append(profile)
+    return profiles
+
+
+def select_profiles(profiles: List[Dict[str, Any]], names: Optional[Iterable[str]]) -> List[Dict[str, Any]]:
+    """Return the profiles named in `names` (all of them when `names` is empty); raises ValueError."""
+    wanted = [n.strip() for n in (names or []) if n and n.strip()]
+    if not wanted:
+        return list(profiles)
+    known = {p["name"]: p for p in profiles}
+    missing = [n for n in wanted if n not in known]
+    if missing:
+        raise ValueError(f"Unknown target profile(s): {', '.join(missing)}")
+    return [known[n] for n in dict.fromkeys(wanted)]
+
+
+def output_path(media_path: str, profile: Dict[str, Any], template: str) -> str:
+    """Render the output path for one profile.
+
+    Placeholders: {stem}, {ext} (with the dot), {name}, {I}, {TP}, {LRA}. Relative
+    results are placed next to the source file.
+    """
+    directory, base = os.path.split(media_path)
+    stem, ext = os.path.splitext(base)
+    values = {"stem": stem, "ext": ext, "name": profile["name"]}
+    values.update({k: f"{profile[k]:g}" for k in PROFILE_KEYS})
+    try:
+        rendered = (profile.get("output") or template).format(**values)
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid output template for target '{profile['name']}': {e}")
+    path = rendered if os.path.isabs(rendered) else os.path.join(directory, rendered)
+    return os.path.normpath(path)
+
+
+def output_pattern(profile: Dict[str, Any], template: str) -> "re.Pattern":
+    """Regex matching the outputs `output_path` renders for `profile`.
+
+    Relative templates are matched against the path below the source directory, absolute
+    ones against the whole path; the groups `stem` and `ext` capture the source name.
+    Raises ValueError for unknown placeholders.
+    """
+    values = {"name": profile["name"]}
+    values.update({k: f"{profile[k]:g}" for k in PROFILE_KEYS})
+    separator = r"[/\\]"
+    groups = {"stem": r"[^/\\]+", "ext": r"\.[^./\\]+"}
+    parts, seen = [], set()
+    try:
+        for literal, field, _, _ in string.Formatter().parse(profile.get("output") or template):
+            parts.append(separator.join(re.escape(piece) for piece in re.split(separator, literal)))
+            if field is None:
+                continue
+            if field in groups:
+                parts.append(f"(?P={field})" if field in seen else f"(?P<{field}>{groups[field]})")
+                seen.add(field)
+            elif field in values:
+                parts.append(re.escape(values[field]))
+            else:
+                raise ValueError(f"unknown placeholder {{{field}}}")
+    except ValueError as e:
+        raise ValueError(f"Invalid output template for target '{profile['name']}': {e}")
+    return re.compile("".join(parts))
+
+
+def is_target_output(path: str, profiles: List[Dict[str, Any]], template: str) -> bool:
+    """True if `path` is an output rendered for one of `profiles` from a source that exists.
+
+    Used by directory scans, so earlier outputs are not normalized again as sources.
+    """
+    path = os.path.normpath(os.path.abspath(path))
+    for profile in profiles:
+        try:
+            pattern = output_pattern(profile, template)
+        except ValueError:
+            continue
+        if os.path.isabs(profile.get("output") or template):
+            # a fixed output directory: its sources can be anywhere
+            if pattern.fullmatch(path):
+                return True
+            continue
+        base = os.path.dirname(path)
+        while True:
+            match = pattern.fullmatch(os.path.relpath(path, base))
+            if match:
+                found = match.groupdict()
+                if found.get("stem") is None:
+                    return True
+                source = os.path.join(base, found["stem"] + (found.get("ext") or os.path.splitext(path)[1]))
+                if os.path.normcase(source) != os.path.normcase(path) and os.path.exists(source):
+                    return True
+            parent = os.path.dirname(base)
+            if parent == base:
+                break
+            base = parent
+    return False
+
+
+def build_multi_target_command(media_path: str, loudness_data: List[Optional[Dict[str, Any]]],
+                               profiles: List[Dict[str, Any]], copy_plan: List[List[bool]],
+                               offsets: List[Optional[Any]], codecs: List[str], bitrate: str,
+                               titles: List[Optional[str]], has_video: bool, outputs: List[str]) -> List[str]:
+    """Build one ffmpeg command that writes every profile's output.
+
+    `copy_plan[k][i]` is True when audio stream i is stream-copied into output k (outside
+    the stream selection, or already within tolerance of that profile); streams encoded
+    for more than one profile are split with `asplit`. `offsets[k]` is the loudnorm
+    offset for profile k (None = the measured target_offset), `codecs[i]` the encoder of
+    stream i and `titles[i]` its new title (None = keep the existing metadata).
+    """
+    graph = []
+    for i, metadata in enumerate(loudness_data):
+        branches = [k for k in range(len(profiles)) if not copy_plan[k][i]]
+        if not branches:
+            continue
+        if len(branches) == 1:
+            sources = {branches[0]: f"[0:a:{i}]"}
+        else:
+            sources = {k: f"[s{i}_{k}]" for k in branches}
+            graph.append(f"[0:a:{i}]asplit={len(branches)}" + "".join(sources.values()))
+        for k in branches:
+            graph.append(f"{sources[k]}{loudnorm_second_pass_filter(metadata, profiles[k], offsets[k])}[o{k}a{i}]")
+
+    cmd = ["ffmpeg", "-y", "-i", media_path, "-threads", "0"]
+    if graph:
+        cmd.extend(["-filter_complex", ";".join(graph)])
+    for k, out in enumerate(outputs):
+        if has_video:
+            cmd.extend(["-map", "0:v"])
+        cmd.extend(["-map", "0:s?"])
+        for i in range(len(loudness_data)):
+            cmd.extend(["-map", f"0:a:{i}" if copy_plan[k][i] else f"[o{k}a{i}]"])
+            if titles[i] is not None:
+                cmd.extend([f"-metadata:s:a:{i}", f"title={titles[i]}", f"-metadata:s:a:{i}", f"handler_name={titles[i]}"])
+        cmd.extend(["-c:v", "copy"])
+        for i in range(len(loudness_data)):
+            if copy_plan[k][i]:
+                cmd.extend([f"-c:a:{i}", "copy"])
+            else:
+                cmd.extend([f"-c:a:{i}", codecs[i], f"-b:a:{i}", bitrate])
+        cmd.extend(["-c:s", "copy", out])
+    return cmd
@@ -0,0 +1,113 @@
+"""
+CPU thread budget shared by all concurrent ffmpeg processes.
+
+ffmpeg's default (and `-threads 0`) lets every process size its thread pools to the whole
+machine, so a batch of N parallel jobs runs about N times as many busy threads as there are
+cores. Each ffmpeg run instead reserves an explicit thread count from one process-wide
+budget (THREAD_BUDGET, default: the number of CPUs), and its decoders (input `-threads`),
+encoders (output `-threads`) and filter graphs (`-filter_threads`,
+`-filter_complex_threads`) are each sized to that reservation rather than to the machine.
+Reservations never exceed the budget; a job waits until at least one thread is free and
+gets what it asked for or what is left.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+from core.config import THREAD_BUDGET
+
+
+# (threads per job, threads per processed audio stream) for each kind of ffmpeg run. The
+# reservation caps each of the run's decoder, filter and encoder thread pools:
+# - analysis: demux/decode plus one loudnorm/ebur128 chain per measured stream;
+# - encode: demux/decode plus a filter chain and an encoder per encoded stream;
+# - chunk: one chunk of a segment-parallel encode, its encoder always at `-threads 1`;
+# - copy: stream copy / remux / metadata rewrite (nothing is decoded).
+STAGE_THREADS = {
+    "analysis": (1, 1),
+    "encode": (1, 2),
+    "chunk": (1, 0),
+    "copy": (1, 0),
+}
+
+
+def plan_threads(stage: str, streams: int) -> int:
+    """Number of threads a `stage` run over `streams` audio streams can use."""
+    base, per_stream = STAGE_THREADS.get(stage, (1, 1))
+    return max(base + per_stream * max(int(streams or 0), 0), 1)
+
+
+def with_threads(cmd: List[str], threads: int) -> List[str]:
+    """Return `cmd` with its `-threads 0` set to `threads` and, for filtering runs, filter thread counts.
+
+    Runs that set output `-threads` decode their inputs, so each `-i` also gets an input-side
+    `-threads` (the decoder thread count) unless it already has one. Explicit non-zero
+    `-threads` values (e.g. the `-threads 1` of chunk encodes) are kept. Stream copies are
+    left alone.
+    """
+    count = str(max(int(threads), 1))
+    out = list(cmd)
+    for i in range(len(out) - 1):
+        if out[i] == "-threads" and out[i + 1] == "0":
+            out[i + 1] = count
+    if "-threads" in out:
+        decoded = []
+        for i, arg in enumerate(out):
+            if arg == "-i" and not (i >= 2 and out[i - 2] == "-threads"):
+                decoded.extend(["-threads", count])
+            decoded.append(arg)
+        out = decoded
+    extra = []
+    if "-af" in out or "-filter:a" in out:
+        extra.extend(["-filter_threads", count])
+    if "-filter_complex" in out:
+        extra.extend(["-filter_complex_threads", count])
+    return out[:1] + extra + out[1:]
+
+
+class ThreadBudget:
+    """Counts the ffmpeg threads in use and hands out reservations within `total`."""
+
+    def __init__(self, total: int):
+        self.total = max(int(total), 1)
+        self.in_use = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, wanted: int) -> int:
+        """Block until a thread is free, then reserve up to `wanted` threads; returns the count."""
+        wanted = max(int(wanted), 1)
+        with self._cond:
+            while self.in_use >= self.total:
+                self._cond.wait()
+            granted = min(wanted, self.total - self.in_use)
+            self.in_use += granted
+            return granted
+
+    def release(self, count: int) -> None:
+        with self._cond:
+            self.in_use = max(self.in_use - count, 0)
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, stage: str, streams: int = 1) -> Iterator[int]:
+        """Hold threads for one ffmpeg run of `stage` over `streams` audio streams."""
+        granted = self.acquire(plan_threads(stage, streams))
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+
+_shared: Optional[ThreadBudget] = None
+_shared_lock = threading.Lock()
+
+
+def shared_budget() -> ThreadBudget:
+    """The process-wide budget (THREAD_BUDGET threads; 0 = number of CPUs)."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = ThreadBudget(THREAD_BUDGET or os.cpu_count() or 1)
+        return _shared
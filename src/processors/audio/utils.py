@@ -4,11 +4,17 @@ Utility helpers for metadata and temp file handling.
 
 import os
 import re
+import hashlib
 from typing import Dict
-from core.config import TEMP_SUFFIX
+from core.config import TEMP_SUFFIX, SCRATCH_DIR
 from core.signal_handler import SignalHandler
 
 
+# Read/write size for whole-file copies (staging, cross-filesystem moves): large sequential I/O
+# keeps network shares streaming instead of issuing many small requests.
+COPY_CHUNK_BYTES = 16 * 1024 * 1024
+
+
 def update_track_title(original_title: str, operation: str, extra: str = "") -> str:
     """Update the track title with normalization/boosting tags."""
     cleaned = re.sub(r"\[molexAudio (Normalized|Boosted [^]]+)\] ?", "", original_title).strip()
@@ -19,10 +25,26 @@ def update_track_title(original_title: str, operation: str, extra: str = "") ->
     return f"{tag} {cleaned}".strip()
 
 
+def is_normalized_title(title: str) -> bool:
+    """Return True if a track title carries our own normalization tag."""
+    return bool(title) and "[molexAudio Normalized]" in title
+
+
+def temp_base(original_path: str) -> str:
+    """Base path (without extension) for temporary files of `original_path`: next to it, or in SCRATCH_DIR when set."""
+    base = os.path.splitext(original_path)[0]
+    if not SCRATCH_DIR:
+        return base
+    # a hash of the source directory keeps same-named files from different folders apart
+    tag = hashlib.sha1(os.path.abspath(os.path.dirname(original_path)).encode("utf-8")).hexdigest()[:8]
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    return os.path.join(SCRATCH_DIR, f"{os.path.basename(base)}.{tag}")
+
+
 def create_temp_file(original_path: str) -> str:
-    """Create a temporary file path based on the original file path."""
-    base, ext = os.path.splitext(original_path)
-    temp_path = f"{base}{TEMP_SUFFIX}{ext}"
+    """Create a temporary file path based on the original file path (inside SCRATCH_DIR when set)."""
+    ext = os.path.splitext(original_path)[1]
+    temp_path = f"{temp_base(original_path)}{TEMP_SUFFIX}{ext}"
     try:
         SignalHandler.register_temp_file(temp_path)
     except Exception:
@@ -30,6 +52,67 @@ def create_temp_file(original_path: str) -> str:
     return temp_path
 
 
+def copy_file(src: str, dst: str) -> str:
+    """Copy `src` to `dst` in COPY_CHUNK_BYTES reads and return the SHA-256 of the copied data."""
+    digest = hashlib.sha256()
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        while True:
+            chunk = fin.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            fout.write(chunk)
+        fout.flush()
+        os.fsync(fout.fileno())
+    return digest.hexdigest()
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def move_into_place(temp_path: str, final_path: str) -> None:
+    """Replace `final_path` with a finished temp output, creating its directory if needed.
+
+    A temp file on another filesystem (SCRATCH_DIR, local staging) is first copied next to
+    `final_path`, verified against the checksum of the data read, and then renamed over it
+    atomically, so `final_path` is never missing, half-written or corrupted.
+    """
+    parent = os.path.dirname(final_path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    if os.stat(temp_path).st_dev != os.stat(parent or ".").st_dev:
+        base, ext = os.path.splitext(final_path)
+        staging = f"{base}{TEMP_SUFFIX}{ext}"
+        try:
+            SignalHandler.register_temp_file(staging)
+        except Exception:
+            pass
+        try:
+            if copy_file(temp_path, staging) != file_digest(staging):
+                raise OSError(f"Checksum mismatch after copying {temp_path} to {staging}")
+        except Exception:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+        finally:
+            try:
+                SignalHandler.unregister_temp_file(staging)
+            except Exception:
+                pass
+        os.remove(temp_path)
+        temp_path = staging
+    os.replace(temp_path, final_path)
+
+
 def channels_to_layout(ch: int) -> str:
     """Convert number of channels to audio layout string."""
     return {1: 'mono', 2: 'stereo', 6: '5.1', 8: '7.1'}.get(ch, 'stereo')
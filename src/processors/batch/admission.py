@@ -0,0 +1,119 @@
+"""
+Admission control for batch jobs: memory and concurrent jobs per disk.
+
+Each job's demand is estimated from its probe (audio streams, channels, container
+bitrate). A job only starts when its memory estimate fits the memory budget and its disk
+(`st_dev` of the file it reads) runs fewer than IO_JOBS_PER_DEVICE jobs. Among jobs
+waiting for the same disk, those in the directory last admitted on it go first, then the
+others by directory, so a spinning disk reads one folder after another instead of
+seeking between them. CPU is not gated here: every ffmpeg run reserves its threads from
+the shared thread budget, so I/O-bound work still overlaps on machines with few cores.
+"""
+
+import os
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Memory estimate of one ffmpeg job: a fixed base, buffers per decoded channel (loudnorm
+# works on 192 kHz float frames) and a few seconds of the container's bitrate in flight.
+BASE_MEMORY_MB = 64
+MEMORY_PER_CHANNEL_MB = 16
+BUFFERED_SECONDS = 4
+
+
+def physical_memory_mb() -> Optional[float]:
+    """Installed memory in MB, or None where it cannot be read."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def estimate_demand(file_path: str, media_info: Optional[Dict[str, Any]], stage: str) -> Dict[str, Any]:
+    """Estimate one job's memory (MB), disk (`st_dev`) and directory; `stage` is "analysis" or "encode"."""
+    audio = (media_info or {}).get("audio") or []
+    channels = 0
+    for stream in audio:
+        try:
+            channels += int(stream.get("channels") or 2)
+        except (TypeError, ValueError):
+            channels += 2
+    bit_rate = (media_info or {}).get("bit_rate") or 0
+    try:
+        device = os.stat(file_path).st_dev
+    except OSError:
+        device = None
+    # the encode also buffers the output it writes
+    buffers = 2 if stage == "encode" else 1
+    return {
+        "memory_mb": BASE_MEMORY_MB + MEMORY_PER_CHANNEL_MB * max(channels, 2) + buffers * bit_rate * BUFFERED_SECONDS / 8 / (1024 * 1024),
+        "device": device,
+        "directory": os.path.dirname(os.path.abspath(file_path)),
+    }
+
+
+class AdmissionController:
+    """Admits jobs while their estimated demand fits the memory and per-disk limits.
+
+    `memory_mb` and `per_device` of 0 disable that limit. A job larger than the memory
+    budget is admitted once no other job runs, so oversized jobs still run.
+    """
+
+    def __init__(self, memory_mb: float = 0, per_device: int = 0):
+        self.memory_total = max(float(memory_mb or 0), 0.0)
+        self.per_device = max(int(per_device or 0), 0)
+        self.memory_used = 0.0
+        self.running = 0
+        self.device_jobs: Dict[Any, int] = {}
+        self._last_directory: Dict[Any, str] = {}
+        self._waiting: List[Dict[str, Any]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _fits(self, demand: Dict[str, Any]) -> bool:
+        if self.memory_total and self.running and self.memory_used + demand["memory_mb"] > self.memory_total:
+            return False
+        device = demand["device"]
+        return not (self.per_device and device is not None and self.device_jobs.get(device, 0) >= self.per_device)
+
+    def _rank(self, demand: Dict[str, Any]):
+        return (demand["directory"] != self._last_directory.get(demand["device"]), demand["directory"], demand["seq"])
+
+    def _is_next(self, demand: Dict[str, Any]) -> bool:
+        """True if `demand` fits and no better-placed job for the same disk is waiting and fits."""
+        if not self._fits(demand):
+            return False
+        rank = self._rank(demand)
+        return not any(w is not demand and w["device"] == demand["device"] and self._fits(w) and self._rank(w) < rank
+                       for w in self._waiting)
+
+    @contextmanager
+    def admit(self, demand: Dict[str, Any]) -> Iterator[None]:
+        """Block until the job described by `demand` (see `estimate_demand`) may run, and hold its resources."""
+        demand = dict(demand, seq=next(self._seq))
+        with self._cond:
+            self._waiting.append(demand)
+            try:
+                while not self._is_next(demand):
+                    self._cond.wait()
+            finally:
+                self._waiting.remove(demand)
+            self.memory_used += demand["memory_mb"]
+            self.running += 1
+            if demand["device"] is not None:
+                self.device_jobs[demand["device"]] = self.device_jobs.get(demand["device"], 0) + 1
+                self._last_directory[demand["device"]] = demand["directory"]
+            # other waiters may have been held back only by this job's rank
+            self._cond.notify_all()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.memory_used -= demand["memory_mb"]
+                self.running -= 1
+                if demand["device"] is not None:
+                    self.device_jobs[demand["device"]] -= 1
+                self._cond.notify_all()
@@ -0,0 +1,192 @@
+"""
+Adaptive batch concurrency: the number of jobs allowed to run follows the machine's load.
+
+A background thread samples the load average, CPU utilisation, I/O wait and available
+memory (from /proc on Linux; only the load average elsewhere) every few seconds. When the
+machine is overloaded the job limit shrinks by one, when it is idle and jobs are waiting it
+grows by one, always within [minimum, maximum]. A change needs STEADY_SAMPLES samples in a
+row pointing the same way, and the grow and shrink thresholds leave a dead band between
+them, so the limit does not flap. The limit applies to each pipeline stage (analysis,
+encode, ...) separately, like the batch worker count it replaces. Shrinking only holds back
+new jobs; running jobs are never interrupted.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+
+# Shrink when any of these is exceeded ...
+LOAD_HIGH = 1.0          # 1-minute load average per CPU
+IOWAIT_HIGH = 0.25       # share of CPU time waiting for I/O
+MEMORY_LOW = 0.10        # available memory share
+# ... grow only when all of these hold (and jobs are waiting for a slot).
+LOAD_LOW = 0.7
+IOWAIT_LOW = 0.10
+CPU_BUSY_LOW = 0.80      # share of CPU time not idle
+MEMORY_HIGH = 0.20
+STEADY_SAMPLES = 2
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="ascii", errors="replace") as fh:
+            return fh.read()
+    except OSError:
+        return None
+
+
+class LoadSampler:
+    """Reads system load; CPU shares are computed between two consecutive calls."""
+
+    def __init__(self):
+        self._last_cpu = None
+
+    def _cpu_times(self):
+        stat = _read("/proc/stat")
+        if not stat or not stat.startswith("cpu "):
+            return None
+        try:
+            values = [int(v) for v in stat.splitlines()[0].split()[1:]]
+        except ValueError:
+            return None
+        # user nice system idle iowait irq softirq steal ...
+        idle = values[3] if len(values) > 3 else 0
+        iowait = values[4] if len(values) > 4 else 0
+        return sum(values[:8]), idle, iowait
+
+    def sample(self) -> Dict[str, Optional[float]]:
+        """Return {"load", "cpu_busy", "iowait", "memory_free"}; unknown values are None.
+
+        `load` is the 1-minute load average per CPU, the others are shares between 0 and 1.
+        """
+        result: Dict[str, Optional[float]] = {"load": None, "cpu_busy": None, "iowait": None, "memory_free": None}
+        try:
+            result["load"] = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            pass
+        times = self._cpu_times()
+        if times is not None:
+            if self._last_cpu is not None:
+                total = times[0] - self._last_cpu[0]
+                if total > 0:
+                    result["iowait"] = (times[2] - self._last_cpu[2]) / total
+                    result["cpu_busy"] = 1.0 - (times[1] - self._last_cpu[1] + times[2] - self._last_cpu[2]) / total
+            self._last_cpu = times
+        meminfo = _read("/proc/meminfo")
+        if meminfo:
+            fields = {}
+            for line in meminfo.splitlines():
+                name, _, rest = line.partition(":")
+                parts = rest.split()
+                if parts and parts[0].isdigit():
+                    fields[name] = int(parts[0])
+            if fields.get("MemTotal") and "MemAvailable" in fields:
+                result["memory_free"] = fields["MemAvailable"] / fields["MemTotal"]
+        return result
+
+
+def _describe(sample: Dict[str, Optional[float]]) -> str:
+    parts = []
+    if sample.get("load") is not None:
+        parts.append(f"load {sample['load']:.2f}/cpu")
+    if sample.get("cpu_busy") is not None:
+        parts.append(f"cpu {sample['cpu_busy']:.0%}")
+    if sample.get("iowait") is not None:
+        parts.append(f"iowait {sample['iowait']:.0%}")
+    if sample.get("memory_free") is not None:
+        parts.append(f"memory free {sample['memory_free']:.0%}")
+    return ", ".join(parts) or "no load data"
+
+
+class Autoscaler:
+    """Limits the number of running batch jobs to `limit`, adjusted to the sampled load."""
+
+    def __init__(self, initial: int, minimum: int, maximum: int, interval: float = 10.0,
+                 sampler: Optional[Callable[[], Dict[str, Any]]] = None, logger=None):
+        self.minimum = max(int(minimum), 1)
+        self.maximum = max(int(maximum), self.minimum)
+        self.limit = min(max(int(initial), self.minimum), self.maximum)
+        self.interval = max(float(interval), 0.1)
+        self.sampler = sampler or LoadSampler().sample
+        self.logger = logger
+        self.running: Dict[str, int] = {}
+        self.waiting = 0
+        self._trend = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @contextmanager
+    def slot(self, stage: str = "encode") -> Iterator[None]:
+        """Wait until fewer than `limit` `stage` jobs run, then count this one as running."""
+        with self._cond:
+            self.waiting += 1
+            try:
+                while self.running.get(stage, 0) >= self.limit:
+                    self._cond.wait()
+            finally:
+                self.waiting -= 1
+            self.running[stage] = self.running.get(stage, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running[stage] -= 1
+                self._cond.notify_all()
+
+    def _direction(self, sample: Dict[str, Optional[float]]) -> int:
+        """-1 when the machine is overloaded, +1 when it has room for another job, else 0."""
+        def above(key, limit):
+            return sample.get(key) is not None and sample[key] > limit
+
+        def below(key, limit):
+            return sample.get(key) is None or sample[key] < limit
+
+        if above("load", LOAD_HIGH) or above("iowait", IOWAIT_HIGH) or (sample.get("memory_free") is not None and sample["memory_free"] < MEMORY_LOW):
+            return -1
+        if sample.get("load") is None and sample.get("cpu_busy") is None:
+            return 0
+        if below("load", LOAD_LOW) and below("iowait", IOWAIT_LOW) and below("cpu_busy", CPU_BUSY_LOW) and not below("memory_free", MEMORY_HIGH):
+            return 1
+        return 0
+
+    def step(self, sample: Dict[str, Optional[float]]) -> int:
+        """Apply one load sample and return the (possibly changed) job limit."""
+        direction = self._direction(sample)
+        with self._cond:
+            if direction > 0 and not self.waiting:
+                direction = 0  # nobody is waiting for a slot, growing would not help
+            self._trend = self._trend + direction if direction and (self._trend > 0) == (direction > 0) else direction
+            if abs(self._trend) < STEADY_SAMPLES:
+                return self.limit
+            self._trend = 0
+            new_limit = min(max(self.limit + direction, self.minimum), self.maximum)
+            if new_limit == self.limit:
+                return self.limit
+            old_limit, self.limit = self.limit, new_limit
+            self._cond.notify_all()
+        if self.logger is not None:
+            try:
+                self.logger.info(f"Autoscale: {old_limit} -> {new_limit} workers ({_describe(sample)})")
+            except Exception:
+                pass
+        return new_limit
+
+    def _run(self) -> None:
+        self.sampler()  # the first sample only primes the CPU counters
+        while not self._stop.wait(self.interval):
+            try:
+                self.step(self.sampler())
+            except Exception:
+                pass
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
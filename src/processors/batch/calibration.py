@@ -0,0 +1,185 @@
+"""
+Machine calibration (`--calibrate`): time the batch stages and pick worker and thread counts.
+
+Short synthetic files in the common codecs and channel layouts are generated with ffmpeg's
+lavfi sources. The analysis and encode stages then run on the same set of files for every
+combination of worker count and thread budget in the grid, and the throughput of each
+(media seconds processed per second) is reported. The best combination is written to
+config.json as ANALYSIS_WORKERS, ENCODE_WORKERS and THREAD_BUDGET, together with per-codec
+cost factors from the single-worker runs (CODEC_COST_FACTORS), which the job order uses as
+its cost model.
+"""
+
+import math
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from processors.audio.runner import run_command
+from processors.audio.threads import ThreadBudget
+from . import worker as bp_worker
+
+
+# (codec, channels) of the generated test files.
+SAMPLE_MEDIA = (("aac", 2), ("ac3", 6), ("eac3", 6), ("flac", 2))
+SAMPLE_SECONDS = 30
+# Test files per worker at the largest worker count, so every worker stays busy.
+FILES_PER_WORKER = 2
+# A setting with more workers or threads must be this much faster to be preferred.
+MIN_GAIN = 0.05
+
+
+def worker_grid(limit: int) -> List[int]:
+    """Worker counts to try: powers of two below `limit`, and `limit` itself."""
+    limit = max(int(limit), 1)
+    return sorted({2 ** i for i in range(limit.bit_length()) if 2 ** i < limit} | {limit})
+
+
+def thread_grid(cpus: int) -> List[int]:
+    """Thread budgets to try: half, all and twice the CPUs."""
+    cpus = max(int(cpus), 1)
+    return sorted({max(cpus // 2, 1), cpus, cpus * 2})
+
+
+def generate_samples(directory: str, seconds: float = SAMPLE_SECONDS, copies: int = 1) -> List[Dict[str, Any]]:
+    """Write `copies` pink-noise files per SAMPLE_MEDIA entry to `directory`.
+
+    Returns one {"path", "codec", "channels"} entry per file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    samples = []
+    for codec, channels in SAMPLE_MEDIA:
+        first = os.path.join(directory, f"{codec}_{channels}ch_0.mka")
+        run_command([
+            "ffmpeg", "-y", "-nostdin", "-v", "error",
+            "-f", "lavfi", "-i", f"anoisesrc=d={seconds}:c=pink:r=48000:a=0.2",
+            "-ac", str(channels), "-c:a", codec, first,
+        ])
+        for i in range(max(int(copies), 1)):
+            path = os.path.join(directory, f"{codec}_{channels}ch_{i}.mka")
+            if i:
+                shutil.copyfile(first, path)
+            samples.append({"path": path, "codec": codec, "channels": channels})
+    return samples
+
+
+def _timed_map(task: Callable[[Dict[str, Any]], Any], samples: List[Dict[str, Any]], workers: int) -> Tuple[float, List[Tuple[Any, float]]]:
+    """Run `task` over `samples` on `workers` threads; returns (wall seconds, [(result, seconds)])."""
+    def run(sample):
+        started = time.perf_counter()
+        result = task(sample)
+        return result, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, samples))
+    return time.perf_counter() - started, results
+
+
+def measure(processor, samples: List[Dict[str, Any]], workers: int, seconds: float) -> Dict[str, Any]:
+    """Time the analysis and encode stages of `processor` over `samples` with `workers` jobs at once.
+
+    Returns the throughput of each stage and the per-file seconds of both stages.
+    """
+    media_info = {s["path"]: processor.probe_media(s["path"]) for s in samples}
+
+    def analyze(sample):
+        res = bp_worker.analyze_file(processor, sample["path"], media_info=media_info[sample["path"]])
+        if not res.get("success") or res.get("skipped"):
+            raise RuntimeError(f"Analysis failed for {sample['path']}: {res.get('message')}")
+        return res.get("loudness_data")
+
+    analysis_seconds, analyzed = _timed_map(analyze, samples, workers)
+    loudness = {s["path"]: data for s, (data, _) in zip(samples, analyzed)}
+
+    def encode(sample):
+        res = bp_worker.normalize_file(processor, sample["path"], media_info=media_info[sample["path"]],
+                                       loudness_data=loudness[sample["path"]])
+        if not res.get("success") or res.get("skipped"):
+            raise RuntimeError(f"Encode failed for {sample['path']}: {res.get('message')}")
+
+    encode_seconds, encoded = _timed_map(encode, samples, workers)
+    media_seconds = seconds * len(samples)
+    return {
+        "analysis": media_seconds / max(analysis_seconds, 1e-9),
+        "encode": media_seconds / max(encode_seconds, 1e-9),
+        "file_seconds": [a + e for (_, a), (_, e) in zip(analyzed, encoded)],
+    }
+
+
+def _pick(points: List[Dict[str, Any]], key: str) -> Dict[str, Any]:
+    """The point with the best `key` throughput; larger settings must beat smaller ones by MIN_GAIN."""
+    best = None
+    for point in sorted(points, key=lambda p: (p["workers"], p["threads"])):
+        if best is None or point[key] > best[key] * (1 + MIN_GAIN):
+            best = point
+    return best
+
+
+def choose(points: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Pick ANALYSIS_WORKERS, ENCODE_WORKERS and THREAD_BUDGET from measured grid points.
+
+    For each thread budget the best worker count of each stage is taken; the budget with
+    the best combined throughput (both stages run on every file) wins.
+    """
+    best = None
+    for threads in sorted({p["threads"] for p in points}):
+        at_budget = [p for p in points if p["threads"] == threads]
+        analysis = _pick(at_budget, "analysis")
+        encode = _pick(at_budget, "encode")
+        combined = 1.0 / (1.0 / analysis["analysis"] + 1.0 / encode["encode"])
+        if best is None or combined > best[0] * (1 + MIN_GAIN):
+            best = (combined, {"ANALYSIS_WORKERS": analysis["workers"], "ENCODE_WORKERS": encode["workers"], "THREAD_BUDGET": threads})
+    return best[1]
+
+
+def codec_factors(samples: List[Dict[str, Any]], points: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Per-codec cost relative to AAC, from the per-file times of the single-worker runs."""
+    totals: Dict[str, List[float]] = {}
+    for point in points:
+        if point["workers"] != 1:
+            continue
+        for sample, seconds in zip(samples, point["file_seconds"]):
+            totals.setdefault(sample["codec"], []).append(seconds)
+    costs = {codec: sum(times) / len(times) for codec, times in totals.items() if times}
+    if not costs:
+        return {}
+    reference = costs.get("aac") or min(costs.values())
+    if reference <= 0:
+        return {}
+    return {codec: round(cost / reference, 2) for codec, cost in sorted(costs.items())}
+
+
+def calibrate(work_dir: str, make_processor: Callable[[str], Any], max_workers: Optional[int] = None,
+              seconds: float = SAMPLE_SECONDS, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Run the calibration grid in `work_dir` and return its report.
+
+    `make_processor(output_root)` returns an AudioProcessor that writes its results under
+    `output_root`. The grid covers `worker_grid(max_workers or CPUs)` x `thread_grid(CPUs)`.
+    The report has the measured `points`, the chosen `settings` and the `codec_factors`.
+    """
+    cpus = os.cpu_count() or 1
+    workers_grid = worker_grid(max_workers or cpus)
+    threads_grid = thread_grid(cpus)
+    copies = math.ceil(FILES_PER_WORKER * workers_grid[-1] / len(SAMPLE_MEDIA))
+    if progress:
+        progress(f"Generating {copies * len(SAMPLE_MEDIA)} test files of {seconds:g}s")
+    samples = generate_samples(os.path.join(work_dir, "media"), seconds, copies)
+    points = []
+    for threads in threads_grid:
+        for workers in workers_grid:
+            output_root = os.path.join(work_dir, f"out_{workers}w_{threads}t")
+            processor = make_processor(output_root)
+            processor.thread_budget = ThreadBudget(threads)
+            processor.analysis_cache = None
+            try:
+                result = measure(processor, samples, workers, seconds)
+            finally:
+                shutil.rmtree(output_root, ignore_errors=True)
+            point = dict(result, workers=workers, threads=threads)
+            points.append(point)
+            if progress:
+                progress(f"{workers} workers, {threads} threads: analysis {point['analysis']:.1f}x, encode {point['encode']:.1f}x realtime")
+    return {"points": points, "settings": choose(points), "codec_factors": codec_factors(samples, points)}
@@ -3,26 +3,48 @@ Batch manager containing `BatchProcessor` class; delegates utilities to submodul
 """
 
 import os
+import itertools
 import threading
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple
 from rich.console import Console, Group
 from rich.text import Text
-from core.config import SUPPORTED_EXTENSIONS, TEMP_SUFFIX
-from .utils import find_media_files
+from core.config import SUPPORTED_EXTENSIONS, TEMP_SUFFIX, SCAN_INDEX_ENABLED, ANALYSIS_WORKERS, ENCODE_WORKERS
+from core.config import SCRATCH_DIR, STAGING_ENABLED, STAGING_PREFETCH, MEMORY_BUDGET_MB, IO_JOBS_PER_DEVICE
+from core.config import JOB_ORDER, ORDER_WINDOW, PROBE_PREFETCH_WORKERS, CODEC_COST_FACTORS
+from core.config import AUTOSCALE_ENABLED, AUTOSCALE_MIN_WORKERS, AUTOSCALE_MAX_WORKERS, AUTOSCALE_INTERVAL
+from .utils import iter_media_files
+from .scanner import ScanIndex
+from .staging import StagingArea
+from .admission import AdmissionController, estimate_demand, physical_memory_mb
+from .ordering import order_files
+from .autoscale import Autoscaler
 from core.logger import Logger
 from rich.live import Live
 from rich.spinner import Spinner
 from rich.panel import Panel
 from processors.audio import AudioProcessor
+from processors.audio import tags
+from processors.audio import chain
+from processors.audio.probe import ensure_probe_cache_size
 from queue import Queue
 from . import worker as bp_worker
 from . import ui as bp_ui
 
 
+# Files buffered ahead of the workers per worker; the scanner blocks when the queue is full.
+QUEUE_DEPTH_PER_WORKER = 2
+
 class BatchProcessor:
-    def __init__(self, max_workers: Optional[int] = None):
-        """Initialize BatchProcessor with logger and AudioProcessor."""
+    def __init__(self, max_workers: Optional[int] = None, processor_options: Optional[Dict[str, Any]] = None,
+                 scan_options: Optional[Dict[str, Any]] = None):
+        """Initialize BatchProcessor with logger and AudioProcessor.
+
+        `scan_options` are directory scan filters (`include`, `exclude`, `min_size`,
+        `max_size`, `only_changed`; see `MediaScanner`) and the job `order` of directory
+        runs (`scan`, `longest`, `shortest`; default JOB_ORDER).
+        """
         self.console = Console()
         self.logger = Logger()
         if max_workers is None:
@@ -38,99 +60,433 @@ class BatchProcessor:
             except Exception:
                 self.max_workers = os.cpu_count() or 1
         self.logger.info(f"BatchProcessor max_workers set to: {self.max_workers}")
-        self.audio_processor = AudioProcessor()
+        self.audio_processor = AudioProcessor(**(processor_options or {}))
+        self.scan_options = dict(scan_options or {})
+        self.scan_index = ScanIndex() if SCAN_INDEX_ENABLED else None
+        memory_mb = MEMORY_BUDGET_MB or (physical_memory_mb() or 0) / 2
+        self.admission = AdmissionController(memory_mb, IO_JOBS_PER_DEVICE)
+        self.autoscaler: Optional[Autoscaler] = None
+
+    def _scan_filters(self, task: str) -> Dict[str, Any]:
+        """Keyword filters for `iter_media_files` for this run."""
+        filters = dict(self.scan_options)
+        filters.pop("order", None)
+        is_target_output = getattr(self.audio_processor, "is_target_output", None)
+        if task == "normalize" and is_target_output is not None and getattr(self.audio_processor, "target_profiles", None):
+            # outputs of earlier multi-target runs sit next to their sources; they are not sources
+            filters["skip"] = is_target_output
+        if filters.get("only_changed"):
+            if self.scan_index is None:
+                self.logger.warning("--only-changed needs SCAN_INDEX_ENABLED; scanning all files")
+                filters.pop("only_changed")
+            else:
+                filters.update(index=self.scan_index, task=task)
+        return filters
+
+    def _ordered(self, files: Iterable[str]) -> Iterable[str]:
+        """Reorder a directory run's files by estimated cost when the job order is `longest` or `shortest`.
+
+        The probe cache is grown to hold every probe the order keeps ahead of the workers (the
+        current and the prefetched window, or the whole batch), so the workers reuse them.
+        """
+        mode = self.scan_options.get("order") or JOB_ORDER
+        if mode not in ("longest", "shortest"):
+            return files
+        if ORDER_WINDOW > 0:
+            ensure_probe_cache_size(2 * ORDER_WINDOW + PROBE_PREFETCH_WORKERS)
+        else:
+            files = list(files)
+            ensure_probe_cache_size(len(files))
+        return order_files(files, lambda path: self._probe_file(path)[0], mode, PROBE_PREFETCH_WORKERS, ORDER_WINDOW,
+                           CODEC_COST_FACTORS)
+
+    def _set_input_root(self, path: Optional[str]) -> None:
+        """Tell the processor which directory tree to mirror under its output root (None for single files)."""
+        try:
+            self.audio_processor.input_root = path
+        except Exception:
+            pass
+
+    @contextmanager
+    def _admitted(self, file_path: str, media_info: Optional[Dict[str, Any]], stage: str):
+        """Wait for an autoscaler slot (when autoscaling) and until the admission controller lets a
+        `stage` job on `file_path` run, and hold its resources."""
+        try:
+            demand = estimate_demand(file_path, media_info, stage)
+        except Exception:
+            demand = None
+        autoscaler = self.autoscaler
+        with (autoscaler.slot(stage) if autoscaler is not None else nullcontext()):
+            if demand is None:
+                yield
+                return
+            with self.admission.admit(demand):
+                yield
+
+    def _start_autoscaler(self, worker_count: int) -> int:
+        """Start this run's autoscaler (AUTOSCALE_ENABLED) and return the number of worker threads to create.
+
+        The job limit starts at `worker_count`; threads are created up to the upper bound, so the
+        limit can grow without restarting the pool. Without autoscaling `worker_count` is returned.
+        """
+        self.autoscaler = None
+        if not AUTOSCALE_ENABLED:
+            return worker_count
+        maximum = AUTOSCALE_MAX_WORKERS or max(os.cpu_count() or 1, worker_count)
+        try:
+            autoscaler = Autoscaler(worker_count, AUTOSCALE_MIN_WORKERS, maximum, AUTOSCALE_INTERVAL, logger=self.logger)
+            autoscaler.start()
+        except Exception as e:
+            self.logger.warning(f"Could not start the autoscaler: {e}")
+            return worker_count
+        self.autoscaler = autoscaler
+        self.logger.info(f"Autoscaling between {autoscaler.minimum} and {autoscaler.maximum} workers, starting at {autoscaler.limit}")
+        return autoscaler.maximum
+
+    def _stop_autoscaler(self) -> None:
+        if self.autoscaler is not None:
+            self.autoscaler.stop()
+            self.autoscaler = None
+
+    def _staging_area(self, reserved: int, dry_run: bool) -> Optional[StagingArea]:
+        """Create this run's local staging area (STAGING_ENABLED) and hand its path map to the processor.
+
+        `reserved` is the number of files the workers hold at once; STAGING_PREFETCH more are
+        staged ahead of them.
+        """
+        if not STAGING_ENABLED or dry_run:
+            return None
+        staging = StagingArea(SCRATCH_DIR, reserved + STAGING_PREFETCH, self.logger)
+        try:
+            self.audio_processor.staged_sources = staging.sources
+        except Exception:
+            pass
+        return staging
+
+    def _should_stage(self, file_path: str) -> bool:
+        """Files that are skipped outright or tagged in place are not worth copying."""
+        try:
+            tag_mode = getattr(self.audio_processor, "tag_mode", None)
+            if tag_mode is not None and tag_mode(file_path):
+                return False
+            up_to_date = getattr(self.audio_processor, "output_up_to_date", None)
+            return not (up_to_date is not None and up_to_date(file_path))
+        except Exception:
+            return False
 
+    def _record_processed(self, file_path: str, task: str) -> None:
+        """Remember a successfully processed file in the scan index; index failures never fail the job."""
+        if self.scan_index is None:
+            return
+        try:
+            self.scan_index.record(file_path, task)
+        except Exception:
+            pass
+
+    def _probe_file(self, file_path: str):
+        """Probe a file once; returns (media_info or None, audio track count for the UI).
+
+        The probe result is handed to the worker and processor so the file is not probed again.
+        """
+        probe = getattr(self.audio_processor, "probe_media", None)
+        try:
+            if probe is not None:
+                media_info = probe(file_path)
+                return media_info, len((media_info or {}).get("audio") or [])
+            return None, len(self.audio_processor._get_audio_streams(file_path) or [])
+        except Exception:
+            return None, 0
+
+    def _worker_count(self, max_workers: Optional[int]) -> int:
+        """Resolve the worker count for one run (falls back to 1 on bad input)."""
+        worker_count = max_workers or self.max_workers
+        try:
+            worker_count = int(worker_count) if worker_count else 1
+        except Exception:
+            worker_count = 1
+        return max(worker_count, 1)
+
+    def _stage_workers(self, configured: int, worker_count: int) -> int:
+        """Resolve one pipeline stage's concurrency (0 or bad values = the batch worker count)."""
+        try:
+            configured = int(configured)
+        except Exception:
+            configured = 0
+        return configured if configured > 0 else worker_count
+
+    def _run_stages(self, files: Iterable[Any], stages: List[Tuple[str, int, Callable[[Any, int], Any]]],
+                    status: Optional[bp_ui.StageStatus] = None) -> None:
+        """Run `files` through a pipeline of stages, each on its own long-lived threads.
+
+        `stages` is a list of (name, worker count, task). Stages are connected by bounded
+        queues; `task(item, slot)` returns the item handed to the next stage, or None when
+        the file is done (finished, skipped or failed). UI slots are numbered across all
+        stages in order, so each worker owns one slot for its lifetime. `files` is consumed
+        lazily in the calling thread.
+        """
+        queues = [Queue(maxsize=count * QUEUE_DEPTH_PER_WORKER) for _, count, _ in stages]
+        states = [{"name": name, "workers": count, "busy": 0, "queue": queues[i]} for i, (name, count, _) in enumerate(stages)]
+        if status is not None:
+            status.stages = states
+        busy_lock = threading.Lock()
+
+        def worker(stage_idx: int, slot: int):
+            task = stages[stage_idx][2]
+            jobs = queues[stage_idx]
+            while True:
+                item = jobs.get()
+                if item is None:
+                    return
+                with busy_lock:
+                    states[stage_idx]["busy"] += 1
+                try:
+                    result = task(item, slot)
+                except Exception as e:
+                    self.logger.error(f"Batch worker failed on {item}: {e}")
+                    result = None
+                finally:
+                    with busy_lock:
+                        states[stage_idx]["busy"] -= 1
+                if result is not None and stage_idx + 1 < len(stages):
+                    queues[stage_idx + 1].put(result)
+
+        threads = []
+        slot = 0
+        for stage_idx, (_, count, _) in enumerate(stages):
+            threads.append([threading.Thread(target=worker, args=(stage_idx, slot + i), daemon=True) for i in range(count)])
+            slot += count
+        for stage_threads in threads:
+            for t in stage_threads:
+                t.start()
+        try:
+            for f in files:
+                queues[0].put(f)
+        finally:
+            # drain stage by stage, so every item handed downstream is processed before shutdown
+            for stage_idx, stage_threads in enumerate(threads):
+                for _ in stage_threads:
+                    queues[stage_idx].put(None)
+                for t in stage_threads:
+                    t.join()
+
+    def _run_pool(self, files: Iterable[str], worker_count: int, task: Callable[[str, int], None]) -> None:
+        """Run `task(file_path, slot)` on `worker_count` long-lived threads fed from a bounded queue.
+
+        `files` is consumed lazily in the calling thread, so jobs start as soon as the
+        first file is found and memory does not grow with the number of files. Each
+        worker owns one UI slot for its lifetime.
+        """
+        def run(file_path: str, slot: int):
+            task(file_path, slot)
+
+        self._run_stages(files, [("Workers", worker_count, run)])
 
     def process_directory(self, directory: str, dry_run: bool = False, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """Normalize all supported media files in `directory` with a Rich UI."""
         safe_dir = directory.rstrip("/\\")
         self.logger.info(f"Scanning directory: {safe_dir}")
-        media_files = find_media_files(directory, SUPPORTED_EXTENSIONS)
-        if not media_files:
+        self._set_input_root(directory)
+        media_files = iter_media_files(directory, SUPPORTED_EXTENSIONS, **self._scan_filters("normalize"))
+        first = next(media_files, None)
+        if first is None:
             self.logger.warning("No supported media files found")
             return []
-        self.logger.info(f"Found {len(media_files)} media files")
-        return self.process_files_with_progress(media_files, dry_run=dry_run, max_workers=max_workers)
+        results = self.process_files_with_progress(self._ordered(itertools.chain([first], media_files)), dry_run=dry_run, max_workers=max_workers)
+        self.logger.info(f"Processed {len(results)} media files")
+        return results
 
 
-    def process_files_with_progress(self, files: List[str], dry_run: bool = False, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Process a list of files with a simple threaded pool and Rich Live UI."""
-        worker_count = max_workers or self.max_workers
-        try:
-            worker_count = int(worker_count) if worker_count else 1
-        except Exception:
-            worker_count = 1
+    def process_files_with_progress(self, files: Iterable[str], dry_run: bool = False, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Process files (any iterable, consumed lazily) through the analysis and encode stages with a Rich Live UI.
+
+        The analysis stage (probe, skip check, first pass) runs on ANALYSIS_WORKERS threads and
+        the encode stage (second pass, remux, rename) on ENCODE_WORKERS threads; both default to
+        the batch worker count. The UI shows one panel per busy worker and a line with the
+        per-stage queue depth. With STAGING_ENABLED a staging thread first copies each file to
+        local scratch; both stages then work on the local copy and results are copied back.
+        With AUTOSCALE_ENABLED the number of jobs each stage runs follows the system load.
+        """
+        worker_count = self._start_autoscaler(self._worker_count(max_workers))
+        analysis_count = self._stage_workers(ANALYSIS_WORKERS, worker_count)
+        encode_count = self._stage_workers(ENCODE_WORKERS, worker_count)
+        staging = self._staging_area(analysis_count + encode_count, dry_run)
+        staging_count = 1 if staging is not None else 0
 
         results: List[Dict[str, Any]] = []
         results_lock = threading.Lock()
 
-        # prepare UI slots equal to worker_count
-        panels = [None] * worker_count
-        spinners = [Spinner("dots", "pending") for _ in range(worker_count)]
+        # prepare UI slots: staging, analysis and encode workers in order; the stage status line last
+        stage_status = bp_ui.StageStatus()
+        slot_count = staging_count + analysis_count + encode_count
+        panels = [None] * slot_count + [stage_status]
+        spinners = [Spinner("dots", "pending") for _ in range(slot_count)]
         live_ref = {"live": None}
 
-        # pool of available slot indices
-        slot_queue: Queue = Queue()
-        for i in range(worker_count):
-            slot_queue.put(i)
+        def refresh():
+            if live_ref.get("live"):
+                try:
+                    live_ref["live"].update(bp_ui.render_group(panels))
+                except Exception:
+                    pass
 
-        sem = threading.Semaphore(worker_count)
+        def record(file_path: str, status: str, res: Dict[str, Any]):
+            if status != "Failed" and not dry_run:
+                self._record_processed(file_path, "normalize")
+            result_entry = {
+                "file": file_path,
+                "task": "normalize",
+                "status": status,
+            }
+            if "message" in res:
+                result_entry["message"] = res.get("message")
+            with results_lock:
+                results.append(result_entry)
+
+        def release(file_path: str):
+            if staging is not None:
+                staging.release(file_path)
+
+        def stage_task(file_path: str, idx: int):
+            if self._should_stage(file_path):
+                spinners[idx] = Spinner("dots", "Copying to local scratch...")
+                panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+                refresh()
+                staging.stage(file_path)
+                panels[idx] = None
+                refresh()
+            return file_path
 
-        def run_task(file_path: str):
-            sem.acquire()
-            idx = None
+        def analyze_task(file_path: str, idx: int):
             try:
-                idx = slot_queue.get()
-                # initialize panel for this slot
-                spinners[idx] = Spinner("dots", "Preparing...")
-                panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
-                # probe audio streams to display correct track count in UI
+                job = analyze(file_path, idx)
+            except Exception:
+                release(file_path)
+                raise
+            if job is None:
+                release(file_path)
+            return job
+
+        def analyze(file_path: str, idx: int):
+            # staged files are read from their local copy; results and the UI use the library path
+            source = staging.local_path(file_path) if staging is not None else file_path
+            # initialize panel for this slot
+            spinners[idx] = Spinner("dots", "Preparing...")
+            panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+            # probe once: track count for the UI, streams/duration for the processor
+            media_info, audio_tracks = self._probe_file(source)
+            extra = {"media_info": media_info} if media_info is not None else {}
+            refresh()
+
+            update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), audio_tracks=audio_tracks, **extra)
+            with self._admitted(source, media_info, "analysis"):
+                res = bp_worker.analyze_file(self.audio_processor, source, dry_run=dry_run, progress_callback=update_cb, **extra)
+            if res.get("skipped"):
                 try:
-                    audio_streams = self.audio_processor._get_audio_streams(file_path) or []
+                    update_cb("skipped", last_line=res.get("message"))
                 except Exception:
-                    audio_streams = []
-                if live_ref.get("live"):
-                    try:
-                        live_ref["live"].update(bp_ui.render_group(panels))
-                    except Exception:
-                        pass
-
-                update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), audio_tracks=len(audio_streams))
-                res = bp_worker.normalize_file(self.audio_processor, file_path, dry_run=dry_run, progress_callback=update_cb, show_ui=False)
-                result_entry = {
-                    "file": file_path,
-                    "task": "normalize",
-                    "status": "Success" if res.get("success") else "Failed",
-                }
-                if "message" in res:
-                    result_entry["message"] = res.get("message")
-                with results_lock:
-                    results.append(result_entry)
+                    pass
+                record(file_path, "Skipped", res)
+                return None
+            if not res.get("success"):
+                record(file_path, "Failed", res)
+                return None
+            # hand the file over to the encode stage and free this slot
+            panels[idx] = None
+            refresh()
+            return {"file": file_path, "source": source, "media_info": media_info, "audio_tracks": audio_tracks, "loudness_data": res.get("loudness_data")}
+
+        def encode_task(job: Dict[str, Any], idx: int):
+            try:
+                return encode(job, idx)
             finally:
-                if idx is not None:
-                    slot_queue.put(idx)
-                sem.release()
-
-        threads: List[threading.Thread] = []
-
-        with Live(bp_ui.render_group(panels), refresh_per_second=10) as live:
-            live_ref["live"] = live
-            # start threads for each file, but limit concurrency via semaphore
-            for f in files:
-                t = threading.Thread(target=run_task, args=(f,))
-                t.daemon = True
-                t.start()
-                threads.append(t)
-
-            # wait for all threads to finish
-            for t in threads:
-                t.join()
+                release(job["file"])
+
+        def encode(job: Dict[str, Any], idx: int):
+            file_path = job["file"]
+            media_info = job["media_info"]
+            extra = {"media_info": media_info} if media_info is not None else {}
+            loudness_data = job["loudness_data"]
+            tag_mode = getattr(self.audio_processor, "tag_mode", None)
+            if loudness_data and len(loudness_data) == 1 and tag_mode is not None and tag_mode(file_path):
+                # tag mode: wait until the whole batch is measured so album gain can be computed
+                with results_lock:
+                    albums.setdefault(os.path.dirname(os.path.abspath(file_path)), []).append(job)
+                return None
+            spinners[idx] = Spinner("dots", "Preparing...")
+            panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+            refresh()
+
+            update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), audio_tracks=job["audio_tracks"], **extra)
+            if loudness_data is not None:
+                extra["loudness_data"] = job["loudness_data"]
+            with self._admitted(job["source"], media_info, "encode"):
+                res = bp_worker.normalize_file(self.audio_processor, job["source"], dry_run=dry_run, progress_callback=update_cb, show_ui=False, **extra)
+            if res.get("skipped"):
+                status = "Skipped"
+                try:
+                    update_cb("skipped", last_line=res.get("message"))
+                except Exception:
+                    pass
+            else:
+                status = "Success" if res.get("success") else "Failed"
+            record(file_path, status, res)
+            return None
+
+        def tag_task(job: Dict[str, Any], idx: int):
+            file_path = job["file"]
+            extra = {"media_info": job["media_info"]} if job["media_info"] is not None else {}
+            spinners[idx] = Spinner("dots", "Preparing...")
+            panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+            refresh()
+            update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), audio_tracks=1, **extra)
+            with self._admitted(file_path, job["media_info"], "copy"):
+                res = bp_worker.tag_file(self.audio_processor, file_path, job["loudness_data"][0], album=job.get("album"), dry_run=dry_run, progress_callback=update_cb)
+            record(file_path, "Success" if res.get("success") else "Failed", res)
+            return None
+
+        albums: Dict[str, List[Dict[str, Any]]] = {}
+        stages = [("Analysis", analysis_count, analyze_task), ("Encode", encode_count, encode_task)]
+        if staging is not None:
+            stages.insert(0, ("Staging", staging_count, stage_task))
+        try:
+            with Live(bp_ui.render_group(panels), refresh_per_second=10) as live:
+                live_ref["live"] = live
+                self._run_stages(files, stages, stage_status)
+                if albums:
+                    panels[:-1] = [None] * (len(panels) - 1)
+                    self._run_stages(self._album_jobs(albums), [("Tagging", encode_count, tag_task)], stage_status)
+        finally:
+            self._stop_autoscaler()
+            if staging is not None:
+                staging.release_all()
+                try:
+                    self.audio_processor.staged_sources = {}
+                except Exception:
+                    pass
 
         return results
 
+    def _album_jobs(self, albums: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Attach album measurements to tag-mode jobs; each directory with 2+ tagged files is one album."""
+        jobs = []
+        for tracks in albums.values():
+            album = None
+            if len(tracks) > 1:
+                try:
+                    album = tags.album_measurement(
+                        [t["loudness_data"][0] for t in tracks],
+                        [(t["media_info"] or {}).get("duration") for t in tracks],
+                    )
+                except Exception as e:
+                    self.logger.warning(f"Could not compute album gain: {e}")
+            for t in tracks:
+                jobs.append(dict(t, album=album))
+        return jobs
+
 
     def process_single_file_with_progress(self, file_path: str, dry_run: bool = False) -> Dict[str, Any]:
         """Process a single file and return a single result dict for compatibility with CLI handlers."""
+        self._set_input_root(None)
         res_list = self.process_files_with_progress([file_path], dry_run=dry_run, max_workers=1)
         if res_list:
             return res_list[0]
@@ -138,20 +494,17 @@ class BatchProcessor:
 
 
     def boost_files_with_progress(self, directory: str, boost_percent: float, dry_run: bool = False, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Boost all supported media files in `directory` using threaded workers and Rich UI."""
+        """Boost all supported media files in `directory` using a fixed worker pool and Rich UI."""
         safe_dir = directory.rstrip("/\\")
         self.logger.info(f"Scanning directory for boost: {safe_dir}")
-        media_files = find_media_files(directory, SUPPORTED_EXTENSIONS)
-        if not media_files:
+        self._set_input_root(directory)
+        media_files = iter_media_files(directory, SUPPORTED_EXTENSIONS, **self._scan_filters("boost"))
+        first = next(media_files, None)
+        if first is None:
             self.logger.warning("No supported media files found for boost")
             return []
-        self.logger.info(f"Found {len(media_files)} media files for boost")
 
-        worker_count = max_workers or self.max_workers
-        try:
-            worker_count = int(worker_count) if worker_count else 1
-        except Exception:
-            worker_count = 1
+        worker_count = self._start_autoscaler(self._worker_count(max_workers))
 
         results: List[Dict[str, Any]] = []
         results_lock = threading.Lock()
@@ -160,67 +513,122 @@ class BatchProcessor:
         spinners = [Spinner("dots", "pending") for _ in range(worker_count)]
         live_ref = {"live": None}
 
-        slot_queue: Queue = Queue()
-        for i in range(worker_count):
-            slot_queue.put(i)
-
-        sem = threading.Semaphore(worker_count)
-
-        def run_boost(file_path: str):
-            sem.acquire()
-            idx = None
-            try:
-                idx = slot_queue.get()
-                spinners[idx] = Spinner("dots", "Preparing...")
-                panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
-                try:
-                    audio_streams = self.audio_processor._get_audio_streams(file_path) or []
-                except Exception:
-                    audio_streams = []
-                if live_ref.get("live"):
-                    try:
-                        live_ref["live"].update(bp_ui.render_group(panels))
-                    except Exception:
-                        pass
-
-                update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), boost_percent=boost_percent, audio_tracks=len(audio_streams))
-                try:
-                    update_cb("boosting", last_line=None)
-                except Exception:
-                    pass
-                res = bp_worker.boost_file(self.audio_processor, file_path, boost_percent, dry_run=dry_run, show_ui=False, progress_callback=update_cb)
+        def run_boost(file_path: str, idx: int):
+            spinners[idx] = Spinner("dots", "Preparing...")
+            panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+            media_info, audio_tracks = self._probe_file(file_path)
+            extra = {"media_info": media_info} if media_info is not None else {}
+            if live_ref.get("live"):
                 try:
-                    if res.get("success"):
-                        update_cb("success")
-                    else:
-                        update_cb("finalizing", last_line=res.get("message", ""), error=True)
+                    live_ref["live"].update(bp_ui.render_group(panels))
                 except Exception:
                     pass
-                result_entry = {
-                    "file": file_path,
-                    "task": f"Boost {boost_percent}% Audio",
-                    "status": "Success" if res.get("success") else "Failed",
-                }
-                if "message" in res:
-                    result_entry["message"] = res.get("message")
-                with results_lock:
-                    results.append(result_entry)
-            finally:
-                if idx is not None:
-                    slot_queue.put(idx)
-                sem.release()
 
-        threads: List[threading.Thread] = []
+            update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), boost_percent=boost_percent, audio_tracks=audio_tracks, **extra)
+            try:
+                update_cb("boosting", last_line=None)
+            except Exception:
+                pass
+            with self._admitted(file_path, media_info, "encode"):
+                res = bp_worker.boost_file(self.audio_processor, file_path, boost_percent, dry_run=dry_run, show_ui=False, progress_callback=update_cb, **extra)
+            try:
+                if res.get("success"):
+                    update_cb("success")
+                else:
+                    update_cb("finalizing", last_line=res.get("message", ""), error=True)
+            except Exception:
+                pass
+            result_entry = {
+                "file": file_path,
+                "task": f"Boost {boost_percent}% Audio",
+                "status": ("Skipped" if res.get("skipped") else "Success") if res.get("success") else "Failed",
+            }
+            if res.get("success") and not dry_run:
+                self._record_processed(file_path, "boost")
+            if "message" in res:
+                result_entry["message"] = res.get("message")
+            with results_lock:
+                results.append(result_entry)
 
-        with Live(bp_ui.render_group(panels), refresh_per_second=10) as live:
-            live_ref["live"] = live
-            for f in media_files:
-                t = threading.Thread(target=run_boost, args=(f,))
-                t.daemon = True
-                t.start()
-                threads.append(t)
+        try:
+            with Live(bp_ui.render_group(panels), refresh_per_second=10) as live:
+                live_ref["live"] = live
+                self._run_pool(self._ordered(itertools.chain([first], media_files)), worker_count, run_boost)
+        finally:
+            self._stop_autoscaler()
+
+        self.logger.info(f"Processed {len(results)} media files for boost")
+        return results
+
+
+    def chain_directory(self, directory: str, operations: str, dry_run: bool = False, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Apply an operation chain to all supported media files in `directory`."""
+        safe_dir = directory.rstrip("/\\")
+        self.logger.info(f"Scanning directory for chain: {safe_dir}")
+        media_files = iter_media_files(directory, SUPPORTED_EXTENSIONS, **self._scan_filters("chain"))
+        first = next(media_files, None)
+        if first is None:
+            self.logger.warning("No supported media files found for chain")
+            return []
+        results = self.chain_files_with_progress(self._ordered(itertools.chain([first], media_files)), operations, dry_run=dry_run, max_workers=max_workers, input_root=directory)
+        self.logger.info(f"Processed {len(results)} media files for chain")
+        return results
+
+
+    def chain_files_with_progress(self, files: Iterable[str], operations: str, dry_run: bool = False, max_workers: Optional[int] = None,
+                                  input_root: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Apply an operation chain (e.g. "normalize,boost=10") to files using a fixed worker pool and Rich UI.
 
-            for t in threads:
-                t.join()
+        Every file is decoded and encoded once, whatever the number of operations.
+        `input_root` is the scanned directory, mirrored under the processor's output root.
+        """
+        self._set_input_root(input_root)
+        ops = chain.parse_chain(operations)
+        task_name = f"Chain {chain.describe(ops)}"
+        worker_count = self._start_autoscaler(self._worker_count(max_workers))
 
+        results: List[Dict[str, Any]] = []
+        results_lock = threading.Lock()
+
+        panels = [None] * worker_count
+        spinners = [Spinner("dots", "pending") for _ in range(worker_count)]
+        live_ref = {"live": None}
+
+        def run_chain(file_path: str, idx: int):
+            spinners[idx] = Spinner("dots", "Preparing...")
+            panels[idx] = Panel(spinners[idx], title=f"{os.path.basename(file_path)}")
+            media_info, audio_tracks = self._probe_file(file_path)
+            extra = {"media_info": media_info} if media_info is not None else {}
+            update_cb = bp_ui.make_update_panel(idx, spinners, panels, live_ref, os.path.basename(file_path), audio_tracks=audio_tracks, **extra)
+            try:
+                update_cb("processing", last_line=None)
+            except Exception:
+                pass
+            with self._admitted(file_path, media_info, "encode"):
+                res = bp_worker.chain_file(self.audio_processor, file_path, ops, dry_run=dry_run, progress_callback=update_cb, **extra)
+            try:
+                if res.get("success"):
+                    update_cb("success")
+                else:
+                    update_cb("finalizing", last_line=res.get("message", ""), error=True)
+            except Exception:
+                pass
+            result_entry = {
+                "file": file_path,
+                "task": task_name,
+                "status": ("Skipped" if res.get("skipped") else "Success") if res.get("success") else "Failed",
+            }
+            if res.get("success") and not dry_run:
+                self._record_processed(file_path, "chain")
+            if "message" in res:
+                result_entry["message"] = res.get("message")
+            with results_lock:
+                results.append(result_entry)
+
+        try:
+            with Live(bp_ui.render_group(panels), refresh_per_second=10) as live:
+                live_ref["live"] = live
+                self._run_pool(files, worker_count, run_chain)
+        finally:
+            self._stop_autoscaler()
         return results
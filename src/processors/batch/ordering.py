@@ -0,0 +1,81 @@
+"""
+Job ordering for batch runs: start files by estimated cost instead of scan order.
+
+- "longest": longest processing time first, so a long file found late in the scan does not
+  keep one worker busy after all others are done (shorter batch tail);
+- "shortest": shortest first, for quick early results.
+Files are probed ahead in a small thread pool, `window` files at a time (0 = the whole
+batch); the probes of the next window run while the current one is being processed. Probe
+results are cached, so the workers do not probe again. Codec factors measured by
+`--calibrate` (CODEC_COST_FACTORS) take precedence over the built-in CODEC_FACTORS.
+"""
+
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+
+JOB_ORDERS = ("scan", "longest", "shortest")
+
+# Relative decode + encode cost of an audio stream by source codec (AAC = 1).
+CODEC_FACTORS = {
+    "truehd": 2.5,
+    "mlp": 2.5,
+    "dts": 2.0,
+    "flac": 1.5,
+    "alac": 1.5,
+    "eac3": 1.2,
+    "ac3": 1.0,
+    "aac": 1.0,
+    "opus": 1.0,
+    "vorbis": 1.0,
+    "mp3": 0.8,
+    "mp2": 0.8,
+    "pcm_s16le": 0.5,
+    "pcm_s24le": 0.6,
+}
+
+
+def estimate_cost(media_info: Optional[Dict[str, Any]], factors: Optional[Dict[str, float]] = None) -> float:
+    """Estimated processing cost: duration x audio streams x codec factor (0 when unknown).
+
+    `factors` (e.g. calibrated ones) override CODEC_FACTORS for the codecs they list.
+    """
+    if not media_info:
+        return 0.0
+    factors = dict(CODEC_FACTORS, **factors) if factors else CODEC_FACTORS
+    duration = media_info.get("duration") or 0.0
+    audio = media_info.get("audio") or []
+    return duration * sum(factors.get(str(s.get("codec_name") or "").lower(), 1.0) for s in audio)
+
+
+def order_files(files: Iterable[str], probe: Callable[[str], Optional[Dict[str, Any]]], mode: str,
+                workers: int = 4, window: int = 0, factors: Optional[Dict[str, float]] = None) -> Iterator[str]:
+    """Yield `files` by estimated cost, descending for "longest" and ascending for "shortest".
+
+    `probe(path)` returns a `probe_media` result (None on failure). Files that cannot be
+    probed count as cost 0; ties keep scan order. `factors` is passed on to `estimate_cost`.
+    """
+    it = iter(files)
+
+    def take():
+        return list(itertools.islice(it, window)) if window > 0 else list(it)
+
+    def cost(path: str) -> float:
+        try:
+            return estimate_cost(probe(path), factors)
+        except Exception:
+            return 0.0
+
+    sign = -1.0 if mode == "longest" else 1.0
+    with ThreadPoolExecutor(max_workers=max(int(workers), 1)) as pool:
+        batch = take()
+        pending = [pool.submit(cost, p) for p in batch]
+        while batch:
+            costs = [f.result() for f in pending]
+            # prefetch: probe the next window while this one is handed out
+            next_batch = take() if window > 0 else []
+            next_pending = [pool.submit(cost, p) for p in next_batch]
+            for _, _, path in sorted((sign * c, i, p) for i, (c, p) in enumerate(zip(costs, batch))):
+                yield path
+            batch, pending = next_batch, next_pending
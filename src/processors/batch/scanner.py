@@ -0,0 +1,214 @@
+"""
+Parallel media scanner with filters and an incremental scan index.
+
+Directories are listed with `os.scandir` on a small thread pool (one task per
+directory), so deep trees on network shares are traversed concurrently while
+files are still yielded to the caller as soon as each directory is listed.
+Hardlinks and symlink loops are deduplicated by (device, inode).
+"""
+
+import os
+import time
+import fnmatch
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from core.config import SUPPORTED_EXTENSIONS, LOG_DIR, SCAN_WORKERS, SCAN_INDEX_FILE
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(value) -> Optional[int]:
+    """Parse a byte size such as 500, "700M" or "1.5G" (binary units); None for empty input."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().upper().rstrip("B").rstrip("I")
+    unit = text[-1] if text and text[-1] in _SIZE_UNITS else ""
+    number = text[:-1] if unit else text
+    try:
+        return int(float(number) * _SIZE_UNITS[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size: {value}")
+
+
+def default_index_path() -> str:
+    """Resolve the scan index database path the same way the logger resolves LOG_DIR."""
+    return os.path.join(os.getcwd(), LOG_DIR, SCAN_INDEX_FILE)
+
+
+class ScanIndex:
+    """Persistent (path, task) -> (size, mtime) index of files that were processed successfully."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_index_path()
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection, creating the schema on first use."""
+        if not self._ready:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        if not self._ready:
+            with self._lock:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS files ("
+                    "path TEXT, task TEXT, size INTEGER, mtime_ns INTEGER, updated REAL, "
+                    "PRIMARY KEY (path, task))"
+                )
+                conn.commit()
+                self._ready = True
+        return conn
+
+    def is_unchanged(self, path: str, size: int, mtime_ns: int, task: str) -> bool:
+        """Return True if `path` was recorded for `task` with the same size and mtime."""
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT size, mtime_ns FROM files WHERE path = ? AND task = ?",
+                    (os.path.abspath(path), task),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return False
+        return bool(row) and row[0] == size and row[1] == mtime_ns
+
+    def record(self, path: str, task: str) -> bool:
+        """Record the current size and mtime of `path` for `task`; returns False when nothing was written."""
+        try:
+            st = os.stat(path)
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO files (path, task, size, mtime_ns, updated) VALUES (?, ?, ?, ?, ?)",
+                    (os.path.abspath(path), task, st.st_size, st.st_mtime_ns, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError):
+            return False
+        return True
+
+
+def _matches(rel_path: str, name: str, patterns: Iterable[str]) -> bool:
+    """True if the relative path (forward slashes) or the base name matches any glob."""
+    return any(fnmatch.fnmatch(rel_path, p) or fnmatch.fnmatch(name, p) for p in patterns)
+
+
+class MediaScanner:
+    """Find media files under a directory tree.
+
+    `include`/`exclude` are glob patterns matched against the path relative to the
+    scan root and against the base name (excludes also prune directories).
+    `min_size`/`max_size` are in bytes. With an `index` and `only_changed`, files
+    recorded in the index with the same size and mtime for `task` are left out.
+    Files for which `skip(path)` is True (e.g. earlier target outputs) are left out too.
+    """
+
+    def __init__(self, supported_extensions=SUPPORTED_EXTENSIONS, include: Optional[List[str]] = None,
+                 exclude: Optional[List[str]] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 workers: Optional[int] = None, index: Optional[ScanIndex] = None, only_changed: bool = False,
+                 task: str = "normalize", skip: Optional[Callable[[str], bool]] = None):
+        self.extensions = tuple(e.lower() for e in supported_extensions)
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.min_size = min_size
+        self.max_size = max_size
+        self.workers = max(int(workers or SCAN_WORKERS or 1), 1)
+        self.index = index
+        self.only_changed = only_changed
+        self.task = task
+        self.skip = skip
+
+    def _identity(self, entry: os.DirEntry) -> Optional[Tuple[int, int, os.stat_result]]:
+        """Return (dev, inode, stat) following symlinks, or None if the entry vanished."""
+        try:
+            st = entry.stat()
+            if not st.st_ino:  # scandir on Windows does not fill in inode numbers
+                st = os.stat(entry.path)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino, st
+
+    def _list_dir(self, directory: str) -> Tuple[List[Tuple[str, str, os.stat_result, Tuple[int, int]]], List[Tuple[str, Tuple[int, int]]]]:
+        """List one directory: (candidate files, subdirectories), each with its (dev, inode)."""
+        files, dirs = [], []
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            return files, dirs
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+            if is_dir:
+                ident = self._identity(entry)
+                if ident is not None:
+                    dirs.append((entry.path, ident[:2]))
+            elif is_file and entry.name.lower().endswith(self.extensions):
+                ident = self._identity(entry)
+                if ident is not None:
+                    files.append((entry.path, entry.name, ident[2], ident[:2]))
+        return files, dirs
+
+    def _accept(self, root: str, path: str, name: str, st: os.stat_result) -> bool:
+        """Apply glob, size and scan-index filters to one file."""
+        rel = os.path.relpath(path, root).replace(os.sep, "/")
+        if self.include and not _matches(rel, name, self.include):
+            return False
+        if self.exclude and _matches(rel, name, self.exclude):
+            return False
+        if self.min_size is not None and st.st_size < self.min_size:
+            return False
+        if self.max_size is not None and st.st_size > self.max_size:
+            return False
+        if self.only_changed and self.index is not None:
+            if self.index.is_unchanged(path, st.st_size, st.st_mtime_ns, self.task):
+                return False
+        if self.skip is not None:
+            try:
+                return not self.skip(path)
+            except Exception:
+                return True
+        return True
+
+    def scan(self, root: str) -> Iterator[str]:
+        """Yield matching files as directories are listed (order is not guaranteed)."""
+        try:
+            st = os.stat(root)
+        except OSError:
+            return
+        seen_dirs = {(st.st_dev, st.st_ino)}
+        seen_files = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._list_dir, root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, dirs = future.result()
+                    for path, ident in dirs:
+                        if ident in seen_dirs:
+                            continue
+                        seen_dirs.add(ident)
+                        rel = os.path.relpath(path, root).replace(os.sep, "/")
+                        if self.exclude and _matches(rel, os.path.basename(path), self.exclude):
+                            continue
+                        pending.add(pool.submit(self._list_dir, path))
+                    for path, name, file_st, ident in files:
+                        if ident in seen_files:
+                            continue
+                        seen_files.add(ident)
+                        if self._accept(root, path, name, file_st):
+                            yield path
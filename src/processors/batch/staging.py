@@ -0,0 +1,112 @@
+"""
+Local staging area: batch files are copied to local scratch, processed there and copied back.
+
+On a network share ffmpeg otherwise reads every source twice (analysis and encode) and writes
+the temp output back over the network before a remote rename. With staging, each file crosses
+the network once in each direction, as one sequential copy. Results are copied back by the
+processor (`move_into_place`), checksum-verified and renamed over the original.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from core.signal_handler import SignalHandler
+from processors.audio.utils import copy_file
+
+
+class StagingArea:
+    """Copies of library files in a local directory, limited to `limit` files at a time.
+
+    `stage` blocks while `limit` files are staged, so a staging thread running ahead of the
+    workers prefetches at most that many files. `sources` maps each local copy back to its
+    library path and is shared with the audio processor.
+    """
+
+    def __init__(self, directory: Optional[str], limit: int, logger=None):
+        self.directory = directory or tempfile.gettempdir()
+        self.logger = logger
+        self.sources: Dict[str, str] = {}
+        self._local: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max(int(limit), 1))
+
+    def stage(self, file_path: str) -> Optional[str]:
+        """Copy `file_path` into the staging directory and return the local path.
+
+        Returns None (process the file in place) if there is not enough free space for the
+        copy and its output, or if the copy fails.
+        """
+        self._slots.acquire()
+        local = None
+        try:
+            size = os.path.getsize(file_path)
+            os.makedirs(self.directory, exist_ok=True)
+            # room for the copy and the encoded output next to it
+            if shutil.disk_usage(self.directory).free < 2 * size:
+                self._warn(f"Not enough space in {self.directory} to stage {file_path}; processing in place")
+                self._slots.release()
+                return None
+            stem, ext = os.path.splitext(os.path.basename(file_path))
+            fd, local = tempfile.mkstemp(prefix=f"{stem}.", suffix=ext, dir=self.directory)
+            os.close(fd)
+            try:
+                SignalHandler.register_temp_file(local)
+            except Exception:
+                pass
+            copy_file(file_path, local)
+            # keep the mtime, so skip checks and caches see the same file
+            st = os.stat(file_path)
+            os.utime(local, ns=(st.st_atime_ns, st.st_mtime_ns))
+        except Exception as e:
+            self._warn(f"Could not stage {file_path}: {e}; processing in place")
+            if local is not None:
+                self._remove(local)
+            self._slots.release()
+            return None
+        with self._lock:
+            self.sources[local] = file_path
+            self._local[file_path] = local
+        return local
+
+    def local_path(self, file_path: str) -> str:
+        """The staged copy of `file_path`, or `file_path` itself when it is not staged."""
+        with self._lock:
+            return self._local.get(file_path, file_path)
+
+    def release(self, file_path: str) -> None:
+        """Delete the staged copy of `file_path` (if any) and free its slot."""
+        with self._lock:
+            local = self._local.pop(file_path, None)
+            if local is None:
+                return
+            self.sources.pop(local, None)
+        self._remove(local)
+        self._slots.release()
+
+    def release_all(self) -> None:
+        """Delete every remaining staged copy (end of a run)."""
+        with self._lock:
+            staged = list(self._local)
+        for file_path in staged:
+            self.release(file_path)
+
+    def _remove(self, local: str) -> None:
+        try:
+            if os.path.exists(local):
+                os.remove(local)
+        except OSError as e:
+            self._warn(f"Could not remove staged copy {local}: {e}")
+        try:
+            SignalHandler.unregister_temp_file(local)
+        except Exception:
+            pass
+
+    def _warn(self, message: str) -> None:
+        if self.logger is not None:
+            try:
+                self.logger.warning(message)
+            except Exception:
+                pass
@@ -2,7 +2,7 @@
 UI helper utilities for batch processing (panels, spinners, update closures).
 """
 
-from typing import Callable, List, Any
+from typing import Callable, List, Any, Optional, Dict
 from rich.text import Text
 from rich.panel import Panel
 from rich.spinner import Spinner
@@ -14,8 +14,46 @@ def render_group(panels: List[Panel]) -> Group:
     return Group(*(p for p in panels if p is not None))
 
 
-def make_update_panel(idx: int, spinners: List[Spinner], panels: List[Panel], live_ref: dict, file: str, *, boost_percent: float = None, audio_tracks: int = 0) -> Callable:
-    """Create a closure to update a specific panel in the live display."""
+class StageStatus:
+    """One-line pipeline summary (busy workers and queued files per stage), re-rendered on every refresh.
+
+    `stages` is filled in by the batch manager with dicts holding `name`, `workers`,
+    `busy` and the stage's input `queue`.
+    """
+
+    def __init__(self):
+        self.stages: List[Dict[str, Any]] = []
+
+    def __rich__(self) -> Text:
+        parts = []
+        for stage in self.stages:
+            try:
+                queued = stage["queue"].qsize()
+            except Exception:
+                queued = 0
+            parts.append(f"[bold]{stage['name']}[/bold] {stage['busy']}/{stage['workers']} busy, {queued} queued")
+        return Text.from_markup("  |  ".join(parts))
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format a duration in seconds as H:MM:SS (or M:SS under an hour)."""
+    try:
+        total = int(round(float(seconds)))
+    except (TypeError, ValueError):
+        return ""
+    hours, rem = divmod(total, 3600)
+    minutes, secs = divmod(rem, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def make_update_panel(idx: int, spinners: List[Spinner], panels: List[Panel], live_ref: dict, file: str, *, boost_percent: float = None, audio_tracks: int = 0, media_info: Optional[Dict[str, Any]] = None) -> Callable:
+    """Create a closure to update a specific panel in the live display.
+
+    When a `probe_media` result is given, the panel title also shows the file's duration.
+    """
+    duration = format_duration((media_info or {}).get("duration"))
+    if duration:
+        file = f"{file} ({duration})"
     def update_panel(stage: str, last_line: str = None, error: bool = False, info_panel: Any = None):
         """Update the panel for the given file based on the current stage."""
         if boost_percent is not None:
@@ -77,6 +115,28 @@ def make_update_panel(idx: int, spinners: List[Spinner], panels: List[Panel], li
                         live_ref["live"].update(render_group(panels))
                     except Exception:
                         pass
+            elif stage == "processing":
+                text = "[bold bright_blue]Processing...[/bold bright_blue]"
+                if last_line:
+                    text += f"\n{last_line}"
+                spinners[idx].text = Text.from_markup(text)
+                panels[idx] = Panel(spinners[idx], title=f"{file}", border_style="bright_blue")
+                if live_ref.get("live"):
+                    try:
+                        live_ref["live"].update(render_group(panels))
+                    except Exception:
+                        pass
+            elif stage == "tagging":
+                text = "[bold bright_blue]Writing gain tags...[/bold bright_blue]"
+                if last_line:
+                    text += f"\n{last_line}"
+                spinners[idx].text = Text.from_markup(text)
+                panels[idx] = Panel(spinners[idx], title=f"{file}", border_style="bright_blue")
+                if live_ref.get("live"):
+                    try:
+                        live_ref["live"].update(render_group(panels))
+                    except Exception:
+                        pass
             elif stage == "finalizing":
                 spinners[idx].text = Text.from_markup("[green]Finalizing...[/green]")
                 panels[idx] = Panel(spinners[idx], title=f"{file}", border_style="magenta")
@@ -93,6 +153,17 @@ def make_update_panel(idx: int, spinners: List[Spinner], panels: List[Panel], li
                         live_ref["live"].update(render_group(panels))
                     except Exception:
                         pass
+            elif stage == "skipped":
+                text = "[bold yellow]Skipped[/bold yellow]"
+                if last_line:
+                    text += f"\n{last_line}"
+                spinners[idx].text = Text.from_markup(text)
+                panels[idx] = Panel(spinners[idx], title=f"{file}", border_style="yellow")
+                if live_ref.get("live"):
+                    try:
+                        live_ref["live"].update(render_group(panels))
+                    except Exception:
+                        pass
         if info_panel is not None:
             try:
                 panels[idx] = Panel(info_panel, title=f"{file}")
@@ -2,16 +2,16 @@
 Utility helpers for batch processing (processors.batch).
 """
 
-import os
-from typing import List
+from typing import Iterator, List
 from core.config import SUPPORTED_EXTENSIONS
+from .scanner import MediaScanner
+
+
+def iter_media_files(directory: str, supported_extensions=SUPPORTED_EXTENSIONS, **filters) -> Iterator[str]:
+    """Lazily yield media files with supported extensions; `filters` are `MediaScanner` options."""
+    return MediaScanner(supported_extensions, **filters).scan(directory)
 
 
 def find_media_files(directory: str, supported_extensions=SUPPORTED_EXTENSIONS) -> List[str]:
     """Recursively find media files in a directory with supported extensions."""
-    media_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(supported_extensions):
-                media_files.append(os.path.join(root, file))
-    return media_files
+    return list(iter_media_files(directory, supported_extensions))
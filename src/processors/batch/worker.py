@@ -1,16 +1,18 @@
 """
-Core processing functions for individual files (normalize / boost).
+Core processing functions for individual files (normalize / boost / chain).
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
-def boost_file(audio_processor, file_path: str, boost_percent: float, dry_run: bool = False, show_ui: bool = False, progress_callback=None) -> Dict[str, Any]:
+def boost_file(audio_processor, file_path: str, boost_percent: float, dry_run: bool = False, show_ui: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Boost a single audio file."""
     if dry_run:
         return {"success": True, "message": "Dry Run"}
     try:
-        res = audio_processor.boost_audio(file_path, boost_percent, show_ui=show_ui, dry_run=dry_run, progress_callback=progress_callback)
+        if audio_processor.output_up_to_date(file_path):
+            return {"success": True, "skipped": True, "message": "Output is up to date"}
+        res = audio_processor.boost_audio(file_path, boost_percent, show_ui=show_ui, dry_run=dry_run, progress_callback=progress_callback, media_info=media_info)
         if res:
             return {"success": True}
         return {"success": False, "message": "Boost failed"}
@@ -18,14 +20,71 @@ def boost_file(audio_processor, file_path: str, boost_percent: float, dry_run: b
         return {"success": False, "message": str(e)}
 
 
-def normalize_file(audio_processor, file_path: str, dry_run: bool = False, progress_callback=None, show_ui: bool = False) -> Dict[str, Any]:
-    """Normalize a single audio file."""
+def analyze_file(audio_processor, file_path: str, dry_run: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the skip check and first pass for a single file (analysis stage of the batch pipeline).
+
+    On success the result carries `loudness_data` for `normalize_file`.
+    """
+    if dry_run:
+        return {"success": True, "message": "Dry Run"}
+    try:
+        reason = audio_processor.check_skip(file_path, media_info["audio"] if media_info else None)
+        if reason:
+            return {"success": True, "skipped": True, "message": reason}
+        loudness_data = audio_processor.analyze_audio(file_path, progress_callback=progress_callback, media_info=media_info)
+        if loudness_data:
+            return {"success": True, "loudness_data": loudness_data}
+        return {"success": False, "message": "Analysis failed"}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
+def normalize_file(audio_processor, file_path: str, dry_run: bool = False, progress_callback=None, show_ui: bool = False, media_info: Optional[Dict[str, Any]] = None,
+                   loudness_data: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Normalize a single audio file.
+
+    `media_info` is an optional `probe_media` result that is handed on to the processor.
+    `loudness_data` comes from `analyze_file`; the skip check already ran there, so it is not repeated.
+    """
     if dry_run:
         return {"success": True, "message": "Dry Run"}
     try:
-        res = audio_processor.normalize_audio(file_path, show_ui=show_ui, progress_callback=progress_callback)
+        if loudness_data is None:
+            reason = audio_processor.check_skip(file_path, media_info["audio"] if media_info else None)
+            if reason:
+                return {"success": True, "skipped": True, "message": reason}
+        res = audio_processor.normalize_audio(file_path, show_ui=show_ui, progress_callback=progress_callback, media_info=media_info,
+                                              loudness_data=loudness_data)
         if res:
             return {"success": True}
         return {"success": False, "message": "Normalization failed"}
     except Exception as e:
         return {"success": False, "message": str(e)}
+
+
+def tag_file(audio_processor, file_path: str, track: Dict[str, Any], album: Optional[Dict[str, Any]] = None, dry_run: bool = False, progress_callback=None) -> Dict[str, Any]:
+    """Write loudness gain tags for a single file (tag mode)."""
+    if dry_run:
+        return {"success": True, "message": "Dry Run"}
+    try:
+        res = audio_processor.tag_audio(file_path, track, album=album, progress_callback=progress_callback)
+        if res:
+            return {"success": True}
+        return {"success": False, "message": "Tagging failed"}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
+
+
+def chain_file(audio_processor, file_path: str, operations, dry_run: bool = False, progress_callback=None, media_info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Apply an operation chain to a single file in one encode."""
+    if dry_run:
+        return {"success": True, "message": "Dry Run"}
+    try:
+        if audio_processor.output_up_to_date(file_path):
+            return {"success": True, "skipped": True, "message": "Output is up to date"}
+        res = audio_processor.process_chain(file_path, operations, progress_callback=progress_callback, media_info=media_info)
+        if res:
+            return {"success": True}
+        return {"success": False, "message": "Chain failed"}
+    except Exception as e:
+        return {"success": False, "message": str(e)}
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import cache as cache_module
+from processors.batch import scanner as scanner_module
+
+
+@pytest.fixture(autouse=True)
+def isolated_analysis_cache(monkeypatch, tmp_path):
+    """Keep every test's loudness cache in its own tmp_path, never in the working directory."""
+    monkeypatch.setattr(cache_module, "default_cache_path", lambda: str(tmp_path / "analysis_cache.sqlite"))
+
+
+@pytest.fixture(autouse=True)
+def isolated_scan_index(monkeypatch, tmp_path):
+    """Keep every test's scan index in its own tmp_path, never in the working directory."""
+    monkeypatch.setattr(scanner_module, "default_index_path", lambda: str(tmp_path / "scan_index.sqlite"))
@@ -0,0 +1,73 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.batch.admission import AdmissionController, estimate_demand, BASE_MEMORY_MB, MEMORY_PER_CHANNEL_MB
+
+
+def _wait_for(predicate):
+    deadline = time.time() + 5
+    while not predicate() and time.time() < deadline:
+        time.sleep(0.005)
+    assert predicate()
+
+
+def test_estimate_demand_from_probe(tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+    info = {"audio": [{"channels": 6}, {"channels": 2}], "bit_rate": 8 * 1024 * 1024}
+    analysis = estimate_demand(str(media), info, "analysis")
+    assert analysis["memory_mb"] == BASE_MEMORY_MB + 8 * MEMORY_PER_CHANNEL_MB + 4
+    assert estimate_demand(str(media), info, "encode")["memory_mb"] == analysis["memory_mb"] + 4
+    assert analysis["device"] == media.stat().st_dev and analysis["directory"] == str(tmp_path)
+    assert estimate_demand(str(tmp_path / "missing.mkv"), None, "encode")["device"] is None
+
+
+def test_same_disk_jobs_are_limited_and_grouped_by_directory():
+    controller = AdmissionController(per_device=1)
+    order = []
+
+    def job(directory):
+        with controller.admit({"memory_mb": 1, "device": 1, "directory": directory}):
+            order.append(directory)
+
+    with controller.admit({"memory_mb": 1, "device": 1, "directory": "/lib/b"}):
+        waiters = []
+        for directory in ("/lib/c", "/lib/a", "/lib/b"):
+            t = threading.Thread(target=job, args=(directory,))
+            t.start()
+            waiters.append(t)
+            _wait_for(lambda: len(controller._waiting) == len(waiters))
+        # another disk is not held back
+        with controller.admit({"memory_mb": 1, "device": 2, "directory": "/other"}):
+            pass
+        assert order == []
+    for t in waiters:
+        t.join()
+    assert order == ["/lib/b", "/lib/a", "/lib/c"]
+    assert controller.device_jobs == {1: 0, 2: 0} and controller.running == 0
+
+
+def test_memory_budget_admits_oversized_job_alone():
+    controller = AdmissionController(memory_mb=100)
+    with controller.admit({"memory_mb": 500, "device": None, "directory": "/a"}):
+        blocked = threading.Event()
+        done = threading.Event()
+
+        def small():
+            blocked.set()
+            with controller.admit({"memory_mb": 10, "device": None, "directory": "/b"}):
+                done.set()
+
+        t = threading.Thread(target=small)
+        t.start()
+        blocked.wait(5)
+        assert not done.wait(0.05)
+    t.join(5)
+    assert done.is_set()
@@ -0,0 +1,118 @@
+import sys
+from pathlib import Path
+import json
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+from processors.audio import analysis
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from core.signal_handler import SignalHandler
+
+
+PARAMS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+
+
+def _block(i):
+    return json.dumps({"input_i": str(-20 - i), "input_tp": "-1.0", "input_lra": "5", "input_thresh": "-30", "target_offset": "0.1"}, indent=1)
+
+
+def test_single_stream_command_uses_af():
+    cmd = analysis.build_analysis_command("in.mkv", 1, PARAMS)
+    assert "-af" in cmd and "-filter_complex" not in cmd
+    assert cmd[cmd.index("-map") + 1] == "0:a:0"
+
+
+def test_multi_stream_command_reads_input_once():
+    cmd = analysis.build_analysis_command("in.mkv", 3, PARAMS)
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.count("loudnorm=") == 3
+    assert "[0:a:2]" in graph and "[m2]" in graph
+    assert [cmd[i + 1] for i, a in enumerate(cmd) if a == "-map"] == ["[m0]", "[m1]", "[m2]"]
+
+
+def test_parse_labeled_blocks_in_filter_order():
+    out = "\n".join([
+        "[Parsed_loudnorm_1 @ 0xbeef] ", _block(1),
+        "[Parsed_loudnorm_0 @ 0xcafe] ", _block(0),
+    ])
+    data = analysis.parse_loudnorm_output(out, 2)
+    assert [d["input_i"] for d in data] == ["-20", "-21"]
+
+
+def test_parse_unlabeled_blocks_and_missing_stream():
+    out = "noise\n" + _block(0) + "\nmore\n" + _block(1)
+    data = analysis.parse_loudnorm_output(out, 2)
+    assert data[1]["input_i"] == "-21"
+    with pytest.raises(ValueError):
+        analysis.parse_loudnorm_output(_block(0), 2)
+
+
+def test_normalize_runs_one_analysis_for_all_streams(monkeypatch, tmp_path):
+    media = tmp_path / "multi.mkv"
+    media.write_text("m")
+    streams = [{"channels": 2, "tags": {}} for _ in range(3)]
+    monkeypatch.setattr(proc_module, "get_audio_streams", lambda path, logger=None: streams)
+    monkeypatch.setattr(proc_module, "get_video_streams", lambda path: [])
+    monkeypatch.setattr(SignalHandler, "unregister_temp_file", staticmethod(lambda p: None))
+
+    calls = []
+
+    class R:
+        def __init__(self, stderr):
+            self.stderr = stderr
+            self.stdout = ""
+
+    def fake_run(cmd, capture_output=True):
+        calls.append(cmd)
+        if cmd[-1] == "-":
+            return R("\n".join(f"[Parsed_loudnorm_{i} @ 0x0] \n{_block(i)}" for i in range(3)))
+        Path(cmd[-1]).write_text("out")
+        return R("")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    ap = AudioProcessor()
+    assert ap.normalize_audio(str(media)) == str(media)
+    assert len(calls) == 2
+    final_graph = calls[1][calls[1].index("-filter_complex") + 1]
+    assert "measured_I=-22" in final_graph
+
+
+def test_large_files_are_analyzed_from_an_audio_working_copy(monkeypatch, tmp_path):
+    media = tmp_path / "remux.mkv"
+    media.write_bytes(b"\0" * 2048)
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_bytes(b"audio")
+
+    measured_paths = []
+
+    def fake_measure(path, streams, progress_callback=None, **kwargs):
+        measured_paths.append((path, kwargs))
+        return [{"input_i": "-20.0"} for _ in streams]
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "AUDIO_WORKING_COPY_MIN_MB", 1 / 1024)
+    monkeypatch.setattr(proc_module, "SCRATCH_DIR", str(scratch))
+    ap = AudioProcessor(stream_selection=["1"])
+    ap.analysis_cache = None
+    monkeypatch.setattr(ap, "_measure_loudness", fake_measure)
+
+    data = ap._first_pass(str(media), [{}, {}])
+    assert data == [None, {"input_i": "-20.0"}]
+    assert commands == [["ffmpeg", "-y", "-i", str(media), "-map", "0:a:1", "-c", "copy", "-f", "matroska", measured_paths[0][0]]]
+    assert Path(measured_paths[0][0]).parent == scratch and measured_paths[0][1] == {}
+    assert not list(scratch.iterdir())
+
+    monkeypatch.setattr(proc_module, "AUDIO_WORKING_COPY_MIN_MB", 1)
+    ap._first_pass(str(media), [{}, {}])
+    assert len(commands) == 1 and measured_paths[1] == (str(media), {"positions": [1]})
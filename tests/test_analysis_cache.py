@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+import os
+import json
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import cache as cache_mod
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from core.signal_handler import SignalHandler
+
+
+PARAMS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+MEASURED = [{"input_i": "-27.5", "input_tp": "-4.0", "input_lra": "7.1", "input_thresh": "-38.0", "target_offset": "0.3", "output_i": "-16.1"}]
+
+
+def test_put_get_roundtrip_and_invalidation(tmp_path):
+    media = tmp_path / "a.mkv"
+    media.write_bytes(b"x" * 1000)
+    cache = cache_mod.LoudnessCache(str(tmp_path / "db" / "cache.sqlite"))
+
+    assert cache.get(str(media), PARAMS) is None
+    assert cache.put(str(media), MEASURED, PARAMS) is True
+    hit = cache.get(str(media), PARAMS, stream_count=1)
+    assert hit[0]["input_i"] == "-27.5"
+    assert hit[0]["target_offset"] == "0.3"
+    assert "output_i" not in hit[0]
+    assert cache.get(str(media), PARAMS, stream_count=2) is None
+
+    # content change with identical size and mtime is still detected by the partial hash
+    st = os.stat(media)
+    media.write_bytes(b"y" * 1000)
+    os.utime(media, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.get(str(media), PARAMS) is None
+
+
+def test_retarget_reuses_measurements_without_offset(tmp_path):
+    media = tmp_path / "b.mkv"
+    media.write_bytes(b"z" * 10)
+    cache = cache_mod.LoudnessCache(str(tmp_path / "cache.sqlite"))
+    cache.put(str(media), MEASURED, PARAMS)
+    hit = cache.get(str(media), {"I": -23.0, "TP": -1.5, "LRA": 11.0})
+    assert hit[0]["input_i"] == "-27.5"
+    assert hit[0]["target_offset"] == 0.0
+
+
+def test_missing_file_is_a_miss(tmp_path):
+    cache = cache_mod.LoudnessCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get(str(tmp_path / "nope.mkv"), PARAMS) is None
+    assert cache.put(str(tmp_path / "nope.mkv"), MEASURED, PARAMS) is False
+
+
+def test_normalize_skips_analysis_on_cache_hit(monkeypatch, tmp_path):
+    media = tmp_path / "c.mkv"
+    media.write_text("c")
+    monkeypatch.setattr(proc_module, "get_audio_streams", lambda path, logger=None: [{"channels": 2, "tags": {}}])
+    monkeypatch.setattr(proc_module, "get_video_streams", lambda path: [])
+    monkeypatch.setattr(SignalHandler, "unregister_temp_file", staticmethod(lambda p: None))
+
+    ap = AudioProcessor()
+    ap.analysis_cache = cache_mod.LoudnessCache(str(tmp_path / "cache.sqlite"))
+    ap.analysis_cache.put(str(media), MEASURED, proc_module.NORMALIZATION_PARAMS)
+
+    calls = []
+
+    class R:
+        stdout = ""
+        stderr = ""
+
+    def fake_run(cmd, capture_output=True):
+        calls.append(cmd)
+        Path(cmd[-1]).write_text("out")
+        return R()
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    assert ap.normalize_audio(str(media)) == str(media)
+    assert len(calls) == 1
+    assert "measured_I=-27.5" in calls[0][calls[0].index("-filter_complex") + 1]
+
+
+def test_default_processor_cache_stays_out_of_the_working_directory(tmp_path):
+    ap = AudioProcessor()
+    if ap.analysis_cache is not None:
+        assert Path(ap.analysis_cache.db_path).parent == tmp_path
@@ -73,3 +73,53 @@ def test_boost_requires_path_and_percentage(capsys):
         assert exc.value.code == 1
     finally:
         monkeypatch.undo()
+
+
+def test_streams_selectors_are_validated_and_collected(capsys):
+    mod = reload_module()
+    sys.argv = ['prog', '--normalize', 'file.mkv', '--streams', 'lang=eng,jpn', '--streams', 'default']
+    assert mod.parse_args().streams == ['lang=eng,jpn', 'default']
+    sys.argv = ['prog', '--normalize', 'file.mkv', '--streams', 'loudest']
+    with pytest.raises(SystemExit):
+        mod.parse_args()
+
+
+def test_targets_must_name_configured_profiles(monkeypatch):
+    import core.config as config
+    monkeypatch.setattr(config, "TARGET_PROFILES", [{"name": "streaming", "I": -16}, {"name": "broadcast", "I": -23}])
+    mod = reload_module()
+    sys.argv = ['prog', '--normalize', 'file.mkv', '--targets', 'broadcast,streaming']
+    assert mod.parse_args().targets == ['broadcast', 'streaming']
+    sys.argv = ['prog', '--normalize', 'file.mkv', '--targets', 'cinema']
+    with pytest.raises(SystemExit):
+        mod.parse_args()
+
+
+def test_chain_operations_are_validated(capsys):
+    mod = reload_module()
+    sys.argv = ['prog', '--chain', 'file.mkv', 'normalize,boost=10', '--I', '-23']
+    args = mod.parse_args()
+    assert args.chain == ['file.mkv', 'normalize,boost=10'] and args.I == -23
+    sys.argv = ['prog', '--chain', 'file.mkv', 'normalize,louder']
+    with pytest.raises(SystemExit):
+        mod.parse_args()
+    assert 'Error: Unknown operation: louder' in capsys.readouterr().out
+
+
+def test_order_option():
+    mod = reload_module()
+    sys.argv = ['prog', '--normalize', 'dir', '--order', 'longest']
+    assert mod.parse_args().order == 'longest'
+    sys.argv = ['prog', '--normalize', 'dir', '--order', 'random']
+    with pytest.raises(SystemExit):
+        mod.parse_args()
+
+
+def test_calibrate_option():
+    mod = reload_module()
+    sys.argv = ['prog', '--calibrate', '--workers', '8', '--dry-run']
+    args = mod.parse_args()
+    assert args.calibrate and args.workers == 8 and args.dry_run
+    sys.argv = ['prog', '--calibrate', '--normalize', 'dir']
+    with pytest.raises(SystemExit):
+        mod.parse_args()
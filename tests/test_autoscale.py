@@ -0,0 +1,108 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.batch import autoscale
+from processors.batch import manager as manager_module
+from processors.batch.autoscale import Autoscaler, LoadSampler
+
+
+IDLE = {"load": 0.2, "cpu_busy": 0.3, "iowait": 0.01, "memory_free": 0.6}
+BUSY = {"load": 1.5, "cpu_busy": 1.0, "iowait": 0.05, "memory_free": 0.6}
+
+
+class _Log:
+    def __init__(self):
+        self.lines = []
+
+    def info(self, msg):
+        self.lines.append(msg)
+
+
+def test_limit_changes_need_steady_samples_and_stay_in_bounds():
+    log = _Log()
+    scaler = Autoscaler(2, 1, 3, sampler=lambda: IDLE, logger=log)
+    # idle, but nobody waits for a slot: no growth
+    assert scaler.step(IDLE) == 2 and scaler.step(IDLE) == 2
+    scaler.waiting = 1
+    assert scaler.step(IDLE) == 2
+    assert scaler.step(BUSY) == 2  # a single opposite sample resets the trend
+    assert scaler.step(IDLE) == 2 and scaler.step(IDLE) == 3
+    assert scaler.step(IDLE) == 3 and scaler.step(IDLE) == 3  # upper bound
+    # between the thresholds nothing changes
+    middle = dict(IDLE, load=0.85)
+    assert [scaler.step(middle) for _ in range(4)] == [3, 3, 3, 3]
+    for _ in range(6):
+        scaler.step(dict(BUSY, load=0.5, iowait=0.4))
+    assert scaler.limit == 1  # lower bound
+    assert log.lines == ["Autoscale: 2 -> 3 workers (load 0.20/cpu, cpu 30%, iowait 1%, memory free 60%)",
+                         "Autoscale: 3 -> 2 workers (load 0.50/cpu, cpu 100%, iowait 40%, memory free 60%)",
+                         "Autoscale: 2 -> 1 workers (load 0.50/cpu, cpu 100%, iowait 40%, memory free 60%)"]
+
+
+def test_shrinking_does_not_interrupt_running_jobs():
+    scaler = Autoscaler(2, 1, 2)
+    release = threading.Event()
+    started = []
+
+    def job(name):
+        with scaler.slot("encode"):
+            started.append(name)
+            release.wait(5)
+
+    first = [threading.Thread(target=job, args=(n,)) for n in ("a", "b")]
+    for t in first:
+        t.start()
+    deadline = time.time() + 5
+    while len(started) < 2 and time.time() < deadline:
+        time.sleep(0.005)
+    low_memory = dict(IDLE, memory_free=0.05)
+    scaler.step(low_memory)
+    assert scaler.step(low_memory) == 1
+    assert scaler.running == {"encode": 2}
+    # other stages have their own count
+    with scaler.slot("analysis"):
+        pass
+    late = threading.Thread(target=job, args=("c",))
+    late.start()
+    release.set()
+    for t in first + [late]:
+        t.join(5)
+    assert started == ["a", "b", "c"] and scaler.running["encode"] == 0
+
+
+def test_sampler_reads_proc(monkeypatch):
+    stats = iter(["cpu  100 0 100 700 100 0 0 0 0 0\n", "cpu  200 0 200 800 200 0 0 0 0 0\n"])
+    files = {
+        "/proc/meminfo": "MemTotal:       8000000 kB\nMemFree:  100 kB\nMemAvailable:   2000000 kB\n",
+    }
+
+    def fake_read(path):
+        return next(stats) if path == "/proc/stat" else files.get(path)
+
+    monkeypatch.setattr(autoscale, "_read", fake_read)
+    monkeypatch.setattr(autoscale.os, "getloadavg", lambda: (3.0, 2.0, 1.0))
+    monkeypatch.setattr(autoscale.os, "cpu_count", lambda: 4)
+    sampler = LoadSampler()
+    first = sampler.sample()
+    assert first == {"load": 0.75, "cpu_busy": None, "iowait": None, "memory_free": 0.25}
+    second = sampler.sample()
+    assert second["iowait"] == 0.25 and second["cpu_busy"] == 0.5
+
+
+def test_batch_threads_follow_autoscale_bounds(monkeypatch):
+    monkeypatch.setattr(manager_module, "AUTOSCALE_ENABLED", True)
+    monkeypatch.setattr(manager_module, "AUTOSCALE_MAX_WORKERS", 6)
+    bp = manager_module.BatchProcessor(max_workers=2)
+    assert bp._start_autoscaler(2) == 6
+    assert bp.autoscaler.limit == 2
+    bp._stop_autoscaler()
+    assert bp.autoscaler is None
+    monkeypatch.setattr(manager_module, "AUTOSCALE_ENABLED", False)
+    assert bp._start_autoscaler(3) == 3 and bp.autoscaler is None
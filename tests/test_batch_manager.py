@@ -27,7 +27,7 @@ def _make_dummy_live():
 
 
 def test_process_directory_no_files(monkeypatch, tmp_path):
-    monkeypatch.setattr(mgr, 'find_media_files', lambda d, exts: [])
+    monkeypatch.setattr(mgr, 'iter_media_files', lambda d, exts: iter([]))
     bp = mgr.BatchProcessor(max_workers=1)
     out = bp.process_directory(str(tmp_path))
     assert out == []
@@ -48,7 +48,11 @@ def test_process_files_with_progress_probe_exception_and_success(monkeypatch, tm
     class AP:
         def _get_audio_streams(self, p):
             raise RuntimeError('probe fail')
-        def normalize_audio(self, p, show_ui=False, progress_callback=None):
+        def check_skip(self, p, audio_streams=None):
+            return None
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}]
+        def normalize_audio(self, p, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
             return {"success": True}
 
     bp.audio_processor = AP()
@@ -68,7 +72,11 @@ def test_process_files_with_progress_invalid_worker_count(monkeypatch, tmp_path)
     class AP:
         def _get_audio_streams(self, p):
             return []
-        def normalize_audio(self, p, show_ui=False, progress_callback=None):
+        def check_skip(self, p, audio_streams=None):
+            return None
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}]
+        def normalize_audio(self, p, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
             return {"success": True}
     bp.audio_processor = AP()
 
@@ -85,7 +93,7 @@ def test_boost_files_with_progress_success_and_failure_and_callbacks(monkeypatch
     f2.write_text('2')
     files = [str(f1), str(f2)]
 
-    monkeypatch.setattr(mgr, 'find_media_files', lambda d, exts: files)
+    monkeypatch.setattr(mgr, 'iter_media_files', lambda d, exts: iter(files))
     monkeypatch.setattr(mgr, 'Live', _make_dummy_live())
 
     bp = mgr.BatchProcessor(max_workers=2)
@@ -117,3 +125,125 @@ def test_boost_files_with_progress_success_and_failure_and_callbacks(monkeypatch
     res = bp.boost_files_with_progress(str(tmp_path), 12.5, dry_run=False, max_workers=2)
     assert any(r['status'] == 'Success' for r in res)
     assert any(r['status'] == 'Failed' for r in res)
+
+
+def test_probe_result_is_shared_with_worker_and_processor(monkeypatch, tmp_path):
+    f = tmp_path / 'c.mkv'
+    f.write_text('z')
+    monkeypatch.setattr(mgr, 'Live', _make_dummy_live())
+    bp = mgr.BatchProcessor(max_workers=1)
+    info = {"audio": [{"index": 1}, {"index": 2}], "video": [], "subtitle": [], "duration": 3723.0, "bit_rate": None}
+    seen = {}
+
+    class AP:
+        def probe_media(self, p):
+            seen["probes"] = seen.get("probes", 0) + 1
+            return info
+
+        def check_skip(self, p, audio_streams=None):
+            seen["skip_streams"] = audio_streams
+            return None
+
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}, {"input_i": "-21.0"}]
+
+        def normalize_audio(self, p, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            seen["media_info"] = media_info
+            return p
+
+    bp.audio_processor = AP()
+    titles = []
+    real_make = mgr.bp_ui.make_update_panel
+
+    def make_cb(*args, **kwargs):
+        titles.append((kwargs.get("audio_tracks"), kwargs.get("media_info")))
+        return real_make(*args, **kwargs)
+
+    monkeypatch.setattr(mgr.bp_ui, 'make_update_panel', make_cb)
+    res = bp.process_files_with_progress([str(f)], max_workers=1)
+    assert res[0]['status'] == 'Success'
+    assert seen == {"probes": 1, "skip_streams": info["audio"], "media_info": info}
+    # one panel in the analysis stage, one in the encode stage
+    assert titles == [(2, info), (2, info)]
+    assert mgr.bp_ui.format_duration(3723.0) == "1:02:03"
+
+
+def test_fixed_pool_streams_files_lazily(monkeypatch, tmp_path):
+    monkeypatch.setattr(mgr, 'Live', _make_dummy_live())
+    bp = mgr.BatchProcessor(max_workers=3)
+    events = []
+    threads_seen = set()
+
+    class AP:
+        def _get_audio_streams(self, p):
+            return []
+        def check_skip(self, p, audio_streams=None):
+            return None
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}]
+        def normalize_audio(self, p, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            events.append(("job", p))
+            threads_seen.add(threading.get_ident())
+            return p
+
+    bp.audio_processor = AP()
+
+    def scan():
+        for i in range(40):
+            events.append(("found", i))
+            yield str(tmp_path / f"{i}.mkv")
+
+    before = threading.active_count()
+    res = bp.process_files_with_progress(scan(), max_workers=3)
+    assert len(res) == 40 and all(r['status'] == 'Success' for r in res)
+    assert len(threads_seen) <= 3
+    # the first job runs long before the scanner is exhausted
+    first_job = next(i for i, e in enumerate(events) if e[0] == "job")
+    assert first_job < events.index(("found", 39))
+    assert threading.active_count() == before
+
+
+def test_pipeline_overlaps_analysis_with_encode(monkeypatch, tmp_path):
+    monkeypatch.setattr(mgr, 'Live', _make_dummy_live())
+    monkeypatch.setattr(mgr, 'ANALYSIS_WORKERS', 1)
+    monkeypatch.setattr(mgr, 'ENCODE_WORKERS', 1)
+    bp = mgr.BatchProcessor(max_workers=4)
+    second_analyzed = threading.Event()
+    handed = {}
+
+    class AP:
+        def probe_media(self, p):
+            return {"audio": [{"index": 1}], "video": [], "subtitle": [], "duration": 10.0, "bit_rate": None}
+
+        def check_skip(self, p, audio_streams=None):
+            return None
+
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            if p.endswith("1.mkv"):
+                second_analyzed.set()
+            return [{"input_i": p}]
+
+        def normalize_audio(self, p, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            handed[p] = loudness_data
+            # the first encode only finishes once the next file has been analyzed
+            return p if p.endswith("1.mkv") or second_analyzed.wait(5) else None
+
+    bp.audio_processor = AP()
+    files = [str(tmp_path / f"{i}.mkv") for i in range(3)]
+    res = bp.process_files_with_progress(files, max_workers=4)
+    assert sorted(r['status'] for r in res) == ["Success"] * 3
+    assert handed == {p: [{"input_i": p}] for p in files}
+
+
+def test_stage_status_shows_queue_depth():
+    from queue import Queue
+    from rich.console import Console
+    q = Queue()
+    q.put("a")
+    q.put("b")
+    status = mgr.bp_ui.StageStatus()
+    status.stages = [{"name": "Analysis", "workers": 2, "busy": 1, "queue": Queue()}, {"name": "Encode", "workers": 4, "busy": 4, "queue": q}]
+    console = Console(width=120, record=True)
+    console.print(mgr.bp_ui.render_group([None, status]))
+    out = console.export_text()
+    assert "Analysis 1/2 busy, 0 queued" in out and "Encode 4/4 busy, 2 queued" in out
@@ -33,9 +33,10 @@ def test_process_directory_delegates_to_process_files(monkeypatch, tmp_path):
     (d / 'a.mp4').write_text('x')
 
     # stub find_media_files to return one file and patch process_files_with_progress
-    monkeypatch.setattr('processors.batch.manager.find_media_files', lambda directory, exts: [str(d / 'a.mp4')])
+    monkeypatch.setattr('processors.batch.manager.iter_media_files', lambda directory, exts: iter([str(d / 'a.mp4')]))
     called = {}
     def fake_process_files(self, files, dry_run=False, max_workers=None):
+        files = list(files)
         called['files'] = files
         return [{'file': files[0], 'task': 'normalize', 'status': 'Success'}]
     monkeypatch.setattr(BatchProcessor, 'process_files_with_progress', fake_process_files)
@@ -84,13 +85,13 @@ def test_boost_files_missing_and_worker_count_exception_and_update_cb(monkeypatc
     d = tmp_path / 'bd'
     d.mkdir()
     # when no media files, should return [] and warn
-    monkeypatch.setattr('processors.batch.manager.find_media_files', lambda directory, exts: [])
+    monkeypatch.setattr('processors.batch.manager.iter_media_files', lambda directory, exts: iter([]))
     bp = BatchProcessor(max_workers=1)
     res = bp.boost_files_with_progress(str(d), 5.0)
     assert res == []
 
     # now exercise worker_count except and update_cb exception handling
-    monkeypatch.setattr('processors.batch.manager.find_media_files', lambda directory, exts: [str(d / 'a.mp4')])
+    monkeypatch.setattr('processors.batch.manager.iter_media_files', lambda directory, exts: iter([str(d / 'a.mp4')]))
     Path(d / 'a.mp4').write_text('x')
 
     # make make_update_panel return an update function that raises on 'success'
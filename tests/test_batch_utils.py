@@ -39,3 +39,11 @@ def test_find_media_files_custom_extensions(tmp_path):
     (tmp_path / 'two.doc').write_text('2')
     out = utils_mod.find_media_files(str(tmp_path), supported_extensions=('.txt',))
     assert len(out) == 1 and out[0].endswith('one.txt')
+
+
+def test_iter_media_files_is_lazy(tmp_path):
+    (tmp_path / 'a.mp4').write_text('x')
+    (tmp_path / 'b.txt').write_text('y')
+    it = utils_mod.iter_media_files(str(tmp_path))
+    assert not isinstance(it, list)
+    assert [os.path.basename(p) for p in it] == ['a.mp4']
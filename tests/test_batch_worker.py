@@ -14,12 +14,18 @@ class DummyProcessor:
         self._result = result
         self._exc = exc
 
-    def boost_audio(self, file_path, boost_percent, show_ui=False, dry_run=False, progress_callback=None):
+    def output_up_to_date(self, file_path):
+        return False
+
+    def check_skip(self, file_path, audio_streams=None):
+        return None
+
+    def boost_audio(self, file_path, boost_percent, show_ui=False, dry_run=False, progress_callback=None, media_info=None):
         if self._exc:
             raise self._exc
         return self._result
 
-    def normalize_audio(self, file_path, show_ui=False, progress_callback=None):
+    def normalize_audio(self, file_path, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
         if self._exc:
             raise self._exc
         return self._result
@@ -68,3 +74,33 @@ def test_normalize_file_success_and_failure_and_exception():
     proc3 = DummyProcessor(exc=ValueError("nope"))
     out3 = worker.normalize_file(proc3, "y.mp4")
     assert out3["success"] is False and "nope" in out3["message"]
+
+
+def test_analyze_file_runs_skip_check_then_first_pass():
+    class Proc:
+        def __init__(self, reason=None):
+            self.reason = reason
+
+        def check_skip(self, file_path, audio_streams=None):
+            return self.reason
+
+        def analyze_audio(self, file_path, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}]
+
+    out = worker.analyze_file(Proc(), "x.mkv", media_info={"audio": [{}]})
+    assert out == {"success": True, "loudness_data": [{"input_i": "-20.0"}]}
+    assert worker.analyze_file(Proc("tagged"), "x.mkv")["skipped"] is True
+
+
+def test_worker_passes_probe_and_measurements_to_the_processor():
+    calls = []
+
+    class Proc(DummyProcessor):
+        def normalize_audio(self, file_path, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            calls.append((media_info, loudness_data))
+            return True
+
+    info = {"audio": [{}]}
+    assert worker.normalize_file(Proc(), "x.mkv", media_info=info, loudness_data=[{"input_i": "-20.0"}]) == {"success": True}
+    assert worker.normalize_file(Proc(), "x.mkv") == {"success": True}
+    assert calls == [(info, [{"input_i": "-20.0"}]), (None, None)]
@@ -0,0 +1,99 @@
+import sys
+import json
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.batch import calibration
+
+
+def test_grids():
+    assert calibration.worker_grid(6) == [1, 2, 4, 6]
+    assert calibration.worker_grid(4) == [1, 2, 4]
+    assert calibration.worker_grid(1) == [1]
+    assert calibration.thread_grid(8) == [4, 8, 16]
+    assert calibration.thread_grid(1) == [1, 2]
+
+
+def test_generate_samples_uses_lavfi(monkeypatch, tmp_path):
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("media")
+
+    monkeypatch.setattr(calibration, "run_command", fake_run)
+    samples = calibration.generate_samples(str(tmp_path), seconds=5, copies=2)
+    assert len(commands) == len(calibration.SAMPLE_MEDIA)
+    assert len(samples) == 2 * len(calibration.SAMPLE_MEDIA)
+    assert all(Path(s["path"]).exists() for s in samples)
+    ac3 = commands[1]
+    assert ac3[ac3.index("-f") + 1] == "lavfi" and "d=5" in ac3[ac3.index("-i") + 1]
+    assert ac3[ac3.index("-ac") + 1] == "6" and ac3[ac3.index("-c:a") + 1] == "ac3"
+
+
+def test_choose_prefers_smaller_settings_unless_clearly_faster():
+    points = [
+        {"workers": 1, "threads": 2, "analysis": 10.0, "encode": 5.0},
+        {"workers": 2, "threads": 2, "analysis": 10.2, "encode": 9.0},
+        {"workers": 4, "threads": 2, "analysis": 18.0, "encode": 9.3},
+        {"workers": 1, "threads": 4, "analysis": 10.0, "encode": 5.0},
+        {"workers": 2, "threads": 4, "analysis": 10.1, "encode": 9.1},
+        {"workers": 4, "threads": 4, "analysis": 18.5, "encode": 9.2},
+    ]
+    assert calibration.choose(points) == {"ANALYSIS_WORKERS": 4, "ENCODE_WORKERS": 2, "THREAD_BUDGET": 2}
+
+
+class _FakeProcessor:
+    def __init__(self, output_root):
+        self.output_root = output_root
+
+    def probe_media(self, path):
+        return {"audio": [{"codec_name": Path(path).name.split("_")[0]}]}
+
+    def check_skip(self, path, audio_streams=None):
+        return None
+
+    def analyze_audio(self, path, progress_callback=None, media_info=None):
+        return [{"input_i": "-20.0"}]
+
+    def normalize_audio(self, path, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+        assert loudness_data == [{"input_i": "-20.0"}]
+        Path(self.output_root).mkdir(parents=True, exist_ok=True)
+        return path
+
+
+def test_calibrate_reports_grid_and_codec_factors(monkeypatch, tmp_path):
+    monkeypatch.setattr(calibration.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(calibration, "generate_samples", lambda directory, seconds, copies: [
+        {"path": str(tmp_path / f"{codec}_{ch}ch_{i}.mka"), "codec": codec, "channels": ch}
+        for codec, ch in calibration.SAMPLE_MEDIA for i in range(copies)
+    ])
+    processors = []
+
+    def make_processor(output_root):
+        processors.append(_FakeProcessor(output_root))
+        return processors[-1]
+
+    lines = []
+    report = calibration.calibrate(str(tmp_path), make_processor, seconds=1, progress=lines.append)
+    assert [(p["workers"], p["threads"]) for p in report["points"]] == [(1, 1), (2, 1), (1, 2), (2, 2), (1, 4), (2, 4)]
+    assert all(p["analysis"] > 0 and p["encode"] > 0 for p in report["points"])
+    assert set(report["settings"]) == {"ANALYSIS_WORKERS", "ENCODE_WORKERS", "THREAD_BUDGET"}
+    assert report["codec_factors"]["aac"] == 1.0 and set(report["codec_factors"]) == {"aac", "ac3", "eac3", "flac"}
+    assert processors[0].thread_budget.total == 1 and processors[0].analysis_cache is None
+    # the per-run output trees are removed
+    assert not any(Path(p.output_root).exists() for p in processors)
+    assert len(lines) == 7
+
+
+def test_update_config_keeps_other_keys(monkeypatch, tmp_path):
+    import core.config as conf
+    target = tmp_path / "config.json"
+    target.write_text(json.dumps({"VERSION": "2.2", "ENCODE_WORKERS": 0}, indent=2))
+    monkeypatch.setattr(conf, "_get_config_path", lambda: str(target))
+    assert conf.update_config({"ENCODE_WORKERS": 3, "CODEC_COST_FACTORS": {"ac3": 1.4}}) == str(target)
+    assert json.loads(target.read_text()) == {"VERSION": "2.2", "ENCODE_WORKERS": 3, "CODEC_COST_FACTORS": {"ac3": 1.4}}
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+from processors.audio import chain
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from processors.batch import worker as bp_worker
+
+
+PARAMS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+M = {"input_i": "-20.00", "input_tp": "-6.00", "input_lra": "7.0", "input_thresh": "-30.00", "target_offset": "0.0"}
+
+
+def test_parse_chain_validates_operations():
+    assert chain.parse_chain("normalize, boost=10,codec=aac") == [("normalize", None), ("boost", 10.0), ("codec", "aac")]
+    assert chain.describe(chain.parse_chain("boost=-5,rate=48000")) == "boost=-5,rate=48000"
+    for bad in ("", "louder", "normalize=1", "boost", "boost=-100", "channels=3", "rate=0",
+                "normalize,normalize", "codec=aac,codec=ac3", "channels=2,normalize"):
+        with pytest.raises(ValueError):
+            chain.parse_chain(bad)
+
+
+def test_boost_before_normalize_shifts_the_measurement():
+    ops = chain.parse_chain("boost=100,normalize,channels=2")
+    f = chain.stream_filter(ops, M, PARAMS, {"sample_rate": "44100"})
+    volume, loudnorm, layout, resample = f.split(",")
+    assert volume == "volume=2.0"
+    assert "measured_I=-13.98:measured_TP=0.02:measured_LRA=7.0:measured_thresh=-23.98" in loudnorm
+    assert layout == "aformat=channel_layouts=stereo"
+    assert resample == "aresample=44100"
+    assert chain.stream_filter(chain.parse_chain("normalize,rate=48000"), M, PARAMS, {}).endswith("aresample=48000")
+    assert chain.stream_filter(chain.parse_chain("codec=flac"), None, PARAMS, {}) == "anull"
+
+
+def test_title_tag_reflects_the_final_level():
+    assert chain.title_tag(chain.parse_chain("boost=10,normalize")) == ("Normalized", "")
+    assert chain.title_tag(chain.parse_chain("normalize,boost=10,boost=10")) == ("Boosted", "21%")
+    assert chain.title_tag(chain.parse_chain("codec=aac")) is None
+
+
+def test_process_chain_encodes_once(monkeypatch, tmp_path):
+    media = tmp_path / "show.mkv"
+    media.write_text("original")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("encoded")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor(stream_selection=["0"])
+    passes = []
+    monkeypatch.setattr(ap, "_first_pass", lambda path, streams, progress_callback=None: passes.append(path) or [M, None])
+    media_info = {
+        "audio": [{"codec_name": "eac3", "sample_rate": "48000", "tags": {"title": "Main"}}, {"codec_name": "aac"}],
+        "video": [{"codec_name": "h264"}],
+    }
+    assert ap.process_chain(str(media), "normalize,boost=10,bitrate=384k", media_info=media_info) == str(media)
+
+    assert len(commands) == 1 and len(passes) == 1
+    cmd = commands[0]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.startswith("[0:a:0]loudnorm=") and graph.endswith(",volume=1.1,aresample=48000[a0]")
+    assert cmd[cmd.index("-c:a:0") + 1] == "eac3" and cmd[cmd.index("-b:a:0") + 1] == "384k"
+    assert cmd[cmd.index("-c:a:1") + 1] == "copy"
+    assert "title=[molexAudio Boosted 10%] Main" in cmd
+    assert media.read_text() == "encoded"
+    assert not list(tmp_path.glob("*_temp*"))
+
+
+def test_chain_file_reports_failure():
+    class FakeProcessor:
+        def output_up_to_date(self, path):
+            return False
+
+        def process_chain(self, path, operations, progress_callback=None, media_info=None):
+            return None
+
+    assert bp_worker.chain_file(FakeProcessor(), "a.mkv", "boost=10") == {"success": False, "message": "Chain failed"}
+    assert bp_worker.chain_file(FakeProcessor(), "a.mkv", "boost=10", dry_run=True)["success"]
@@ -0,0 +1,232 @@
+import sys
+from pathlib import Path
+import io
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from processors.audio import meter
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from core.signal_handler import SignalHandler
+
+
+FS = meter.ANALYSIS_SAMPLE_RATE
+
+
+def _sine(dbfs, seconds, channels=2, freq=1000.0):
+    t = np.arange(int(FS * seconds)) / FS
+    x = (10 ** (dbfs / 20.0)) * np.sin(2 * np.pi * freq * t)
+    return np.repeat(x[:, None].astype(np.float32), channels, axis=1)
+
+
+def _measure(samples, chunk=9600):
+    m = meter.LoudnessMeter(samples.shape[1])
+    for i in range(0, len(samples), chunk):
+        m.process(samples[i:i + chunk])
+    m.finish()
+    return m.result()
+
+
+def test_ebu_3341_stereo_sine_reads_target():
+    for level in (-23.0, -33.0):
+        res = _measure(_sine(level, 20))
+        assert abs(float(res["input_i"]) - level) <= 0.1
+        assert abs(float(res["input_thresh"]) - (level - 10)) <= 0.1
+
+
+def test_ebu_3342_loudness_range():
+    res = _measure(np.concatenate([_sine(-20, 20), _sine(-30, 20)]))
+    assert abs(float(res["input_lra"]) - 10.0) <= 1.0
+
+
+def test_true_peak_exceeds_sample_peak():
+    t = np.arange(FS) / FS
+    x = (0.5 * np.sin(2 * np.pi * (FS / 4) * t + np.pi / 4)).astype(np.float32)[:, None]
+    res = _measure(x)
+    sample_peak_db = 20 * np.log10(np.abs(x).max())
+    assert float(res["input_tp"]) > sample_peak_db + 2.5
+    assert abs(float(res["input_tp"]) - (20 * np.log10(0.5))) <= 0.3
+
+
+def test_result_does_not_depend_on_chunking():
+    x = np.concatenate([_sine(-18, 7), _sine(-28, 5, freq=440.0)])
+    assert _measure(x, chunk=1000) == _measure(x, chunk=48000)
+
+
+def test_silence_and_lfe_weighting():
+    res = _measure(np.zeros((FS * 2, 2), dtype=np.float32))
+    assert res["input_i"] == "-70.00"
+    assert meter.channel_weights(6)[3] == 0.0
+    assert meter.channel_weights(6)[4] == 1.41
+
+
+def test_histograms_merge_exactly():
+    a = _sine(-20, 10)
+    b = _sine(-26, 10)
+    ma, mb = meter.LoudnessMeter(2), meter.LoudnessMeter(2)
+    ma.process(a)
+    ma.finish()
+    mb.process(b)
+    mb.finish()
+    merged = meter.measurements_from_histograms(
+        ma.momentary.merge(mb.momentary), ma.short_term.merge(mb.short_term), max(ma.true_peak, mb.true_peak)
+    )
+    expected = 10 * np.log10((10 ** (-2.0) + 10 ** (-2.6)) / 2)
+    assert abs(float(merged["input_i"]) - expected) <= 0.05
+
+
+def test_measure_pcm_splits_channel_groups():
+    stereo = _sine(-23, 5)
+    mono = _sine(-30, 5, channels=1)
+    interleaved = np.concatenate([stereo, mono], axis=1).astype("<f4")
+    res = meter.measure_pcm(io.BytesIO(interleaved.tobytes()), [2, 1])
+    assert abs(float(res[0]["input_i"]) + 23.0) <= 0.1
+    assert abs(float(res[1]["input_i"]) + 33.0) <= 0.1
+
+
+def test_build_pcm_command_merges_streams():
+    cmd, counts = meter.build_pcm_command("in.mkv", [{"channels": 6}, {"channels": 0}])
+    assert counts == [6, 2]
+    assert cmd.count("-i") == 1
+    assert "amerge=inputs=2" in cmd[cmd.index("-filter_complex") + 1]
+    assert cmd[cmd.index("-ac") + 1] == "8"
+    single, _ = meter.build_pcm_command("in.mkv", [{"channels": 2}])
+    assert "-filter_complex" not in single and single[-1] == "-"
+
+
+def test_mixed_mono_and_stereo_streams_of_different_lengths():
+    # a mono (FC) commentary next to a stereo main track: without relabelling, amerge would
+    # reorder the channels to FL FR FC, and it would stop at the end of the shorter stream
+    cmd, counts = meter.build_pcm_command("in.mkv", [{"channels": 1}, {"channels": 2}], duration=8.0)
+    graph = cmd[cmd.index("-filter_complex") + 1].split(";")
+    assert counts == [1, 2]
+    assert graph[0] == "[0:a:0]aresample=48000,channelmap=map=0:channel_layout=FL,apad=whole_dur=8.000[r0]"
+    assert graph[1] == "[0:a:1]aresample=48000,channelmap=map=0|1:channel_layout=FL+FR,apad=whole_dur=8.000[r1]"
+    assert graph[2] == "[r0][r1]amerge=inputs=2[pcm]"
+    segment = {"start": 5.0, "length": None, "skip_subblocks": 30}
+    tail, _ = meter.build_pcm_command("in.mkv", [{"channels": 1}, {"channels": 2}], segment, duration=8.0)
+    assert "apad=whole_dur=3.000" in tail[tail.index("-filter_complex") + 1]
+
+    # the 20 s mono stream arrives padded with silence to the 25 s of the stereo one
+    mono = np.concatenate([_sine(-30, 20, channels=1), np.zeros((5 * 48000, 1))])
+    stereo = _sine(-23, 25)
+    interleaved = np.concatenate([mono, stereo], axis=1).astype("<f4")
+    res = meter.measure_pcm(io.BytesIO(interleaved.tobytes()), counts)
+    assert abs(float(res[0]["input_i"]) + 33.0) <= 0.1
+    assert abs(float(res[1]["input_i"]) + 23.0) <= 0.1
+
+
+def test_processor_native_backend(monkeypatch, tmp_path):
+    media = tmp_path / "n.mkv"
+    media.write_text("n")
+    pcm = _sine(-23, 4).astype("<f4").tobytes()
+
+    class FakePipe:
+        pid = 4242
+        returncode = 0
+
+        def __init__(self, cmd):
+            self.stdout = io.BytesIO(pcm)
+            self.stderr = io.BytesIO(b"")
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(proc_module, "open_pipe", FakePipe)
+    monkeypatch.setattr(SignalHandler, "register_child_pid", staticmethod(lambda pid: None))
+    monkeypatch.setattr(SignalHandler, "unregister_child_pid", staticmethod(lambda pid: None))
+    ap = AudioProcessor(analysis_backend="native")
+    data = ap._measure_loudness(str(media), [{"channels": 2}])
+    assert abs(float(data[0]["input_i"]) + 23.0) <= 0.1
+    assert set(["input_i", "input_tp", "input_lra", "input_thresh", "target_offset"]) <= set(data[0])
+
+
+def test_benchmark_analysis_reports_deltas(monkeypatch, tmp_path):
+    media = tmp_path / "b.mkv"
+    media.write_text("b")
+    monkeypatch.setattr(proc_module, "get_audio_streams", lambda path, logger=None: [{"channels": 2}])
+    values = {
+        "loudnorm": {"input_i": "-20.00", "input_tp": "-1.00", "input_lra": "6.00", "input_thresh": "-30.00"},
+        "native": {"input_i": "-20.10", "input_tp": "-1.20", "input_lra": "9.00", "input_thresh": "-30.10"},
+    }
+    ap = AudioProcessor()
+    monkeypatch.setattr(ap, "_measure_loudness", lambda path, streams, progress_callback=None, backend=None: [values[backend]])
+    report = ap.benchmark_analysis(str(media))
+    stream = report["streams"][0]
+    assert abs(stream["delta"]["input_i"] + 0.1) < 1e-9
+    assert stream["within_tolerance"] is False
+    assert report["loudnorm_seconds"] >= 0 and report["native_seconds"] >= 0
+
+
+def test_plan_segments_cover_duration_on_gating_grid():
+    assert meter.plan_segments(100.0, 8, 300) == []
+    assert meter.plan_segments(3600.0, 1, 300) == []
+    segs = meter.plan_segments(3600.0, 4, 300)
+    assert len(segs) == 4
+    assert segs[0] == {"start": 0.0, "length": 900.0, "skip_subblocks": 0}
+    assert abs(segs[1]["start"] - (900.0 - meter.SEGMENT_PREROLL_SECONDS)) < 1e-6
+    assert segs[1]["skip_subblocks"] == 30
+    assert segs[-1]["length"] is None
+
+
+def test_segmented_native_analysis_matches_single_pass(monkeypatch, tmp_path):
+    media = tmp_path / "long.mkv"
+    media.write_text("l")
+    samples = np.concatenate([_sine(-18, 13), _sine(-31, 11, freq=440.0), _sine(-24, 16, freq=250.0)])
+    pcm = samples.astype("<f4")
+
+    class FakePipe:
+        pid = 4243
+        returncode = 0
+
+        def __init__(self, cmd):
+            start = float(cmd[cmd.index("-ss") + 1]) if "-ss" in cmd else 0.0
+            length = float(cmd[cmd.index("-t") + 1]) if "-t" in cmd else None
+            lo = int(round(start * FS))
+            hi = len(pcm) if length is None else lo + int(round(length * FS))
+            self.stdout = io.BytesIO(pcm[lo:hi].tobytes())
+            self.stderr = io.BytesIO(b"")
+
+        def kill(self):
+            pass
+
+        def wait(self):
+            return 0
+
+    monkeypatch.setattr(proc_module, "open_pipe", FakePipe)
+    monkeypatch.setattr(proc_module, "get_duration", lambda path: len(pcm) / FS)
+    monkeypatch.setattr(SignalHandler, "register_child_pid", staticmethod(lambda pid: None))
+    monkeypatch.setattr(SignalHandler, "unregister_child_pid", staticmethod(lambda pid: None))
+    ap = AudioProcessor(analysis_backend="native")
+
+    monkeypatch.setattr(proc_module, "SEGMENT_ANALYSIS_MIN_DURATION", 0)
+    single = ap._measure_loudness(str(media), [{"channels": 2}])
+
+    monkeypatch.setattr(proc_module, "SEGMENT_ANALYSIS_MIN_DURATION", 10)
+    monkeypatch.setattr(proc_module, "SEGMENT_ANALYSIS_MIN_SEGMENT", 8)
+    monkeypatch.setattr(proc_module, "SEGMENT_ANALYSIS_WORKERS", 4)
+    assert len(ap._plan_analysis_segments(str(media))) == 4
+    segmented = ap._measure_loudness(str(media), [{"channels": 2}])
+    assert segmented == single
+
+
+def test_k_weighting_impulse_response_is_cached_and_matches_the_biquads():
+    h = meter._k_weighting_impulse_response(48000)
+    assert h is meter._k_weighting_impulse_response(48000) and not h.flags.writeable
+    assert h.size == 16384
+    x = np.zeros(512)
+    x[0] = 1.0
+    for b, a in meter.k_weighting_coefficients(48000):
+        y = np.zeros_like(x)
+        for n in range(x.size):
+            y[n] = (b[0] * x[n] + b[1] * (x[n - 1] if n else 0) + b[2] * (x[n - 2] if n > 1 else 0)
+                    - a[1] * (y[n - 1] if n else 0) - a[2] * (y[n - 2] if n > 1 else 0))
+        x = y
+    assert np.allclose(h[:512], x, atol=1e-12)
@@ -0,0 +1,159 @@
+import sys
+from pathlib import Path
+import random
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import mp3gain
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+
+
+def _bits(fields):
+    value, count = 0, 0
+    for nbits, v in fields:
+        value = (value << nbits) | (v & ((1 << nbits) - 1))
+        count += nbits
+    pad = (-count) % 8
+    return (value << pad).to_bytes((count + pad) // 8, "big")
+
+
+def _side_info(gains, rng, lsf=False, channels=2):
+    """Side info with the given global_gain values and random other fields."""
+    if lsf:
+        fields = [(8, rng.randrange(256)), (1 if channels == 1 else 2, 0)]
+        per = [(12, 1), (9, 1), (8, None), (9, 1), (1, 0), (22, 1), (2, 1)]
+    else:
+        fields = [(9, rng.randrange(512)), (5 if channels == 1 else 3, 0), (4 * channels, rng.randrange(16))]
+        per = [(12, 1), (9, 1), (8, None), (4, 1), (1, 0), (22, 1), (3, 1)]
+    for g in gains:
+        for nbits, _ in per:
+            fields.append((nbits, g if nbits == 8 and _ is None else rng.randrange(1 << nbits)))
+    return _bits(fields)
+
+
+def _frame(gains, rng, crc=False, channels=2):
+    # MPEG-1 layer III, 128 kbps, 44.1 kHz -> 417 bytes (no padding)
+    header = bytes([0xFF, 0xFA if crc else 0xFB, 0x90, 0xC0 if channels == 1 else 0x00])
+    side = _side_info(gains, rng, channels=channels)
+    body = header + (mp3gain._crc16(header[2:] + side).to_bytes(2, "big") if crc else b"") + side
+    return body + bytes(rng.randrange(256) for _ in range(417 - len(body)))
+
+
+def _gains(data, pos, crc=False, channels=2):
+    header = mp3gain.parse_header(data, pos)
+    side = bytearray(data[pos + 4 + (2 if crc else 0):pos + 4 + (2 if crc else 0) + header[1]]) + b"\x00"
+    return [mp3gain._get8(side, b) for b in mp3gain._gain_offsets(header[3], header[2])]
+
+
+def test_side_info_layouts_match_the_spec():
+    rng = random.Random(1)
+    assert len(_side_info([1, 2, 3, 4], rng)) == 32
+    assert len(_side_info([1, 2], rng, channels=1)) == 17
+    lsf = _side_info([200, 7], rng, lsf=True)
+    assert len(lsf) == 17
+    side = bytearray(lsf) + b"\x00"
+    assert [mp3gain._get8(side, b) for b in mp3gain._gain_offsets(2, 2)] == [200, 7]
+
+
+def test_apply_gain_rewrites_only_global_gain(tmp_path):
+    rng = random.Random(7)
+    id3 = b"ID3\x04\x00\x00\x00\x00\x00\x20" + bytes(32)
+    xing = bytes([0xFF, 0xFB, 0x90, 0x00]) + bytes(413)
+    frames = [_frame([100 + k, 110, 120, 250 + k % 3], rng) for k in range(40)]
+    data = id3 + xing + b"".join(frames) + b"TAG" + bytes(125)
+    src = tmp_path / "in.mp3"
+    src.write_bytes(data)
+
+    stats = mp3gain.apply_gain(str(src), str(tmp_path / "out.mp3"), 4)
+    out = (tmp_path / "out.mp3").read_bytes()
+    assert stats == {"frames": 41, "clipped": sum(1 for k in range(40) if k % 3 == 2)}
+    assert len(out) == len(data)
+    assert out[:len(id3) + len(xing)] == data[:len(id3) + len(xing)]
+    assert out[-128:] == data[-128:]
+    base = len(id3) + len(xing)
+    for k in range(40):
+        pos = base + k * 417
+        assert _gains(out, pos) == [104 + k, 114, 124, min(254 + k % 3, 255)]
+        # main data is untouched
+        assert out[pos + 36:pos + 417] == data[pos + 36:pos + 417]
+
+    # small reads split frames across buffer refills without changing the result
+    mp3gain.apply_gain(str(src), str(tmp_path / "small.mp3"), 4, read_size=500)
+    assert (tmp_path / "small.mp3").read_bytes() == out
+
+
+def test_apply_gain_updates_frame_crc_and_mono(tmp_path):
+    rng = random.Random(3)
+    data = b"".join(_frame([90, 91], rng, crc=True, channels=1) for _ in range(5))
+    (tmp_path / "c.mp3").write_bytes(data)
+    mp3gain.apply_gain(str(tmp_path / "c.mp3"), str(tmp_path / "d.mp3"), -2)
+    out = (tmp_path / "d.mp3").read_bytes()
+    for pos in range(0, len(out), 417):
+        assert _gains(out, pos, crc=True, channels=1) == [88, 89]
+        assert int.from_bytes(out[pos + 4:pos + 6], "big") == mp3gain._crc16(out[pos + 2:pos + 4] + out[pos + 6:pos + 23])
+
+
+def test_gain_steps_and_non_mp3_input(tmp_path):
+    assert mp3gain.gain_steps(6.02, 0.5) == 4
+    assert mp3gain.gain_steps(0.83, 0.5) is None
+    assert mp3gain.gain_steps(-3.0, 0.5) == -2
+    (tmp_path / "x.mp3").write_bytes(b"not audio" * 100)
+    try:
+        mp3gain.apply_gain(str(tmp_path / "x.mp3"), str(tmp_path / "y.mp3"), 1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_boost_uses_lossless_path_for_mp3(monkeypatch, tmp_path):
+    from core.signal_handler import SignalHandler
+
+    rng = random.Random(5)
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"".join(_frame([100, 100, 100, 100], rng) for _ in range(3)))
+    commands = []
+
+    def tag_remux(cmd, *a, **k):
+        # only the stream-copy title remux may run; it copies the rewritten frames as-is
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        commands.append(cmd)
+        Path(cmd[-1]).write_bytes(Path(cmd[cmd.index("-i") + 1]).read_bytes())
+
+    def no_encode(*a, **k):
+        raise AssertionError("ffmpeg must not encode")
+
+    monkeypatch.setattr(proc_module, "run_command", tag_remux)
+    monkeypatch.setattr(proc_module, "popen", no_encode)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    sh = SignalHandler([])
+    ap = AudioProcessor()
+    info = {"audio": [{"codec_name": "mp3", "channels": 2}], "video": [], "subtitle": [], "duration": 1.0, "bit_rate": None}
+    assert ap.boost_audio(str(song), 100, media_info=info) == str(song)
+    assert _gains(song.read_bytes(), 417) == [104] * 4
+    assert len(commands) == 1 and "title=[molexAudio Boosted 100%] Track 1" in commands[0]
+    assert sh.temp_files == [] and sorted(p.name for p in tmp_path.iterdir()) == ["song.mp3"]
+
+
+def test_lossless_gain_writes_the_normalized_title(monkeypatch, tmp_path):
+    rng = random.Random(6)
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"".join(_frame([100, 100], rng, channels=1) for _ in range(3)))
+    commands = []
+
+    def tag_remux(cmd, *a, **k):
+        commands.append(cmd)
+        Path(cmd[-1]).write_bytes(Path(cmd[cmd.index("-i") + 1]).read_bytes())
+
+    monkeypatch.setattr(proc_module, "run_command", tag_remux)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor()
+    streams = [{"codec_name": "mp3", "channels": 1, "tags": {"title": "Intro"}}]
+    title = proc_module.update_track_title("Intro", "Normalized")
+    assert ap._lossless_gain(str(song), streams, 3.0, "normalizing", title=title) == str(song)
+    assert commands[0][commands[0].index("-metadata") + 1] == f"title={title}"
+    assert proc_module.is_normalized_title(title)
@@ -0,0 +1,79 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.batch import ordering
+from processors.batch import manager as mgr
+
+
+INFO = {
+    "short.mkv": {"duration": 600.0, "audio": [{"codec_name": "aac"}]},
+    "film.mkv": {"duration": 7200.0, "audio": [{"codec_name": "truehd"}, {"codec_name": "ac3"}]},
+    "concert.mkv": {"duration": 14400.0, "audio": [{"codec_name": "aac"}]},
+    "broken.mkv": None,
+}
+
+
+def test_estimate_cost_weights_duration_streams_and_codec():
+    assert ordering.estimate_cost(INFO["film.mkv"]) == 7200.0 * 3.5
+    assert ordering.estimate_cost(INFO["concert.mkv"]) == 14400.0
+    assert ordering.estimate_cost({"duration": None, "audio": [{}]}) == 0.0
+    assert ordering.estimate_cost(None) == 0.0
+    # calibrated factors replace the built-in ones for the codecs they list
+    assert ordering.estimate_cost(INFO["film.mkv"], {"truehd": 4.0}) == 7200.0 * 5.0
+
+
+def test_longest_and_shortest_first():
+    files = ["short.mkv", "broken.mkv", "film.mkv", "concert.mkv"]
+    assert list(ordering.order_files(files, INFO.get, "longest")) == ["film.mkv", "concert.mkv", "short.mkv", "broken.mkv"]
+    assert list(ordering.order_files(files, INFO.get, "shortest")) == ["broken.mkv", "short.mkv", "concert.mkv", "film.mkv"]
+
+
+def test_window_orders_each_window_and_prefetches_the_next():
+    probed = []
+    lock = threading.Lock()
+
+    def probe(path):
+        with lock:
+            probed.append(path)
+        return INFO.get(path)
+
+    ordered = ordering.order_files(["short.mkv", "film.mkv", "concert.mkv", "broken.mkv"], probe, "longest", workers=2, window=2)
+    assert next(ordered) == "film.mkv"
+    # the second window is probed before the first one is used up
+    deadline = time.time() + 5
+    while len(probed) < 4 and time.time() < deadline:
+        time.sleep(0.005)
+    assert sorted(probed) == ["broken.mkv", "concert.mkv", "film.mkv", "short.mkv"]
+    assert list(ordered) == ["short.mkv", "concert.mkv", "broken.mkv"]
+
+
+def test_batch_order_option(monkeypatch):
+    bp = mgr.BatchProcessor(max_workers=1, scan_options={"order": "longest", "min_size": 1})
+    monkeypatch.setattr(bp, "_probe_file", lambda path: (INFO.get(path), 1))
+    assert list(bp._ordered(["short.mkv", "concert.mkv"])) == ["concert.mkv", "short.mkv"]
+    assert "order" not in bp._scan_filters("normalize")
+    monkeypatch.setattr(mgr, "JOB_ORDER", "scan")
+    files = ["short.mkv", "concert.mkv"]
+    assert mgr.BatchProcessor(max_workers=1)._ordered(files) is files
+
+
+def test_probe_cache_holds_the_order_window(monkeypatch):
+    from processors.audio import probe
+
+    monkeypatch.setattr(probe, "PROBE_CACHE_SIZE", 256)
+    monkeypatch.setattr(mgr, "ORDER_WINDOW", 300)
+    bp = mgr.BatchProcessor(max_workers=1, scan_options={"order": "longest"})
+    monkeypatch.setattr(bp, "_probe_file", lambda path: (INFO.get(path), 1))
+    list(bp._ordered(["short.mkv"]))
+    assert probe.PROBE_CACHE_SIZE >= 600
+    # the whole batch is probed up front with a window of 0
+    monkeypatch.setattr(mgr, "ORDER_WINDOW", 0)
+    list(bp._ordered(["f%d.mkv" % i for i in range(1000)]))
+    assert probe.PROBE_CACHE_SIZE >= 1000
@@ -0,0 +1,91 @@
+import os
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import utils
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+
+
+def test_temp_files_go_to_scratch_dir(monkeypatch, tmp_path):
+    scratch = tmp_path / "scratch"
+    monkeypatch.setattr(utils, "SCRATCH_DIR", str(scratch))
+    a = utils.create_temp_file(str(tmp_path / "a" / "film.mkv"))
+    b = utils.create_temp_file(str(tmp_path / "b" / "film.mkv"))
+    assert os.path.dirname(a) == str(scratch) and scratch.is_dir()
+    assert a != b and a.endswith(".mkv")
+
+    monkeypatch.setattr(utils, "SCRATCH_DIR", "")
+    assert utils.create_temp_file(str(tmp_path / "film.mkv")).startswith(str(tmp_path / "film"))
+
+
+def test_move_into_place_creates_directories_and_replaces(tmp_path):
+    temp = tmp_path / "film_temp.mkv"
+    temp.write_text("new")
+    final = tmp_path / "out" / "season 1" / "film.mkv"
+    utils.move_into_place(str(temp), str(final))
+    assert final.read_text() == "new" and not temp.exists()
+
+    temp.write_text("newer")
+    utils.move_into_place(str(temp), str(final))
+    assert final.read_text() == "newer"
+
+
+def test_move_into_place_never_removes_the_target(monkeypatch, tmp_path):
+    final = tmp_path / "film.mkv"
+    final.write_text("original")
+    temp = tmp_path / "film_temp.mkv"
+    temp.write_text("new")
+    seen = []
+    real_replace = os.replace
+
+    def spy_replace(src, dst):
+        seen.append(os.path.exists(dst))
+        real_replace(src, dst)
+
+    monkeypatch.setattr(utils.os, "replace", spy_replace)
+    monkeypatch.setattr(utils.os, "remove", lambda path: (_ for _ in ()).throw(AssertionError(f"removed {path}")))
+    assert final.exists()
+    utils.move_into_place(str(temp), str(final))
+    assert seen == [True] and final.read_text() == "new" and not temp.exists()
+
+
+def test_output_for_mirrors_the_input_tree(tmp_path):
+    ap = AudioProcessor(output_root=str(tmp_path / "out"))
+    ap.input_root = str(tmp_path / "lib")
+    assert ap.output_for(str(tmp_path / "lib" / "Show" / "ep1.mkv")) == str(tmp_path / "out" / "Show" / "ep1.mkv")
+    ap.input_root = None
+    assert ap.output_for(str(tmp_path / "lib" / "Show" / "ep1.mkv")) == str(tmp_path / "out" / "ep1.mkv")
+    assert AudioProcessor().output_for("film.mkv") == "film.mkv"
+
+
+def test_chain_writes_to_output_root_and_skips_when_up_to_date(monkeypatch, tmp_path):
+    lib = tmp_path / "lib" / "Show"
+    lib.mkdir(parents=True)
+    media = lib / "ep1.mkv"
+    media.write_text("original")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("encoded")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(utils, "SCRATCH_DIR", str(tmp_path / "scratch"))
+    ap = AudioProcessor(output_root=str(tmp_path / "out"))
+    ap.input_root = str(tmp_path / "lib")
+    media_info = {"audio": [{"codec_name": "aac"}], "video": []}
+
+    assert not ap.output_up_to_date(str(media))
+    output = ap.process_chain(str(media), "boost=10", media_info=media_info)
+    assert output == str(tmp_path / "out" / "Show" / "ep1.mkv")
+    assert commands[0][-1].startswith(str(tmp_path / "scratch"))
+    assert Path(output).read_text() == "encoded"
+    assert media.read_text() == "original"
+    assert not list((tmp_path / "scratch").iterdir())
+    assert ap.output_up_to_date(str(media))
@@ -126,3 +126,83 @@ def test_get_video_streams(monkeypatch, tmp_path):
     monkeypatch.setattr(probe, 'run_command', lambda cmd: R(json.dumps({"streams": [{"index":0}]})))
     s = probe.get_video_streams("x")
     assert isinstance(s, list) and len(s) == 1
+
+
+def test_probe_media_single_call_and_lru(monkeypatch, tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    src_path = str(repo_root / "src")
+    if src_path not in sys.path:
+        sys.path.insert(0, src_path)
+
+    import os
+    from processors.audio import probe
+
+    class R:
+        def __init__(self, stdout):
+            self.stdout = stdout
+
+    media = tmp_path / "movie.mkv"
+    media.write_text("v1")
+    calls = []
+    out = json.dumps({
+        "streams": [
+            {"index": 0, "codec_type": "video"},
+            {"index": 1, "codec_type": "audio", "channels": 6},
+            {"index": 2, "codec_type": "subtitle"},
+        ],
+        "format": {"duration": "5400.5", "bit_rate": "8000000"},
+    })
+    monkeypatch.setattr(probe, 'run_command', lambda cmd: calls.append(cmd) or R(out))
+    probe.clear_probe_cache()
+
+    info = probe.probe_media(str(media))
+    assert [s["index"] for s in info["audio"]] == [1]
+    assert len(info["video"]) == 1 and len(info["subtitle"]) == 1
+    assert info["duration"] == 5400.5 and info["bit_rate"] == 8000000.0
+    assert probe.get_audio_streams(str(media), None) == info["audio"]
+    assert probe.get_video_streams(str(media)) == info["video"]
+    assert probe.get_duration(str(media)) == 5400.5
+    assert len(calls) == 1
+    assert "-show_format" in calls[0]
+
+    # a rewritten file (new size/mtime) is probed again
+    media.write_text("version 2")
+    os.utime(str(media), ns=(1, 1))
+    probe.get_audio_streams(str(media), None)
+    assert len(calls) == 2
+
+    # files that cannot be stat'ed are never cached
+    probe.probe_media(str(tmp_path / "missing.mkv"))
+    probe.probe_media(str(tmp_path / "missing.mkv"))
+    assert len(calls) == 4
+    probe.clear_probe_cache()
+
+
+def test_probe_media_exposes_id3_title_on_lone_audio_stream(monkeypatch, tmp_path):
+    repo_root = Path(__file__).resolve().parents[1]
+    src_path = str(repo_root / "src")
+    if src_path not in sys.path:
+        sys.path.insert(0, src_path)
+
+    from processors.audio import probe
+    from core.logger import Logger
+
+    class R:
+        def __init__(self, stdout):
+            self.stdout = stdout
+
+    song = tmp_path / "song.mp3"
+    song.write_bytes(b"x")
+    out = json.dumps({"streams": [{"index": 0, "codec_type": "audio", "codec_name": "mp3"}],
+                      "format": {"tags": {"title": "[molexAudio Normalized] Intro"}}})
+    monkeypatch.setattr(probe, 'run_command', lambda cmd: R(out))
+    info = probe.probe_media(str(song), Logger())
+    assert info["audio"][0]["tags"]["title"] == "[molexAudio Normalized] Intro"
+
+    movie = tmp_path / "movie.mkv"
+    movie.write_bytes(b"x")
+    out = json.dumps({"streams": [{"index": 0, "codec_type": "video"}, {"index": 1, "codec_type": "audio"}],
+                      "format": {"tags": {"title": "Movie"}}})
+    monkeypatch.setattr(probe, 'run_command', lambda cmd: R(out))
+    info = probe.probe_media(str(movie), Logger())
+    assert "tags" not in info["audio"][0]
@@ -131,3 +131,48 @@ def test_boost_uses_inherited_codec_and_includes_handlername(monkeypatch, tmp_pa
     joined = ' '.join(ffmpeg_cmd)
     assert "handler_name" in joined or "title=" in joined
     assert any(arg.startswith("-c:a") for arg in ffmpeg_cmd), "expected per-stream -c:a in ffmpeg args"
+
+
+def test_normalize_stream_copies_in_tolerance_tracks(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+    recorded = []
+
+    def fake_run(cmd, capture_output=True):
+        recorded.append(cmd)
+        Path(cmd[-1]).write_text("out")
+        return DummyResult()
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor()
+    measured = [
+        {"input_i": "-27.0", "input_tp": "-6.0", "input_lra": "20.0", "input_thresh": "-38.0", "target_offset": "0.0"},
+        {"input_i": "-16.2", "input_tp": "-2.0", "input_lra": "4.0", "input_thresh": "-27.0", "target_offset": "0.0"},
+    ]
+    info = {"audio": [{"codec_name": "ac3", "tags": {"title": "Main"}}, {"codec_name": "aac", "tags": {"title": "Commentary"}}], "video": [{"codec_name": "h264"}]}
+    assert ap.normalize_audio(str(media), media_info=info, loudness_data=measured) == str(media)
+
+    cmd = recorded[-1]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[0:a:0]loudnorm" in graph and "[0:a:1]" not in graph
+    maps = [cmd[i + 1] for i, c in enumerate(cmd) if c == "-map"]
+    assert maps == ["0:v", "0:s?", "[a0]", "0:a:1"]
+    assert cmd[cmd.index("-c:a:0") + 1] == "ac3" and cmd[cmd.index("-c:a:1") + 1] == "copy"
+    assert "title=[molexAudio Normalized] Commentary" in cmd
+
+
+def test_normalize_leaves_file_alone_when_every_track_is_in_tolerance(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+
+    def no_ffmpeg(*a, **k):
+        raise AssertionError("ffmpeg must not run")
+
+    monkeypatch.setattr(proc_module, "run_command", no_ffmpeg)
+    monkeypatch.setattr(proc_module, "popen", no_ffmpeg)
+    ap = AudioProcessor()
+    measured = [{"input_i": "-16.2", "input_tp": "-2.0", "input_lra": "4.0", "input_thresh": "-27.0", "target_offset": "0.0"}] * 2
+    info = {"audio": [{"codec_name": "ac3", "tags": {"title": "Main"}}, {"codec_name": "aac", "tags": {"title": "Commentary"}}], "video": [{"codec_name": "h264"}]}
+    assert ap.normalize_audio(str(media), media_info=info, loudness_data=measured) == str(media)
+    assert media.read_text() == "x" and [p.name for p in tmp_path.iterdir()] == ["film.mkv"]
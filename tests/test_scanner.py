@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+import os
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+from processors.batch.scanner import MediaScanner, ScanIndex, parse_size
+
+
+def _tree(tmp_path):
+    tmp_path.mkdir(exist_ok=True)
+    (tmp_path / "a.mkv").write_bytes(b"x" * 10)
+    (tmp_path / "b.MP4").write_bytes(b"x" * 2000)
+    (tmp_path / "notes.txt").write_text("n")
+    extras = tmp_path / "Extras"
+    extras.mkdir()
+    (extras / "c.mkv").write_bytes(b"x" * 100)
+    deep = tmp_path / "s1" / "s2"
+    deep.mkdir(parents=True)
+    (deep / "d.flac").write_bytes(b"x" * 100)
+    return tmp_path
+
+
+def _names(paths):
+    return sorted(os.path.basename(p) for p in paths)
+
+
+def test_parallel_scan_finds_nested_media(tmp_path):
+    root = _tree(tmp_path)
+    assert _names(MediaScanner(workers=4).scan(str(root))) == ["a.mkv", "b.MP4", "c.mkv", "d.flac"]
+
+
+def test_globs_and_size_filters(tmp_path):
+    root = _tree(tmp_path)
+    assert _names(MediaScanner(exclude=["Extras"]).scan(str(root))) == ["a.mkv", "b.MP4", "d.flac"]
+    assert _names(MediaScanner(include=["*.mkv"]).scan(str(root))) == ["a.mkv", "c.mkv"]
+    assert _names(MediaScanner(include=["s1/*"]).scan(str(root))) == ["d.flac"]
+    assert _names(MediaScanner(min_size=50, max_size=parse_size("1K")).scan(str(root))) == ["c.mkv", "d.flac"]
+    assert parse_size("1.5G") == int(1.5 * 1024 ** 3) and parse_size("700M") == 700 * 1024 ** 2
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+@pytest.mark.skipif(not hasattr(os, "link") or os.name == "nt", reason="needs POSIX links")
+def test_hardlinks_and_symlink_loops_are_visited_once(tmp_path):
+    root = _tree(tmp_path)
+    os.link(str(root / "a.mkv"), str(root / "a_link.mkv"))
+    os.symlink(str(root), str(root / "s1" / "loop"))
+    found = list(MediaScanner().scan(str(root)))
+    assert len(found) == 4
+    assert len(set(_names(found)) & {"a.mkv", "a_link.mkv"}) == 1
+
+
+def test_scan_index_lists_only_new_or_changed(tmp_path):
+    root = _tree(tmp_path / "media")
+    index = ScanIndex(str(tmp_path / "db" / "scan.sqlite"))
+    for path in MediaScanner().scan(str(root)):
+        assert index.record(path, "normalize")
+    scanner = MediaScanner(index=index, only_changed=True)
+    assert list(scanner.scan(str(root))) == []
+
+    (root / "a.mkv").write_bytes(b"changed content")
+    (root / "new.mkv").write_bytes(b"n")
+    assert _names(scanner.scan(str(root))) == ["a.mkv", "new.mkv"]
+    # the index is per task
+    assert len(list(MediaScanner(index=index, only_changed=True, task="boost").scan(str(root)))) == 5
+
+
+def test_default_scan_index_stays_out_of_the_working_directory(tmp_path):
+    from processors.batch import manager as mgr
+
+    bp = mgr.BatchProcessor(max_workers=1)
+    if bp.scan_index is not None:
+        assert Path(bp.scan_index.db_path).parent == tmp_path
+    assert Path(ScanIndex().db_path).parent == tmp_path
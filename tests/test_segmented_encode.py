@@ -0,0 +1,133 @@
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import segmented
+from processors.audio import processor as proc_module
+from processors.audio.analysis import linear_gain_db
+from processors.audio.processor import AudioProcessor
+
+
+SR = 48000
+PARAMS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+
+
+def _adts(marker):
+    # 7-byte ADTS header (no CRC) + 4-byte payload carrying the frame marker
+    length = 11
+    header = bytes([0xFF, 0xF1, 0x50, 0x80 | (length >> 11), (length >> 3) & 0xFF, ((length & 7) << 5) | 0x1F, 0xFC])
+    return header + int(marker).to_bytes(4, "big", signed=True)
+
+
+def _markers(data):
+    return [int.from_bytes(data[o + 7:o + 11], "big", signed=True) for o, _ in segmented.split_frames(data, "aac")]
+
+
+def test_split_frames_ac3_and_mp2_headers():
+    ac3 = bytes([0x0B, 0x77, 0, 0, 0x14, 0x40]) + bytes(4 * 192 - 6)  # 48 kHz, 192 kbps, bsid 8
+    assert segmented.split_frames(ac3 * 3, "ac3") == [(0, 768), (768, 768), (1536, 768)]
+    mp2 = bytes([0xFF, 0xFD, 0xA4, 0x00]) + bytes(576 - 4)  # MPEG-1 layer II, 192 kbps, 48 kHz
+    assert segmented.split_frames(mp2 * 2, "mp2") == [(0, 576), (576, 576)]
+
+
+def test_linear_gain_follows_loudnorm_linear_mode():
+    ok = {"input_i": "-20.0", "input_tp": "-6.0", "input_lra": "7.0", "input_thresh": "-30.0"}
+    assert abs(linear_gain_db(ok, PARAMS) - 4.0) < 1e-9
+    assert linear_gain_db(dict(ok, input_tp="-4.0"), PARAMS) is None
+    assert linear_gain_db(dict(ok, input_lra="14.0"), PARAMS) is None
+    assert linear_gain_db(dict(ok, input_thresh="-70.0"), PARAMS) is None
+
+
+def test_plan_chunks_is_frame_aligned():
+    assert segmented.plan_chunks(60.0, SR, 1024, 8, 120) == []
+    chunks = segmented.plan_chunks(3600.0, SR, 1024, 4, 120)
+    total = int(3600 * SR) // 1024
+    assert [c["first"] for c in chunks] == [0, total // 4, total // 2, 3 * total // 4]
+    assert chunks[0]["preroll"] == 0 and chunks[1]["preroll"] == segmented.CHUNK_PREROLL_FRAMES
+    assert chunks[-1]["frames"] is None
+
+
+def test_segmented_normalize_concatenates_without_gaps(monkeypatch, tmp_path):
+    media = tmp_path / "concert.mkv"
+    media.write_text("original")
+    duration = 40.0
+    total_frames = int(duration * SR) // 1024
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        out = cmd[-1]
+        if "-f" in cmd and cmd[cmd.index("-f") + 1] == "adts":
+            start = round(float(cmd[cmd.index("-ss") + 1]) * SR / 1024) if "-ss" in cmd else 0
+            count = round(float(cmd[cmd.index("-t") + 1]) * SR / 1024) if "-t" in cmd else total_frames - start
+            frames = [_adts(-1)] + [_adts(start + j) for j in range(count)] + [_adts(-2)]
+            Path(out).write_bytes(b"".join(frames))
+        else:
+            Path(out).write_bytes(Path(cmd[cmd.index("-i", 3) + 1]).read_bytes())
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "get_audio_streams", lambda path, logger=None: [{"codec_name": "aac", "sample_rate": "48000", "tags": {"title": "Live"}}])
+    monkeypatch.setattr(proc_module, "get_video_streams", lambda path: [{"codec_name": "h264"}])
+    monkeypatch.setattr(proc_module, "get_duration", lambda path: duration)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    monkeypatch.setattr(proc_module, "SEGMENTED_ENCODE_MIN_DURATION", 30)
+    monkeypatch.setattr(proc_module, "SEGMENTED_ENCODE_MIN_CHUNK", 10)
+    monkeypatch.setattr(proc_module, "SEGMENTED_ENCODE_WORKERS", 4)
+
+    ap = AudioProcessor()
+    ap.analysis_cache = None
+    monkeypatch.setattr(ap, "_measure_loudness", lambda path, streams, progress_callback=None: [
+        {"input_i": "-20.0", "input_tp": "-6.0", "input_lra": "7.0", "input_thresh": "-30.0", "target_offset": "0.0"}
+    ])
+    assert ap.normalize_audio(str(media)) == str(media)
+
+    chunk_cmds = [c for c in commands if "adts" in c]
+    assert len(chunk_cmds) == 4
+    assert all("volume=4.00dB" in c[c.index("-af") + 1] for c in chunk_cmds)
+    markers = _markers(media.read_bytes())
+    assert markers[:-1] == list(range(total_frames))
+    assert markers[-1] == -2
+    remux = commands[-1]
+    assert remux[remux.index("-c") + 1] == "copy" and "0:v" in remux
+    assert "title=[molexAudio Normalized] Live" in remux
+    assert not list(tmp_path.glob("*_chunks"))
+
+
+def test_segmented_encode_skips_unsupported_codecs(monkeypatch, tmp_path):
+    media = tmp_path / "a.mkv"
+    media.write_text("x")
+    monkeypatch.setattr(proc_module, "SEGMENTED_ENCODE_MIN_DURATION", 1)
+    monkeypatch.setattr(proc_module, "get_duration", lambda path: 3600.0)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "flac")
+    ap = AudioProcessor()
+    assert ap._encode_segmented(str(media), [{"sample_rate": "48000"}], ["volume=1dB"], ["t"], [], "normalizing") is None
+
+
+def test_remux_maps_copied_streams_from_source():
+    cmd = segmented.build_remux_command("in.mkv", [None, "a1.adts"], [{}, {}], ["t0", "t1"], True, "out.mkv")
+    assert cmd.count("-i") == 2
+    maps = [cmd[i + 1] for i, c in enumerate(cmd) if c == "-map"]
+    assert maps == ["0:v", "0:s?", "0:a:0", "1:a"]
+
+
+def test_segmented_encode_leaves_delayed_audio_to_the_single_encode(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+
+    def no_ffmpeg(*a, **k):
+        raise AssertionError("ffmpeg must not run")
+
+    monkeypatch.setattr(proc_module, "run_command", no_ffmpeg)
+    monkeypatch.setattr(proc_module, "SEGMENTED_ENCODE_MIN_DURATION", 1)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    info = {"audio": [{"codec_name": "aac", "sample_rate": "48000", "start_time": "0.480000"}],
+            "video": [{"codec_name": "h264"}], "subtitle": [], "duration": 3600.0, "bit_rate": None, "start_time": 0.0}
+    ap = AudioProcessor()
+    assert ap._encode_segmented(str(media), info["audio"], ["volume=1dB"], ["t"], [], "normalizing", media_info=info) is None
+    # streams that start with the file (here a transport stream starting at 1.4 s) still qualify
+    assert segmented.start_offset({"start_time": "1.400000"}, 1.4) == 0.0
+    assert segmented.start_offset({}, 1.4) == 0.0
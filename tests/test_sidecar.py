@@ -0,0 +1,60 @@
+import os
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import sidecar
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+
+
+M = {"input_i": "-20.0", "input_tp": "-3.0", "input_lra": "8.0", "input_thresh": "-30.0", "target_offset": "0.0"}
+STREAMS = [{"codec_name": "eac3", "tags": {"language": "eng", "title": "Main"}}, {"codec_name": "aac", "tags": {"language": "jpn"}}, {"codec_name": "ac3"}]
+
+
+def test_sidecar_naming():
+    media = os.path.join("lib", "Movie.mkv")
+    assert sidecar.sidecar_outputs(media, STREAMS, [0, 2], "mka") == [{"path": os.path.join("lib", "Movie.normalized.mka"), "streams": [0, 2]}]
+    paths = [o["path"] for o in sidecar.sidecar_outputs(media, STREAMS, [0, 1, 2], "tracks")]
+    assert paths == [os.path.join("lib", n) for n in ("Movie.1.eng.mka", "Movie.2.jpn.mka", "Movie.3.und.mka")]
+
+
+def test_sidecar_command_writes_audio_only():
+    outputs = sidecar.sidecar_outputs("Movie.mkv", STREAMS, [0, 1], "tracks")
+    cmd = sidecar.build_sidecar_command(
+        "Movie.mkv", STREAMS, ["[0:a:0]loudnorm=I=-16[a0]"], [False, True, False], ["eac3", "aac", "ac3"], "256k",
+        ["t0", "t1", "t2"], outputs, ["a.mka", "b.mka"]
+    )
+    assert "0:v" not in cmd and "0:s?" not in cmd
+    first, second = cmd[:cmd.index("a.mka")], cmd[cmd.index("a.mka") + 1:]
+    assert first[first.index("-map") + 1] == "[a0]" and "-c:a:0" in first and first[first.index("-c:a:0") + 1] == "eac3"
+    assert second[second.index("-map") + 1] == "0:a:1" and second[second.index("-c:a:0") + 1] == "copy"
+    assert "language=jpn" in second and second[-1] == "b.mka"
+
+
+def test_normalize_writes_sidecar_and_leaves_video_untouched(monkeypatch, tmp_path):
+    media = tmp_path / "Movie.mkv"
+    media.write_text("original")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("audio")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor(sidecar_mode="mka", skip_policy="tagged")
+    ap.analysis_cache = None
+    monkeypatch.setattr(ap, "_first_pass", lambda path, streams, progress_callback=None: [M, M, None])
+    media_info = {"audio": STREAMS, "video": [{"codec_name": "hevc"}]}
+    assert ap.normalize_audio(str(media), media_info=media_info) == str(media)
+
+    assert len(commands) == 1
+    assert media.read_text() == "original"
+    assert (tmp_path / "Movie.normalized.mka").read_text() == "audio"
+    assert not list(tmp_path.glob("*_temp*"))
+    assert ap.check_skip(str(media), STREAMS) == "Sidecar audio is up to date"
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+import json
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from rich.console import Console
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from processors.audio.cache import LoudnessCache
+from processors.audio.analysis import within_tolerance
+from processors.batch import worker
+
+
+PARAMS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+TAGGED = [{"tags": {"title": "[molexAudio Normalized] English"}}]
+UNTAGGED = [{"tags": {"title": "English"}}]
+
+
+def _processor(tmp_path, policy):
+    ap = AudioProcessor(skip_policy=policy)
+    ap.analysis_cache = LoudnessCache(str(tmp_path / "cache.sqlite"))
+    return ap
+
+
+def test_within_tolerance():
+    tol = {"I": 1.0, "TP": 0.5}
+    assert within_tolerance({"input_i": "-16.8", "input_tp": "-1.2"}, PARAMS, tol)
+    assert within_tolerance({"input_i": "-15.1", "input_tp": "-9.0"}, PARAMS, tol)
+    assert not within_tolerance({"input_i": "-18.0", "input_tp": "-3.0"}, PARAMS, tol)
+    assert not within_tolerance({"input_i": "-16.0", "input_tp": "-0.5"}, PARAMS, tol)
+    assert not within_tolerance({"input_i": "bad"}, PARAMS, tol)
+
+
+def test_off_policy_never_skips(tmp_path):
+    ap = _processor(tmp_path, "off")
+    assert ap.check_skip(str(tmp_path / "x.mkv"), TAGGED) is None
+
+
+def test_tagged_policy_uses_title_tags(tmp_path):
+    media = tmp_path / "t.mkv"
+    media.write_text("t")
+    ap = _processor(tmp_path, "tagged")
+    assert "Already normalized" in ap.check_skip(str(media), TAGGED)
+    assert ap.check_skip(str(media), UNTAGGED) is None
+
+
+def test_cached_measurement_overrides_tags(monkeypatch, tmp_path):
+    media = tmp_path / "c.mkv"
+    media.write_text("c")
+    monkeypatch.setitem(proc_module.NORMALIZATION_PARAMS, "I", -16.0)
+    monkeypatch.setitem(proc_module.NORMALIZATION_PARAMS, "TP", -1.5)
+    ap = _processor(tmp_path, "tagged")
+    ap.analysis_cache.put(str(media), [{"input_i": "-23.0", "input_tp": "-5.0", "input_lra": "4", "input_thresh": "-33", "target_offset": "0"}], PARAMS)
+    assert ap.check_skip(str(media), TAGGED) is None
+
+    ap.analysis_cache.put(str(media), [{"input_i": "-16.3", "input_tp": "-1.6", "input_lra": "4", "input_thresh": "-26", "target_offset": "0"}], PARAMS)
+    assert "Within tolerance" in ap.check_skip(str(media), UNTAGGED)
+
+
+def test_measure_policy_measures_and_caches(monkeypatch, tmp_path):
+    media = tmp_path / "m.mkv"
+    media.write_text("m")
+    monkeypatch.setitem(proc_module.NORMALIZATION_PARAMS, "I", -16.0)
+    monkeypatch.setitem(proc_module.NORMALIZATION_PARAMS, "TP", -1.5)
+
+    class R:
+        stdout = ""
+        stderr = json.dumps({"input_i": "-16.4", "input_tp": "-2.0", "input_lra": "6", "input_thresh": "-26", "target_offset": "0"})
+
+    calls = []
+    monkeypatch.setattr(proc_module, "run_command", lambda cmd, capture_output=True: calls.append(cmd) or R())
+    ap = _processor(tmp_path, "measure")
+    assert "Within tolerance" in ap.check_skip(str(media), UNTAGGED)
+    assert ap.check_skip(str(media), UNTAGGED) is not None
+    assert len(calls) == 1
+
+
+def test_worker_reports_skip_and_cli_shows_it(tmp_path):
+    class SkippingProcessor:
+        def check_skip(self, path, audio_streams=None):
+            return "Already normalized"
+
+        def normalize_audio(self, path, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            raise AssertionError("should not encode")
+
+    out = worker.normalize_file(SkippingProcessor(), "s.mkv")
+    assert out == {"success": True, "skipped": True, "message": "Already normalized"}
+
+    from cli.cli import AudioNormalizationCLI
+    cli = AudioNormalizationCLI(command_handler=None)
+    cli.console = Console(record=True)
+    cli.display_results([
+        {"file": "a.mkv", "task": "normalize", "status": "Skipped", "message": "Already normalized"},
+        {"file": "b.mkv", "task": "normalize", "status": "Success"},
+    ])
+    text = cli.console.export_text()
+    assert "1 skipped" in text
+    assert "0 failed" in text
@@ -0,0 +1,88 @@
+import os
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import utils
+from processors.batch import manager as bp_manager
+from processors.batch import staging as staging_module
+from processors.batch.manager import BatchProcessor
+from processors.batch.staging import StagingArea
+
+
+def test_copy_file_returns_content_checksum(tmp_path):
+    src = tmp_path / "a.bin"
+    src.write_bytes(os.urandom(1000))
+    assert utils.copy_file(str(src), str(tmp_path / "b.bin")) == utils.file_digest(str(tmp_path / "b.bin"))
+    assert (tmp_path / "b.bin").read_bytes() == src.read_bytes()
+
+
+def test_staging_area_copies_and_releases(tmp_path, monkeypatch):
+    media = tmp_path / "share" / "film.mkv"
+    media.parent.mkdir()
+    media.write_text("original")
+    os.utime(media, ns=(1_000_000_000, 2_000_000_000))
+    area = StagingArea(str(tmp_path / "local"), 1)
+
+    local = area.stage(str(media))
+    assert Path(local).read_text() == "original" and os.path.dirname(local) == str(tmp_path / "local")
+    assert os.stat(local).st_mtime_ns == 2_000_000_000
+    assert area.local_path(str(media)) == local and area.sources == {local: str(media)}
+    area.release(str(media))
+    assert not os.path.exists(local) and area.sources == {}
+    assert area.local_path(str(media)) == str(media)
+
+    class Usage:
+        free = 10
+
+    monkeypatch.setattr(staging_module.shutil, "disk_usage", lambda path: Usage())
+    assert area.stage(str(media)) is None
+    assert area.local_path(str(media)) == str(media)
+
+
+def test_batch_normalize_processes_staged_copy(tmp_path, monkeypatch):
+    media = tmp_path / "share" / "film.mkv"
+    media.parent.mkdir()
+    media.write_text("original")
+    seen = []
+
+    class FakeProcessor:
+        staged_sources = {}
+
+        def check_skip(self, path, audio_streams=None):
+            return None
+
+        def analyze_audio(self, path, progress_callback=None, media_info=None):
+            return [{"input_i": "-20.0"}]
+
+        def normalize_audio(self, path, show_ui=False, progress_callback=None, media_info=None, loudness_data=None):
+            seen.append((path, dict(self.staged_sources)))
+            return path
+
+    monkeypatch.setattr(bp_manager, "STAGING_ENABLED", True)
+    monkeypatch.setattr(bp_manager, "SCRATCH_DIR", str(tmp_path / "local"))
+    bp = BatchProcessor(max_workers=1)
+    bp.audio_processor = FakeProcessor()
+    results = bp.process_files_with_progress([str(media)], max_workers=1)
+
+    assert results == [{"file": str(media), "task": "normalize", "status": "Success"}]
+    local, sources = seen[0]
+    assert os.path.dirname(local) == str(tmp_path / "local") and sources == {local: str(media)}
+    assert not os.path.exists(local) and bp.audio_processor.staged_sources == {}
+
+
+def test_processor_writes_staged_results_back_to_the_library(tmp_path):
+    from processors.audio.processor import AudioProcessor
+
+    ap = AudioProcessor()
+    local, original = str(tmp_path / "local" / "film.x1.mkv"), str(tmp_path / "share" / "film.mkv")
+    ap.staged_sources = {local: original}
+    assert ap.source_path(local) == original
+    assert ap.output_for(local) == original
+    ap.output_root = str(tmp_path / "out")
+    ap.input_root = str(tmp_path / "share")
+    assert ap.output_for(local) == str(tmp_path / "out" / "film.mkv")
@@ -0,0 +1,114 @@
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+from processors.audio import streams
+from processors.audio import processor as proc_module
+from processors.audio.cache import LoudnessCache
+from processors.audio.analysis import build_analysis_command
+from processors.audio.processor import AudioProcessor
+
+
+TRACKS = [
+    {"codec_name": "eac3", "tags": {"language": "eng", "title": "Main"}, "disposition": {"default": 1}},
+    {"codec_name": "ac3", "tags": {"language": "fra", "title": "Dub"}, "disposition": {"dub": 1}},
+    {"codec_name": "aac", "tags": {"language": "jpn", "title": "Original"}, "disposition": {"original": 1}},
+    {"codec_name": "aac", "tags": {"language": "eng", "title": "Commentary"}, "disposition": {"comment": 1}},
+]
+
+
+def test_selectors_match_language_disposition_and_position():
+    sel = streams.select_streams
+    assert sel(TRACKS, []) == [0, 1, 2, 3]
+    assert sel(TRACKS, streams.parse_selectors("lang=eng,jpn")) == [0, 2, 3]
+    assert sel(TRACKS, streams.parse_selectors(["default", "original"])) == [0, 2]
+    assert sel(TRACKS, streams.parse_selectors("1,3")) == [1, 3]
+    assert sel(TRACKS, streams.parse_selectors("disposition=comment")) == [3]
+    assert sel(TRACKS, streams.parse_selectors("lang=deu")) == []
+    for bad in ("lang=", "index=x", "loudest", "-1"):
+        with pytest.raises(ValueError):
+            streams.parse_selector(bad)
+
+
+def test_analysis_maps_only_selected_positions():
+    cmd = build_analysis_command("in.mkv", 2, {"I": -16, "TP": -1.5, "LRA": 11}, positions=[0, 2])
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "[0:a:0]" in graph and "[0:a:2]" in graph and "[0:a:1]" not in graph
+    single = build_analysis_command("in.mkv", 1, {"I": -16, "TP": -1.5, "LRA": 11}, positions=[3])
+    assert single[single.index("-map") + 1] == "0:a:3"
+
+
+def test_normalize_measures_and_encodes_only_selected_streams(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+    recorded = []
+    measured = {}
+
+    def fake_run(cmd, capture_output=True):
+        recorded.append(cmd)
+        Path(cmd[-1]).write_text("out")
+
+    def fake_measure(path, tracks, progress_callback=None, backend=None, positions=None):
+        measured["positions"] = positions
+        return [{"input_i": "-27.0", "input_tp": "-6.0", "input_lra": "20.0", "input_thresh": "-38.0", "target_offset": "0.0"} for _ in tracks]
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor(stream_selection=["default", "original"])
+    ap.analysis_cache = None
+    monkeypatch.setattr(ap, "_measure_loudness", fake_measure)
+    assert ap.normalize_audio(str(media), media_info={"audio": TRACKS, "video": []}) == str(media)
+
+    assert measured["positions"] == [0, 2]
+    cmd = recorded[-1]
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert graph.count("loudnorm") == 2 and "[0:a:1]" not in graph
+    maps = [cmd[i + 1] for i, c in enumerate(cmd) if c == "-map"]
+    assert maps == ["0:s?", "[a0]", "0:a:1", "[a2]", "0:a:3"]
+    assert cmd[cmd.index("-c:a:1") + 1] == "copy" and cmd[cmd.index("-c:a:3") + 1] == "copy"
+    assert "-metadata:s:a:1" not in cmd and "title=[molexAudio Normalized] Original" in cmd
+
+
+def test_partial_measurements_are_cached_and_merged(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+    cache = LoudnessCache(str(tmp_path / "cache.sqlite"))
+    calls = []
+
+    def fake_measure(path, tracks, progress_callback=None, backend=None, positions=None):
+        calls.append(positions)
+        return [{"input_i": f"-2{p}.0", "input_tp": "-6.0", "input_lra": "9.0", "input_thresh": "-38.0", "target_offset": "0.0"} for p in positions]
+
+    def processor(selection):
+        ap = AudioProcessor(stream_selection=selection)
+        ap.analysis_cache = cache
+        monkeypatch.setattr(ap, "_measure_loudness", fake_measure)
+        return ap
+
+    first = processor(["1"])._first_pass(str(media), TRACKS)
+    assert first[1]["input_i"] == "-21.0" and first[0] is None
+    assert cache.get(str(media), proc_module.NORMALIZATION_PARAMS, 4)[1]["input_i"] == "-21.0"
+
+    processor(["0,2"])._first_pass(str(media), TRACKS)
+    cached = cache.get(str(media), proc_module.NORMALIZATION_PARAMS, 4)
+    assert [m and m["input_i"] for m in cached] == ["-20.0", "-21.0", "-22.0", None]
+
+    # a later run selecting stream 1 again is served from the cache
+    again = processor(["1"])._first_pass(str(media), TRACKS)
+    assert again[1]["input_i"] == "-21.0" and calls == [[1], [0, 2]]
+
+
+def test_boost_and_skip_with_no_matching_stream(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("x")
+    recorded = []
+    monkeypatch.setattr(proc_module, "run_command", lambda cmd, capture_output=True: recorded.append(cmd))
+    ap = AudioProcessor(stream_selection=["lang=deu"])
+    assert ap.check_skip(str(media), TRACKS) == "No audio streams match the stream selection"
+    assert ap.boost_audio(str(media), 50, media_info={"audio": TRACKS, "video": []}) == str(media)
+    assert recorded == []
@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import tags
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+from processors.batch import manager as mgr
+
+
+def test_replaygain_and_r128_values():
+    track = {"input_i": "-12.50", "input_tp": "-0.50"}
+    rg = tags.gain_tags("replaygain", track, None, -18.0)
+    assert rg["REPLAYGAIN_TRACK_GAIN"] == "-5.50 dB"
+    assert rg["REPLAYGAIN_TRACK_PEAK"] == "0.944061"
+    assert "REPLAYGAIN_ALBUM_GAIN" not in rg
+    r128 = tags.gain_tags("r128", track, {"input_i": "-14.0", "input_tp": "0.0"}, -18.0)
+    assert r128 == {"R128_TRACK_GAIN": str(round(-10.5 * 256)), "R128_ALBUM_GAIN": str(-9 * 256)}
+
+
+def test_album_measurement_is_duration_weighted_energy_mean():
+    album = tags.album_measurement(
+        [{"input_i": "-10.0", "input_tp": "-1.0"}, {"input_i": "-20.0", "input_tp": "-3.0"}], [300.0, 100.0]
+    )
+    assert album == {"input_i": "-11.11", "input_tp": "-1.00"}
+
+
+def test_tag_command_copies_streams_and_places_tags():
+    cmd = tags.build_tag_command("a.opus", {"R128_TRACK_GAIN": "-512"}, ".opus", "a_tmp.opus")
+    assert cmd[cmd.index("-c") + 1] == "copy" and "-c:a" not in cmd
+    assert cmd[cmd.index("-metadata:s:a:0") + 1] == "R128_TRACK_GAIN=-512"
+    m4a = tags.build_tag_command("a.m4a", {"REPLAYGAIN_TRACK_GAIN": "1.00 dB"}, ".m4a", "t.m4a")
+    assert "use_metadata_tags" in m4a and m4a[m4a.index("-metadata") + 1] == "REPLAYGAIN_TRACK_GAIN=1.00 dB"
+
+
+def test_normalize_in_tag_mode_never_reencodes(monkeypatch, tmp_path):
+    song = tmp_path / "song.flac"
+    song.write_text("audio")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("tagged")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "TAG_MODE_EXTENSIONS", [".flac"])
+    ap = AudioProcessor()
+    monkeypatch.setattr(ap, "_first_pass", lambda path, streams, progress_callback=None: [{"input_i": "-14.00", "input_tp": "-1.00"}])
+    assert ap.normalize_audio(str(song), media_info={"audio": [{"codec_name": "flac"}], "video": []}) == str(song)
+    assert len(commands) == 1 and "loudnorm" not in " ".join(commands[0])
+    assert "REPLAYGAIN_TRACK_GAIN=-4.00 dB" in commands[0]
+    assert song.read_text() == "tagged"
+
+
+def test_batch_tag_mode_writes_album_gain_per_directory(monkeypatch, tmp_path):
+    class DummyLive:
+        def __init__(self, *a, **k):
+            pass
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def update(self, grp):
+            return None
+
+    monkeypatch.setattr(mgr, "Live", DummyLive)
+    levels = {"a": "-10.0", "b": "-20.0", "single": "-15.0"}
+    (tmp_path / "album").mkdir()
+    (tmp_path / "other").mkdir()
+    files = [str(tmp_path / "album" / "a.flac"), str(tmp_path / "album" / "b.flac"), str(tmp_path / "other" / "single.flac")]
+    tagged = {}
+
+    class AP:
+        def probe_media(self, p):
+            return {"audio": [{"index": 0}], "video": [], "subtitle": [], "duration": 100.0, "bit_rate": None}
+
+        def check_skip(self, p, audio_streams=None):
+            return None
+
+        def analyze_audio(self, p, progress_callback=None, media_info=None):
+            return [{"input_i": levels[Path(p).stem], "input_tp": "-1.0"}]
+
+        def tag_mode(self, p):
+            return True
+
+        def tag_audio(self, p, track, album=None, progress_callback=None):
+            tagged[Path(p).stem] = album
+            return p
+
+        def normalize_audio(self, *a, **k):
+            raise AssertionError("tag mode must not re-encode")
+
+    bp = mgr.BatchProcessor(max_workers=2)
+    bp.audio_processor = AP()
+    res = bp.process_files_with_progress(files, max_workers=2)
+    assert sorted(r["status"] for r in res) == ["Success"] * 3
+    assert tagged["a"] == tagged["b"] == {"input_i": "-12.60", "input_tp": "-1.00"}
+    assert tagged["single"] is None
@@ -0,0 +1,141 @@
+import sys
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import pytest
+
+from processors.audio import targets
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+
+
+DEFAULTS = {"I": -16.0, "TP": -1.5, "LRA": 11.0}
+PROFILES = [
+    {"name": "streaming", "I": -16},
+    {"name": "broadcast", "I": -23, "TP": -1, "LRA": 15, "output": "broadcast/{stem}{ext}"},
+]
+M = {"input_i": "-20.0", "input_tp": "-3.0", "input_lra": "8.0", "input_thresh": "-30.0", "target_offset": "0.4"}
+
+
+def test_profiles_are_validated_and_selected_by_name():
+    profiles = targets.parse_profiles(PROFILES, DEFAULTS)
+    assert profiles[0] == {"name": "streaming", "I": -16.0, "TP": -1.5, "LRA": 11.0}
+    assert [p["name"] for p in targets.select_profiles(profiles, ["broadcast"])] == ["broadcast"]
+    assert targets.select_profiles(profiles, None) == profiles
+    with pytest.raises(ValueError):
+        targets.select_profiles(profiles, ["cinema"])
+    with pytest.raises(ValueError):
+        targets.parse_profiles([{"name": "a", "I": -16}, {"name": "a", "I": -23}], DEFAULTS)
+    with pytest.raises(ValueError):
+        targets.parse_profiles([{"name": "loud"}], DEFAULTS)
+
+
+def test_output_path_template():
+    profiles = targets.parse_profiles(PROFILES, DEFAULTS)
+    src = str(Path("/media/movies/film.mkv"))
+    assert targets.output_path(src, profiles[0], "{stem}.{name}{ext}") == str(Path("/media/movies/film.streaming.mkv"))
+    assert targets.output_path(src, profiles[1], "{stem}.{name}{ext}") == str(Path("/media/movies/broadcast/film.mkv"))
+    assert targets.output_path(src, profiles[0], "{stem}_{I}LUFS{ext}") == str(Path("/media/movies/film_-16LUFS.mkv"))
+    with pytest.raises(ValueError):
+        targets.output_path(src, profiles[0], "{title}{ext}")
+
+
+def test_command_splits_each_stream_once_per_encoded_target():
+    profiles = targets.parse_profiles(PROFILES, DEFAULTS)
+    copy_plan = [[False, True], [False, False]]  # stream 1 is already in tolerance for the first profile
+    cmd = targets.build_multi_target_command(
+        "in.mkv", [M, M], profiles, copy_plan, [None, 0], ["aac", "ac3"], "192k", ["t0", "t1"], True, ["a.mkv", "b.mkv"]
+    )
+    assert cmd.count("-i") == 1
+    graph = cmd[cmd.index("-filter_complex") + 1].split(";")
+    assert graph[0] == "[0:a:0]asplit=2[s0_0][s0_1]"
+    assert graph[1].startswith("[s0_0]loudnorm=I=-16.0:") and graph[1].endswith("offset=0.4[o0a0]")
+    assert graph[2].startswith("[s0_1]loudnorm=I=-23.0:TP=-1.0:LRA=15.0:") and graph[2].endswith("offset=0[o1a0]")
+    assert graph[3].startswith("[0:a:1]loudnorm=I=-23.0:") and graph[3].endswith("[o1a1]")
+    first = cmd[:cmd.index("a.mkv")]
+    second = cmd[cmd.index("a.mkv") + 1:]
+    assert [first[i + 1] for i, c in enumerate(first) if c == "-map"] == ["0:v", "0:s?", "[o0a0]", "0:a:1"]
+    assert [second[i + 1] for i, c in enumerate(second) if c == "-map"] == ["0:v", "0:s?", "[o1a0]", "[o1a1]"]
+    assert first[first.index("-c:a:1") + 1] == "copy"
+    assert second[second.index("-c:a:1") + 1] == "ac3" and second[-1] == "b.mkv"
+
+
+def test_normalize_writes_every_target_and_keeps_source(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("original")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        for arg in cmd[cmd.index("-filter_complex") + 2:]:
+            if arg.endswith(".mkv"):
+                Path(arg).write_text("encoded")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    monkeypatch.setattr(proc_module, "TARGET_PROFILES", PROFILES)
+    monkeypatch.setattr(proc_module, "AUDIO_CODEC", "inherit")
+    ap = AudioProcessor()
+    monkeypatch.setattr(ap, "_first_pass", lambda path, streams, progress_callback=None: [M])
+    media_info = {"audio": [{"codec_name": "eac3", "tags": {"title": "Main"}}], "video": [{"codec_name": "h264"}]}
+    assert ap.normalize_audio(str(media), media_info=media_info) == str(media)
+
+    assert len(commands) == 1
+    assert "asplit=2" in commands[0][commands[0].index("-filter_complex") + 1]
+    assert media.read_text() == "original"
+    assert (tmp_path / "film.streaming.mkv").read_text() == "encoded"
+    assert (tmp_path / "broadcast" / "film.mkv").read_text() == "encoded"
+    assert not list(tmp_path.rglob("*_temp*"))
+
+    only = AudioProcessor(targets=["broadcast"])
+    assert [p["name"] for p in only.target_profiles] == ["broadcast"]
+
+
+def test_directory_scan_leaves_out_earlier_target_outputs(monkeypatch, tmp_path):
+    from processors.batch import manager as mgr
+    from processors.batch.utils import iter_media_files
+
+    for name in ("film.mkv", "film.streaming.mkv", "notes.streaming.mkv", "broadcast/film.mkv", "broadcast/other.mkv"):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("x")
+    profiles = targets.parse_profiles(PROFILES, DEFAULTS)
+    template = "{stem}.{name}{ext}"
+    assert targets.is_target_output(str(tmp_path / "film.streaming.mkv"), profiles, template)
+    assert targets.is_target_output(str(tmp_path / "broadcast" / "film.mkv"), profiles, template)
+    # no source next to them: regular files
+    assert not targets.is_target_output(str(tmp_path / "notes.streaming.mkv"), profiles, template)
+    assert not targets.is_target_output(str(tmp_path / "broadcast" / "other.mkv"), profiles, template)
+    assert not targets.is_target_output(str(tmp_path / "film.mkv"), profiles, template)
+
+    monkeypatch.setattr(proc_module, "TARGET_PROFILES", PROFILES)
+    bp = mgr.BatchProcessor(max_workers=1)
+    found = sorted(Path(p).relative_to(tmp_path).as_posix() for p in iter_media_files(str(tmp_path), **bp._scan_filters("normalize")))
+    assert found == ["broadcast/other.mkv", "film.mkv", "notes.streaming.mkv"]
+
+
+def test_cli_targets_are_applied_before_profiles_are_built(monkeypatch):
+    import argparse
+    import audio_tool
+
+    # other tests reload core.config; share the processor's dict
+    monkeypatch.setattr(audio_tool, "NORMALIZATION_PARAMS", proc_module.NORMALIZATION_PARAMS)
+    monkeypatch.setitem(proc_module.NORMALIZATION_PARAMS, "TP", -1.5)
+    monkeypatch.setattr(proc_module, "TARGET_PROFILES", [{"name": "streaming", "I": -14}])
+    args = argparse.Namespace(normalize="film.mkv", chain=None, I=None, TP=-2.0, LRA=None, workers=None, debug_no_ffmpeg=False)
+    monkeypatch.setattr(audio_tool, "parse_args", lambda: args)
+    built = []
+
+    class StopHandler(Exception):
+        pass
+
+    def fake_handler(**kwargs):
+        built.append(AudioProcessor().target_profiles)
+        raise StopHandler()
+
+    monkeypatch.setattr(audio_tool, "CommandHandler", fake_handler)
+    with pytest.raises(StopHandler):
+        audio_tool.main()
+    assert built[0][0]["TP"] == -2.0
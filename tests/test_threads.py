@@ -0,0 +1,74 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parents[1]
+src_path = str(repo_root / "src")
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from processors.audio import threads
+from processors.audio import processor as proc_module
+from processors.audio.processor import AudioProcessor
+
+
+def test_plan_and_command_threads():
+    assert threads.plan_threads("analysis", 3) == 4
+    assert threads.plan_threads("encode", 2) == 5
+    assert threads.plan_threads("copy", 6) == threads.plan_threads("chunk", 1) == 1
+
+    cmd = threads.with_threads(["ffmpeg", "-y", "-i", "in.mkv", "-threads", "0", "-filter_complex", "g", "out.mkv"], 3)
+    assert cmd == ["ffmpeg", "-filter_complex_threads", "3", "-y", "-threads", "3", "-i", "in.mkv", "-threads", "3", "-filter_complex", "g", "out.mkv"]
+    chunk = threads.with_threads(["ffmpeg", "-i", "in.mkv", "-threads", "1", "-af", "volume=2", "c.aac"], 2)
+    assert chunk == ["ffmpeg", "-filter_threads", "2", "-threads", "2", "-i", "in.mkv", "-threads", "1", "-af", "volume=2", "c.aac"]
+    # every decoded input gets a decoder thread count, inputs that have one keep it
+    remux = threads.with_threads(["ffmpeg", "-threads", "1", "-i", "a.mkv", "-i", "b.aac", "-threads", "0", "out.mkv"], 2)
+    assert remux == ["ffmpeg", "-threads", "1", "-i", "a.mkv", "-threads", "2", "-i", "b.aac", "-threads", "2", "out.mkv"]
+    assert threads.with_threads(["ffmpeg", "-i", "a", "-c", "copy", "b"], 4) == ["ffmpeg", "-i", "a", "-c", "copy", "b"]
+
+
+def test_budget_never_exceeds_total():
+    budget = threads.ThreadBudget(4)
+    peak = [0]
+    lock = threading.Lock()
+
+    def job(stage, streams):
+        with budget.reserve(stage, streams) as granted:
+            assert granted >= 1
+            with lock:
+                peak[0] = max(peak[0], budget.in_use)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=job, args=("encode", n % 3 + 1)) for n in range(12)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    assert 1 <= peak[0] <= 4 and budget.in_use == 0
+    assert budget.acquire(10) == 4
+
+
+def test_normalize_encode_gets_explicit_threads(monkeypatch, tmp_path):
+    media = tmp_path / "film.mkv"
+    media.write_text("original")
+    commands = []
+
+    def fake_run(cmd, capture_output=True):
+        commands.append(cmd)
+        Path(cmd[-1]).write_text("encoded")
+
+    monkeypatch.setattr(proc_module, "run_command", fake_run)
+    ap = AudioProcessor()
+    ap.thread_budget = threads.ThreadBudget(3)
+    monkeypatch.setattr(ap, "_first_pass", lambda path, streams, progress_callback=None: [
+        {"input_i": "-20.0", "input_tp": "-3.0", "input_lra": "8.0", "input_thresh": "-30.0", "target_offset": "0.0"}
+    ])
+    media_info = {"audio": [{"codec_name": "aac", "channels": 2}], "video": []}
+    assert ap.normalize_audio(str(media), media_info=media_info) == str(media)
+
+    cmd = commands[-1]
+    assert cmd[cmd.index("-threads") + 1] == "3"
+    assert cmd[cmd.index("-i") - 2:cmd.index("-i")] == ["-threads", "3"]
+    assert cmd[cmd.index("-filter_complex_threads") + 1] == "3"
+    assert ap.thread_budget.in_use == 0